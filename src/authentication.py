@@ -15,17 +15,24 @@ This is perfectly safe (the token cannot be changed without knowing the private
 But then the frontend needs to make sure that the permissions are up-to-date. Every front-end
 should therefore request a new token every X minutes. This is not needed when the back-end
 performs a separate authorization request. The only downside is the overhead of the additional
-keycloak requests - if that becomes prohibitive in the future, we should reevaluate this design.
+keycloak requests. To limit this overhead, the introspection results are cached in-process for a
+short time (see keycloak.introspection_cache_max_age in config.toml). Optionally, the tokens can
+be verified locally using the public keys of the realm (keycloak.verify_token_locally), skipping
+Keycloak completely. This reintroduces the downside described above: changes in the roles are only
+picked up once the user obtains a new token.
 """
+import hashlib
 import logging
 import os
+import time
 
 from dotenv import load_dotenv
-from fastapi import HTTPException, Security, status
+from fastapi import Depends, HTTPException, Security, status
 from fastapi.security import OpenIdConnect
 from keycloak import KeycloakOpenID
 from pydantic import BaseModel, Field
 
+from caching import TTLCache
 from config import KEYCLOAK_CONFIG
 
 load_dotenv()
@@ -43,6 +50,13 @@ keycloak_openid = KeycloakOpenID(
     verify=True,
 )
 
+# Keyed by the hash of the token, so that the tokens themselves are not kept in memory
+introspection_cache = TTLCache[dict](
+    maxsize=KEYCLOAK_CONFIG.get("introspection_cache_size", 1024),
+    max_age=KEYCLOAK_CONFIG.get("introspection_cache_max_age", 30),
+)
+jwks_cache = TTLCache[dict](maxsize=1, max_age=KEYCLOAK_CONFIG.get("jwks_max_age", 3600))
+
 
 class User(BaseModel):
     name: str = Field(description="The username.")
@@ -80,9 +94,7 @@ async def get_current_user(token=Security(oidc)) -> User:
         )
     try:
         token = token.replace("Bearer ", "")
-        # query the authorization server to determine the active state of this token and to
-        # determine meta-information.
-        userinfo = keycloak_openid.introspect(token)
+        userinfo = _userinfo(token)
 
         if not userinfo.get("active", False):
             logging.error("Invalid userinfo or inactive user.")
@@ -97,3 +109,60 @@ async def get_current_user(token=Security(oidc)) -> User:
             detail="Invalid authentication token",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+
+async def get_current_privileged_user(user: User = Depends(get_current_user)) -> User:
+    """
+    Use this function in Depends() to only allow users with the configured role, e.g. for the
+    endpoints exposing the internals of this instance.
+
+    Raises:
+        HTTPException with status 403 if the user does not have this role, and the exceptions of
+            get_current_user.
+    """
+    if not user.has_role(KEYCLOAK_CONFIG.get("role")):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You do not have permission to view this information.",
+        )
+    return user
+
+
+def _userinfo(token: str) -> dict:
+    """
+    Determine the active state of this token and its meta-information, using the cache if
+    possible. Only active tokens are cached, until they expire.
+    """
+    key = hashlib.sha256(token.encode()).hexdigest()
+    userinfo = introspection_cache.get(key)
+    if userinfo is None:
+        if KEYCLOAK_CONFIG.get("verify_token_locally", False):
+            userinfo = _verify_locally(token)
+        else:
+            # query the authorization server
+            userinfo = keycloak_openid.introspect(token)
+        if userinfo.get("active", False):
+            introspection_cache.set(key, userinfo, expires_at=userinfo.get("exp"))
+    return userinfo
+
+
+def _verify_locally(token: str) -> dict:
+    """
+    Verify the signature and expiry of the token using the (cached) JSON Web Key Set of the realm,
+    returning the claims in the same format as the introspection endpoint.
+
+    Raises:
+        JWTError if the token is invalid.
+    """
+    jwks = jwks_cache.get("jwks")
+    if jwks is None:
+        jwks = keycloak_openid.certs()
+        jwks_cache.set("jwks", jwks)
+    # The audience is not verified, because the token is obtained by the (public) frontend client
+    claims = keycloak_openid.decode_token(token, key=jwks, options={"verify_aud": False})
+    return {
+        "active": claims.get("exp", 0) > time.time(),
+        "username": claims.get("preferred_username"),
+        "realm_access": claims.get("realm_access", {}),
+        "exp": claims.get("exp"),
+    }
@@ -0,0 +1,263 @@
+"""
+Caching.
+
+TTLCache is a small, thread-safe, in-process cache with LRU eviction and a time-to-live per entry.
+It keeps track of the number of hits and misses, so that the effectiveness of the cache can be
+monitored.
+
+The CacheBackends store serialized values, either in-process or in Redis, so that they can be
+shared between worker processes. The async methods are used by the async endpoints, so that a
+remote backend does not block the event loop.
+
+StaleWhileRevalidate holds a single value that is expensive to compute, and recomputes it in the
+background once it becomes stale.
+"""
+import abc
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, TypeVar
+
+VALUE = TypeVar("VALUE")
+
+
+class TTLCache(Generic[VALUE]):
+    """
+    A Least-Recently-Used cache in which each entry expires after a time-to-live.
+
+    Usage:
+        cache = TTLCache[str](maxsize=100, max_age=60)
+        cache.set("key", "value")
+        cache.get("key")  # "value", or None after 60 seconds
+    """
+
+    def __init__(self, maxsize: int, max_age: float):
+        """
+        Args:
+            maxsize: the maximum number of entries. If the cache is full, the least recently used
+                entry is evicted.
+            max_age: the maximum number of seconds that an entry is valid.
+        """
+        self.maxsize = maxsize
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, tuple[float, VALUE]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> VALUE | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.time():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, key: Hashable, value: VALUE, expires_at: float | None = None):
+        """
+        Add an entry. It expires after max_age seconds, or at expires_at (a unix timestamp) if that
+        is earlier.
+        """
+        expires_at = min(time.time() + self.max_age, expires_at or float("inf"))
+        if self.maxsize <= 0 or expires_at <= time.time():
+            return
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class CacheBackend(abc.ABC):
+    """
+    A key-value store for serialized values, shared by all cached objects of the application.
+    """
+
+    @abc.abstractmethod
+    def get(self, key: str) -> bytes | None:
+        """Return the value, or None if it does not exist or is expired."""
+
+    @abc.abstractmethod
+    def set(self, key: str, value: bytes, max_age: float):
+        """Store the value for at most max_age seconds."""
+
+    @abc.abstractmethod
+    def delete(self, *keys: str):
+        """Remove these keys, if they exist."""
+
+    @abc.abstractmethod
+    def counter(self, key: str) -> int:
+        """The current value of a counter, 0 if it was never incremented. Counters do not
+        expire."""
+
+    @abc.abstractmethod
+    def increment(self, key: str) -> int:
+        """Increment the counter, returning the new value."""
+
+    async def get_async(self, key: str) -> bytes | None:
+        """As get. Backends that block on I/O should override the async methods."""
+        return self.get(key)
+
+    async def set_async(self, key: str, value: bytes, max_age: float):
+        """As set."""
+        self.set(key, value, max_age)
+
+    async def counter_async(self, key: str) -> int:
+        """As counter."""
+        return self.counter(key)
+
+
+class MemoryCacheBackend(CacheBackend):
+    """In-process cache backend. Note that each worker process has its own cache."""
+
+    def __init__(self, maxsize: int):
+        self._cache = TTLCache[bytes](maxsize=maxsize, max_age=float("inf"))
+        self._counters: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        return self._cache.get(key)
+
+    def set(self, key: str, value: bytes, max_age: float):
+        self._cache.set(key, value, expires_at=time.time() + max_age)
+
+    def delete(self, *keys: str):
+        for key in keys:
+            self._cache.delete(key)
+
+    def counter(self, key: str) -> int:
+        return self._counters.get(key, 0)
+
+    def increment(self, key: str) -> int:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self._counters.clear()
+
+
+class RedisCacheBackend(CacheBackend):
+    """Cache backend shared by all worker processes, using Redis (or any compatible server)."""
+
+    def __init__(self, url: str):
+        try:
+            import redis
+            import redis.asyncio
+        except ImportError as e:
+            raise ImportError(
+                "The redis cache backend requires the redis extra: pip install .[redis]"
+            ) from e
+        self._redis = redis.Redis.from_url(url)
+        self._async_redis = redis.asyncio.Redis.from_url(url)
+
+    def get(self, key: str) -> bytes | None:
+        return self._redis.get(key)
+
+    def set(self, key: str, value: bytes, max_age: float):
+        self._redis.set(key, value, px=int(max_age * 1000))
+
+    def delete(self, *keys: str):
+        if keys:
+            self._redis.delete(*keys)
+
+    def counter(self, key: str) -> int:
+        value = self._redis.get(key)
+        return int(value) if value is not None else 0
+
+    def increment(self, key: str) -> int:
+        return self._redis.incr(key)
+
+    async def get_async(self, key: str) -> bytes | None:
+        return await self._async_redis.get(key)
+
+    async def set_async(self, key: str, value: bytes, max_age: float):
+        await self._async_redis.set(key, value, px=int(max_age * 1000))
+
+    async def counter_async(self, key: str) -> int:
+        value = await self._async_redis.get(key)
+        return int(value) if value is not None else 0
+
+
+class StaleWhileRevalidate(Generic[VALUE]):
+    """
+    A single value that is computed on first use. Once it is older than max_age, the stale value
+    is still returned while the value is recomputed in a background thread. Only if the value is
+    older than max_age + stale_max_age, the caller waits for the value to be recomputed.
+
+    Usage:
+        counts = StaleWhileRevalidate(compute=count_all, max_age=10, stale_max_age=300)
+        counts.get()
+    """
+
+    def __init__(self, compute: Callable[[], VALUE], max_age: float, stale_max_age: float):
+        self.compute = compute
+        self.max_age = max_age
+        self.stale_max_age = stale_max_age
+        self._entry: tuple[float, VALUE] | None = None
+        self._lock = threading.Lock()
+        self._refreshing = threading.Lock()
+
+    def get(self) -> VALUE:
+        entry = self._entry
+        if entry is None or self._age(entry) > self.max_age + self.stale_max_age:
+            with self._lock:
+                entry = self._entry
+                if entry is None or self._age(entry) > self.max_age + self.stale_max_age:
+                    entry = self._refresh()
+        elif self._age(entry) > self.max_age:
+            self._refresh_in_background()
+        return entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._entry = None
+
+    def _refresh(self) -> tuple[float, VALUE]:
+        self._entry = (time.monotonic(), self.compute())
+        return self._entry
+
+    def _refresh_in_background(self):
+        if not self._refreshing.acquire(blocking=False):
+            return  # already being refreshed
+
+        def refresh():
+            try:
+                with self._lock:
+                    self._refresh()
+            except Exception:
+                logging.exception("Failed to refresh the cached value.")
+            finally:
+                self._refreshing.release()
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    @staticmethod
+    def _age(entry: tuple[float, VALUE]) -> float:
+        return time.monotonic() - entry[0]
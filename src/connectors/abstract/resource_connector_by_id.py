@@ -1,19 +1,74 @@
 import abc
+import collections
 import logging
-from typing import Generic, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Generic, Iterator, Callable, Iterable, TypeVar
+
+import requests
+from ratelimit import limits, sleep_and_retry
+from requests.adapters import HTTPAdapter
 from requests.exceptions import HTTPError
 
 from connectors.abstract.resource_connector import ResourceConnector, RESOURCE
 from connectors.record_error import RecordError
 from connectors.resource_with_relations import ResourceWithRelations
 
+T = TypeVar("T")
+RESULT = TypeVar("RESULT")
+
 
 class ResourceConnectorById(ResourceConnector, Generic[RESOURCE]):
     """Connectors that synchronize by filtering the results on identifier. In every subsequent run,
     only identifiers higher than the highest identifier of the previous run are fetched."""
 
-    def __init__(self, limit_per_iteration: int = 500):
+    def __init__(
+        self,
+        limit_per_iteration: int = 500,
+        n_workers: int = 8,
+        max_calls_per_second: int = 10,
+    ):
+        """
+        Args:
+            limit_per_iteration: the number of records requested per page.
+            n_workers: the number of records that are fetched concurrently.
+            max_calls_per_second: the maximum number of requests per second, over all workers.
+        """
         self.limit_per_iteration = limit_per_iteration
+        self.n_workers = n_workers
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=n_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._get = sleep_and_retry(limits(calls=max_calls_per_second, period=1)(self.session.get))
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """A GET request using the pooled session, respecting the rate limit. Thread-safe."""
+        return self._get(url, **kwargs)
+
+    def fetch_concurrently(
+        self, fetch_record: Callable[[T], RESULT], arguments: Iterable[T]
+    ) -> Iterator[RESULT]:
+        """
+        Call fetch_record for every argument using a pool of n_workers threads. The results are
+        yielded in the order of the arguments, so that the state (e.g. the last identifier) is
+        updated correctly. The fetch_record function should not raise exceptions, but return a
+        RecordError instead.
+
+        At most 2 * n_workers records are fetched ahead of the caller. If the caller stops early
+        (e.g. because the limit is reached), the fetches that did not start yet are cancelled,
+        without waiting for the ones that are running.
+        """
+        executor = ThreadPoolExecutor(max_workers=self.n_workers)
+        pending: collections.deque[Future[RESULT]] = collections.deque()
+        try:
+            for argument in arguments:
+                pending.append(executor.submit(fetch_record, argument))
+                if len(pending) >= 2 * self.n_workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
 
     @abc.abstractmethod
     def retry(self, identifier: int) -> RESOURCE | ResourceWithRelations[RESOURCE] | RecordError:
@@ -4,7 +4,6 @@ and how to convert the OpenML response to some agreed AIoD format.
 """
 
 import dateutil.parser
-import requests
 import logging
 
 from requests.exceptions import HTTPError
@@ -45,7 +44,7 @@ class OpenMlMLModelConnector(ResourceConnectorById[MLModel]):
 
     def fetch_record(self, identifier: int) -> ResourceWithRelations[MLModel] | RecordError:
         url_mlmodel = f"https://www.openml.org/api/v1/json/flow/{identifier}"
-        response = requests.get(url_mlmodel)
+        response = self.get(url_mlmodel)
         if not response.ok:
             msg = response.json()["error"]["message"]
             return RecordError(
@@ -101,7 +100,7 @@ class OpenMlMLModelConnector(ResourceConnectorById[MLModel]):
             "https://www.openml.org/api/v1/json/flow/list/"
             f"limit/{self.limit_per_iteration}/offset/{offset}"
         )
-        response = requests.get(url_mlmodel)
+        response = self.get(url_mlmodel)
 
         if not response.ok:
             status_code = response.status_code
@@ -118,22 +117,21 @@ class OpenMlMLModelConnector(ResourceConnectorById[MLModel]):
             yield RecordError(identifier=None, error=e)
             return
 
-        for summary in mlmodel_summaries:
-            identifier = None
+        def fetch_summary(summary: dict) -> ResourceWithRelations[SQLModel] | RecordError:
             # ToDo: discuss how to accommodate pipelines. Excluding sklearn pipelines for now.
             # Note: weka doesn't have a standard method to define pipeline.
             # There are no mlr pipelines in OpenML.
             identifier = summary["id"]
-            if "sklearn.pipeline" not in summary["name"]:
-                try:
-                    if identifier < from_identifier:
-                        yield RecordError(identifier=identifier, error="Id too low", ignore=True)
-                    if from_identifier is None or identifier >= from_identifier:
-                        yield self.fetch_record(identifier)
-                except Exception as e:
-                    yield RecordError(identifier=identifier, error=e)
-            else:
-                yield RecordError(identifier=identifier, error="Sklearn pipeline not processed!")
+            if "sklearn.pipeline" in summary["name"]:
+                return RecordError(identifier=identifier, error="Sklearn pipeline not processed!")
+            try:
+                if from_identifier is not None and identifier < from_identifier:
+                    return RecordError(identifier=identifier, error="Id too low", ignore=True)
+                return self.fetch_record(identifier)
+            except Exception as e:
+                return RecordError(identifier=identifier, error=e)
+
+        yield from self.fetch_concurrently(fetch_summary, mlmodel_summaries)
 
 
 def _description(mlmodel_json: dict[str, Any], identifier: int) -> Text | None | RecordError:
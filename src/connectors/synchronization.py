@@ -1,11 +1,13 @@
 import argparse
 import importlib
+import itertools
 import json
 import logging
 import pathlib
+import resource
 import sys
 from datetime import datetime
-from typing import Optional
+from typing import Iterator, Optional
 
 from sqlmodel import select, Session
 
@@ -14,8 +16,15 @@ from connectors.record_error import RecordError
 from connectors.resource_with_relations import ResourceWithRelations
 from database.model.concept.concept import AIoDConcept
 from database.session import DbSession
-from database.setup import _create_or_fetch_related_objects, _get_existing_resource
+from database.model.serializers import prefetched_named_relations
+from database.setup import (
+    _create_or_fetch_related_objects,
+    _get_existing_resource,
+    _get_existing_keys,
+    _resource_key,
+)
 from routers import ResourceRouter, resource_routers, enum_routers
+from routers import search_routers  # noqa: F401 registers the search outbox
 from setup_logger import setup_logger
 
 RELATIVE_PATH_STATE_JSON = pathlib.Path("state.json")
@@ -75,6 +84,24 @@ def _parse_args() -> argparse.Namespace:
         help="Save the state file every N records. In case the complete program is killed, "
         "you can then resume the next run from the last saved state.",
     )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1,
+        help="Store the records in batches of N: checking which records already exist, "
+        "resolving the related names (e.g. keywords) and committing is done once per batch "
+        "instead of once per record. If any record of a batch fails, the batch is retried "
+        "record by record, so that the failures are reported individually.",
+    )
+    parser.add_argument(
+        "--recycle-session-every",
+        type=int,
+        default=10000,
+        help="Close the database session every N records, and continue with a new session, so "
+        "that the objects loaded by the session do not accumulate and the memory usage stays "
+        "constant during long runs. The peak memory usage is logged every N records. Use 0 to "
+        "use a single session.",
+    )
     return parser.parse_args()
 
 
@@ -117,6 +144,128 @@ def save_to_database(
     return None
 
 
+def save_batch_to_database(
+    session: Session,
+    connector: ResourceConnector,
+    router: ResourceRouter,
+    items: list[RESOURCE | ResourceWithRelations[RESOURCE] | RecordError],
+) -> list[RecordError]:
+    """
+    Store a batch of items using a single existence check, a single query per related table to
+    resolve names, and a single commit. If the batch cannot be stored, it is rolled back and the
+    items are stored one by one using save_to_database, so that the failing items are returned
+    as separate errors.
+    """
+    errors = [item for item in items if isinstance(item, RecordError)]
+    valid_items = [item for item in items if not isinstance(item, RecordError)]
+    if not valid_items:
+        return errors
+    resource_create_instances = [
+        item.resource if isinstance(item, ResourceWithRelations) else item for item in valid_items
+    ]
+    try:
+        existing = _get_existing_keys(session, resource_create_instances, connector.resource_class)
+        # TODO: if existing, update (https://github.com/aiondemand/AIOD-rest-api/issues/131)
+        with prefetched_named_relations(
+            session, connector.resource_class, resource_create_instances
+        ):
+            for item, resource_create_instance in zip(valid_items, resource_create_instances):
+                key = _resource_key(resource_create_instance)
+                if key in existing:
+                    continue
+                if isinstance(item, ResourceWithRelations):
+                    _create_or_fetch_related_objects(session, item, commit=False)
+                router.create_resource(session, resource_create_instance, commit=False)
+                existing.add(key)
+            session.flush()
+        session.commit()
+    except Exception:
+        session.rollback()
+        logging.warning(
+            f"Storing a batch of {len(valid_items)} records failed. Retrying record by record."
+        )
+        for item in valid_items:
+            error = save_to_database(session=session, connector=connector, router=router, item=item)
+            if error is not None:
+                errors.append(error)
+    return errors
+
+
+def _write_error(error_path: pathlib.Path, error: RecordError):
+    if error.ignore:
+        return
+    if isinstance(error.error, str):
+        logging.error(f"Error on identifier {error.identifier}: {error.error}")
+    else:
+        logging.error(f"Error on identifier {error.identifier}", exc_info=error.error)
+    with open(error_path, "a") as f:
+        error_cleaned = "".join(c if c.isalnum() or c == "" else "_" for c in str(error.error))
+        f.write(f'"{error.identifier}","{error_cleaned}"\n')
+
+
+def synchronize(
+    items: Iterator[RESOURCE | ResourceWithRelations[RESOURCE] | RecordError],
+    connector: ResourceConnector,
+    router: ResourceRouter,
+    state: dict,
+    state_path: pathlib.Path,
+    error_path: pathlib.Path,
+    batch_size: int = 1,
+    save_every: int | None = None,
+    recycle_session_every: int | None = None,
+):
+    """
+    Store all items, in batches of batch_size. Every recycle_session_every items, the session is
+    closed and a new session is used, so that the memory used by the session does not grow with
+    the number of items.
+    """
+
+    def save(
+        session: Session, batch: list[RESOURCE | ResourceWithRelations[RESOURCE] | RecordError]
+    ):
+        if len(batch) == 1:
+            error = save_to_database(
+                router=router, connector=connector, session=session, item=batch[0]
+            )
+            errors = [error] if error is not None else []
+        else:
+            errors = save_batch_to_database(
+                router=router, connector=connector, session=session, items=batch
+            )
+        for error in errors:
+            _write_error(error_path, error)
+
+    items = iter(items)
+    i = 0
+    while True:
+        i_session_start = i
+        with DbSession() as session:
+            batch: list[RESOURCE | ResourceWithRelations[RESOURCE] | RecordError] = []
+            for item in itertools.islice(items, recycle_session_every or None):
+                batch.append(item)
+                save_state = bool(save_every and i > 0 and i % save_every == 0)
+                if len(batch) >= batch_size or save_state:
+                    save(session, batch)
+                    batch = []
+                if save_state:
+                    logging.info(f"Saving state after handling {i}th result: {json.dumps(state)}")
+                    with open(state_path, "w") as f:
+                        json.dump(state, f, indent=4)
+                i += 1
+            if batch:
+                save(session, batch)
+        if not recycle_session_every:
+            break
+        _log_peak_memory(i)
+        if i - i_session_start < recycle_session_every:
+            break  # all items are handled
+
+
+def _log_peak_memory(n_handled: int):
+    peak_memory_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    logging.info(f"Handled {n_handled} results. Peak memory usage: {peak_memory_mb:.0f} MB")
+
+
 def main():
     args = _parse_args()
 
@@ -162,26 +311,17 @@ def main():
         if router.resource_class == connector.resource_class
     ]
 
-    with DbSession() as session:
-        for i, item in enumerate(items):
-            error = save_to_database(router=router, connector=connector, session=session, item=item)
-            if error:
-                if not error.ignore:
-                    if isinstance(error.error, str):
-                        logging.error(f"Error on identifier {error.identifier}: {error.error}")
-                    else:
-                        logging.error(
-                            f"Error on identifier {error.identifier}", exc_info=error.error
-                        )
-                    with open(error_path, "a") as f:
-                        error_cleaned = "".join(
-                            c if c.isalnum() or c == "" else "_" for c in str(error.error)
-                        )
-                        f.write(f'"{error.identifier}","{error_cleaned}"\n')
-            if args.save_every and i > 0 and i % args.save_every == 0:
-                logging.info(f"Saving state after handling {i}th result: {json.dumps(state)}")
-                with open(state_path, "w") as f:
-                    json.dump(state, f, indent=4)
+    synchronize(
+        items,
+        connector=connector,
+        router=router,
+        state=state,
+        state_path=state_path,
+        error_path=error_path,
+        batch_size=args.batch_size,
+        save_every=args.save_every,
+        recycle_session_every=args.recycle_session_every,
+    )
     with open(state_path, "w") as f:
         json.dump(state, f, indent=4)
     logging.info("Done")
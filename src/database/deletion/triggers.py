@@ -7,10 +7,13 @@ tables are referenced by multiple tables. See src/README.md for additional infor
 
 from typing import Type
 
-from sqlalchemy import DDL, event
+from sqlalchemy import DDL, event, select
+from sqlalchemy.engine import Engine
 from sqlmodel import SQLModel
 
 from database.model.helper_functions import get_relationships, non_abstract_subclasses
+from database.model.named_relation import NamedRelation
+from database.model.named_relation_cache import NamedRelationGeneration
 
 
 def add_delete_triggers(parent_class: Type[SQLModel]):
@@ -20,6 +23,48 @@ def add_delete_triggers(parent_class: Type[SQLModel]):
             value.create_triggers(cls, name)
 
 
+def add_deletion_log_triggers(engine: Engine):
+    """
+    (Re)create the triggers counting the deletions of NamedRelations, and the row holding the
+    count. Unlike the other triggers, they are installed on every startup, so that existing
+    databases get them as well. Call it after the tables are created.
+    """
+    with engine.begin() as connection:
+        if connection.execute(select(NamedRelationGeneration.identifier)).first() is None:
+            connection.execute(NamedRelationGeneration.__table__.insert())
+        for named_relation in non_abstract_subclasses(NamedRelation):
+            for ddl in deletion_log_trigger(named_relation, NamedRelationGeneration):
+                connection.execute(ddl)
+
+
+def deletion_log_trigger(trigger: Type[SQLModel], counter: Type[SQLModel]) -> list[DDL]:
+    """
+    The statements (re)creating a trigger that increments the generation of the counter table for
+    every deleted row of the trigger table, so that other processes can notice deletions,
+    including the ones by other triggers. Concurrent deletions only contend for the lock on the
+    single row of the counter.
+
+    Args:
+        trigger: The table of which the deletions are counted
+        counter: The table with a single row, of which the generation is incremented
+    """
+    trigger_name = trigger.__tablename__
+    counter_name = counter.__tablename__
+
+    drop = DDL(f"DROP TRIGGER IF EXISTS log_{trigger_name}_deletion")
+    create = DDL(
+        f"""
+        CREATE TRIGGER log_{trigger_name}_deletion
+        AFTER DELETE ON {trigger_name}
+        FOR EACH ROW
+        BEGIN
+            UPDATE {counter_name} SET generation = generation + 1;
+        END;
+        """
+    )
+    return [drop, create]
+
+
 def create_deletion_trigger_one_to_one(
     trigger: Type[SQLModel],
     to_delete: Type[SQLModel],
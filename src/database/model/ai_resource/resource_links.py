@@ -0,0 +1,72 @@
+"""
+The links between AIResources (see AI_RESOURCE_LINKS) are part of the read model of the resources
+on both sides. Linking resource A to resource B (e.g. A.has_part) changes B as well (its
+is_part_of), while only A is changed. So for every added or removed link, the
+aiod_entry.date_modified of the resources on both sides is updated, after the flush, so that their
+ETags and the change feed reflect the change.
+
+The changes are collected by SQLAlchemy session events, so that they are seen regardless of how
+the links are changed (a POST, PUT or PATCH, or a connector), and also if they were flushed
+early by an autoflush.
+"""
+import datetime
+
+from sqlalchemy import event, inspect, select, update
+from sqlalchemy.orm import Session
+
+from database.model.ai_resource.resource import AbstractAIResource
+from database.model.ai_resource.resource_table import AI_RESOURCE_LINKS, AIResourceORM
+from database.model.concept.aiod_entry import AIoDEntryORM
+from database.model.helper_functions import non_abstract_subclasses
+
+PENDING_LINKED_RESOURCES = "pending_linked_ai_resources"
+
+
+def changed_links(session: Session) -> list[AIResourceORM]:
+    """The ai_resources on both sides of the links that were added or removed in this session
+    since the last flush. Their identifiers are only known after the flush, if they are new."""
+    ai_resources = []
+    for ai_resource in [*session.new, *session.dirty]:
+        if not isinstance(ai_resource, AIResourceORM):
+            continue
+        state = inspect(ai_resource)
+        for link in AI_RESOURCE_LINKS:
+            history = state.attrs[link].history  # without loading the links
+            if history.added or history.deleted:
+                ai_resources += [ai_resource, *history.added, *history.deleted]
+    return ai_resources
+
+
+@event.listens_for(Session, "before_flush")
+def _register_linked_resources(session: Session, flush_context, instances):
+    ai_resources = changed_links(session)
+    if ai_resources:
+        session.info.setdefault(PENDING_LINKED_RESOURCES, []).extend(ai_resources)
+
+
+@event.listens_for(Session, "after_flush")
+def _touch_linked_resources(session: Session, flush_context):
+    ai_resources = session.info.pop(PENDING_LINKED_RESOURCES, None)
+    if not ai_resources:
+        return
+    identifiers_per_type: dict[str, set[int]] = {}
+    for ai_resource in ai_resources:
+        identifiers_per_type.setdefault(ai_resource.type, set()).add(ai_resource.identifier)
+    now = datetime.datetime.utcnow()
+    for resource_class in non_abstract_subclasses(AbstractAIResource):
+        identifiers = identifiers_per_type.get(resource_class.__tablename__)
+        if not identifiers:
+            continue
+        aiod_entries = select(resource_class.aiod_entry_identifier).where(
+            resource_class.ai_resource_id.in_(sorted(identifiers))
+        )
+        session.connection().execute(
+            update(AIoDEntryORM)
+            .where(AIoDEntryORM.identifier.in_(aiod_entries))  # type: ignore[attr-defined]
+            .values(date_modified=now)
+        )
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard(session: Session):
+    session.info.pop(PENDING_LINKED_RESOURCES, None)
@@ -4,6 +4,9 @@ The AIResource table, which is linked to every child of the AbstractAIResource (
 
 from sqlmodel import SQLModel, Field, Relationship
 
+# The relationships between AIResources. Each link is part of the read model of both resources.
+AI_RESOURCE_LINKS = ("is_part_of", "has_part", "relevant_resource", "relevant_to")
+
 
 class AIResourcePartLink(SQLModel, table=True):  # type: ignore [call-arg]
     __tablename__ = "ai_resource_part_link"
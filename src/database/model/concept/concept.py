@@ -68,7 +68,7 @@ class AIoDConceptBase(SQLModel):
 
 class AIoDConcept(AIoDConceptBase):
     identifier: int = Field(default=None, primary_key=True)
-    date_deleted: datetime.datetime | None = Field()
+    date_deleted: datetime.datetime | None = Field(index=True)
     aiod_entry_identifier: int | None = Field(
         foreign_key=AIoDEntryORM.__tablename__ + ".identifier",
         unique=True,
@@ -0,0 +1,97 @@
+"""
+Eager loading of the relationships of a resource, based on its RelationshipConfig.
+
+Serializing a resource (e.g. using DatasetRead.from_orm) touches all its relationships. Without
+eager loading, every relationship of every resource results in a separate (lazy) SELECT. By
+configuring the loading strategy on the query instead, the number of queries needed to serialize
+a page of resources is bounded by the number of relationships, independent of the page size.
+
+To go through all resources, use in_batches instead of yield_per. The latter uses a server-side
+cursor, and MySQL does not allow the additional SELECTs of the eager (or lazy) loads on that
+connection while the cursor is open.
+"""
+
+import functools
+from typing import Any, Iterator, Type
+
+from sqlalchemy import Select, inspect
+from sqlalchemy.orm import Load, Session, joinedload, selectinload
+from sqlmodel import SQLModel
+
+from database.model.helper_functions import get_relationships
+from database.model.serializers import CastDeserializer
+
+
+@functools.lru_cache(maxsize=256)  # bounded, since the attributes can be chosen by a client
+def eager_loading_options(
+    resource_class: Type[SQLModel], attributes: frozenset[str] | None = None
+) -> tuple[Load, ...]:
+    """
+    The loader options for a select on this resource class, loading all relationships that are
+    needed to serialize it. Usage: `select(Dataset).options(*eager_loading_options(Dataset))`.
+
+    If attributes are given, only the relationships needed to serialize those attributes are
+    loaded, e.g. `eager_loading_options(Dataset, frozenset({"keyword"}))`.
+    """
+    return tuple(
+        _loading_options(resource_class, visited=frozenset({resource_class}), attributes=attributes)
+    )
+
+
+def in_batches(
+    session: Session, query: Select, resource_class: Any, batch_size: int
+) -> Iterator[Any]:
+    """
+    Yield the resources of this select on the resource class, ordered by identifier. They are
+    fetched in batches of batch_size, seeking on the identifier, so that each batch (including
+    its eager loads) is completely fetched before the next one.
+    """
+    last_identifier = None
+    while True:
+        batch = query.order_by(resource_class.identifier).limit(batch_size)
+        if last_identifier is not None:
+            batch = batch.where(resource_class.identifier > last_identifier)
+        resources = session.scalars(batch).all()
+        yield from resources
+        if len(resources) < batch_size:
+            return
+        last_identifier = resources[-1].identifier
+
+
+def _loading_options(
+    resource_class: Type[SQLModel],
+    visited: frozenset[Type[SQLModel]],
+    attributes: frozenset[str] | None = None,
+) -> Iterator[Load]:
+    relationships_orm = inspect(resource_class).relationships
+    for attribute, config in get_relationships(resource_class).items():
+        if attributes is not None and attribute not in attributes:
+            continue
+        if config.deserialized_path is not None:
+            # e.g. Dataset.has_part, which is stored as Dataset.ai_resource_identifier.has_part
+            if config.deserialized_path not in relationships_orm:
+                continue
+            path_relationship = relationships_orm[config.deserialized_path]
+            inner_class = path_relationship.mapper.class_
+            loader = _loader(resource_class, config.deserialized_path, path_relationship.uselist)
+            inner_relationship = inspect(inner_class).relationships[attribute]
+            yield loader.options(_loader(inner_class, attribute, inner_relationship.uselist))
+        elif attribute in relationships_orm:
+            relationship = relationships_orm[attribute]
+            loader = _loader(resource_class, attribute, relationship.uselist)
+            related_class = relationship.mapper.class_
+            is_embedded = isinstance(config.deserializer, CastDeserializer)
+            if is_embedded and related_class not in visited:
+                # The related object is serialized completely (e.g. Dataset.aiod_entry), so its
+                # own relationships need to be loaded as well.
+                inner_options = tuple(_loading_options(related_class, visited | {related_class}))
+                if inner_options:
+                    loader = loader.options(*inner_options)
+            yield loader
+
+
+def _loader(clazz: Type[SQLModel], attribute: str, uselist: bool) -> Load:
+    """Collections are loaded using a separate SELECT ... IN, single objects using a JOIN."""
+    if uselist:
+        return selectinload(getattr(clazz, attribute))
+    return joinedload(getattr(clazz, attribute))
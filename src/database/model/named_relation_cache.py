@@ -0,0 +1,182 @@
+"""
+A process-wide cache of the identifiers of NamedRelations (e.g. keywords and licenses) by name,
+so that the FindByNameDeserializers do not have to query the database for every name. There is
+a separate LRU cache per NamedRelation class, filled lazily by the deserializers.
+
+The identifiers found or inserted within a session are only added to the cache when the
+session commits, so that the identifiers of rolled back inserts never end up in the cache.
+Missing names are inserted in a savepoint: if another session inserted the same name
+concurrently, the unique constraint is violated and the existing row is used instead.
+
+NamedRelations are removed by the orphan-deletion triggers (see database/deletion/triggers.py)
+when the last resource referring to them is deleted, possibly by another process, such as the
+hard_delete script. Every deleted NamedRelation increments the generation in the single row of
+the named_relation_generation table, using a trigger as well. The generation is read once per
+transaction, and the cache is cleared if it changed.
+"""
+import threading
+from typing import Iterable, Type
+
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.orm.util import identity_key
+from sqlmodel import Field, SQLModel, select
+
+from caching import TTLCache
+from config import CACHE_CONFIG
+from database.model.named_relation import NamedRelation
+
+PENDING_NAMED_RELATIONS = "pending_named_relations"
+GENERATION = "named_relation_generation"
+MAX_INSERT_ATTEMPTS = 3
+
+
+class NamedRelationGeneration(SQLModel, table=True):  # type: ignore [call-arg]
+    """The number of deleted NamedRelations, in a single row. It is incremented by the triggers
+    created by add_deletion_log_triggers."""
+
+    __tablename__ = "named_relation_generation"
+
+    identifier: int = Field(default=1, primary_key=True)
+    generation: int = Field(default=0)
+
+
+class NamedRelationCache:
+    def __init__(self, maxsize: int, max_age: float):
+        """
+        Args:
+            maxsize: the maximum number of names per NamedRelation class.
+            max_age: the maximum number of seconds that an identifier is cached.
+        """
+        self.maxsize = maxsize
+        self.max_age = max_age
+        self._caches: dict[Type[NamedRelation], TTLCache[int]] = {}
+        self._generation: int | None = None
+        self._lock = threading.Lock()
+
+    def get(self, clazz: Type[NamedRelation], name: str) -> int | None:
+        return self._cache(clazz).get(name)
+
+    def set(self, clazz: Type[NamedRelation], name: str, identifier: int, generation: int | None):
+        """Cache the identifier, if it was retrieved in the current generation."""
+        if generation == self._generation:
+            self._cache(clazz).set(name, identifier)
+
+    def validate(self, generation: int | None):
+        """Clear the cache if NamedRelations were deleted since it was filled."""
+        with self._lock:
+            if generation != self._generation:
+                self._clear()
+                self._generation = generation
+
+    def clear(self):
+        with self._lock:
+            self._clear()
+            self._generation = None
+
+    def _clear(self):
+        for cache in self._caches.values():
+            cache.clear()
+
+    def _cache(self, clazz: Type[NamedRelation]) -> TTLCache[int]:
+        with self._lock:
+            if clazz not in self._caches:
+                self._caches[clazz] = TTLCache[int](maxsize=self.maxsize, max_age=self.max_age)
+            return self._caches[clazz]
+
+
+named_relation_cache = NamedRelationCache(
+    maxsize=CACHE_CONFIG.get("named_relations_size", 10000),
+    max_age=CACHE_CONFIG.get("named_relations_max_age", 600),
+)
+
+
+def find_or_create(
+    session: Session, clazz: Type[NamedRelation], names: Iterable[str]
+) -> list[NamedRelation]:
+    """
+    The NamedRelations with these (lowercase) names, inserting the missing ones. Only the names
+    that are not cached are queried.
+    """
+    _validate_cache(session)
+    pending = session.info.setdefault(PENDING_NAMED_RELATIONS, {})
+    found = []
+    names_to_query = set()
+    for name in names:
+        identifier = pending.get((clazz, name)) or named_relation_cache.get(clazz, name)
+        if identifier is None:
+            names_to_query.add(name)
+        else:
+            found.append(_attached(session, clazz, identifier, name))
+    if names_to_query:
+        query = select(clazz).where(clazz.name.in_(names_to_query))  # type: ignore[attr-defined]
+        existing = list(session.scalars(query).all())
+        missing = names_to_query - {e.name for e in existing}
+        new_objects = _insert(session, clazz, missing) if missing else []
+        # The session can have been rolled back to the savepoint in _insert
+        pending = session.info.setdefault(PENDING_NAMED_RELATIONS, {})
+        for named_relation in existing + new_objects:
+            pending[(clazz, named_relation.name)] = named_relation.identifier
+        found += existing + new_objects
+    return found
+
+
+def _validate_cache(session: Session):
+    """Read the generation of the NamedRelations once per transaction, and clear the cache if
+    it changed."""
+    if GENERATION not in session.info:
+        query = select(NamedRelationGeneration.generation)
+        session.info[GENERATION] = session.scalar(query)
+        named_relation_cache.validate(session.info[GENERATION])
+
+
+def _insert(
+    session: Session, clazz: Type[NamedRelation], names: set[str], attempt: int = 1
+) -> list[NamedRelation]:
+    new_objects = [clazz(name=name) for name in names]
+    try:
+        with session.begin_nested():
+            session.add_all(new_objects)
+        return new_objects
+    except IntegrityError:
+        if attempt >= MAX_INSERT_ATTEMPTS:
+            raise
+    # Some of the names were inserted concurrently. A locking read returns the latest committed
+    # rows, also under the repeatable read isolation level.
+    query = (
+        select(clazz)
+        .where(clazz.name.in_(names))  # type: ignore[attr-defined]
+        .with_for_update(read=True)
+    )
+    existing = list(session.scalars(query).all())
+    missing = names - {e.name for e in existing}
+    return existing + (_insert(session, clazz, missing, attempt + 1) if missing else [])
+
+
+def _attached(
+    session: Session, clazz: Type[NamedRelation], identifier: int, name: str
+) -> NamedRelation:
+    """The NamedRelation with this identifier as part of the session, without querying it."""
+    instance = session.identity_map.get(identity_key(clazz, identifier))
+    if instance is None:
+        instance = clazz(identifier=identifier, name=name)
+        make_transient_to_detached(instance)
+        session.add(instance)
+    return instance
+
+
+@event.listens_for(Session, "after_commit")
+def _publish(session: Session):
+    if session.in_nested_transaction():
+        return
+    pending = session.info.pop(PENDING_NAMED_RELATIONS, {})
+    generation = session.info.pop(GENERATION, None)
+    for (clazz, name), identifier in pending.items():
+        named_relation_cache.set(clazz, name, identifier, generation)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard(session: Session):
+    session.info.pop(PENDING_NAMED_RELATIONS, None)
+    session.info.pop(GENERATION, None)
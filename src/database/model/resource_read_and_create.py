@@ -5,9 +5,10 @@ not be able to modify this date yourself in a POST request, but you should retri
 request.
 """
 
-from typing import Type, Tuple, TYPE_CHECKING
+import copy
+from typing import Optional, Type, Tuple, TYPE_CHECKING
 
-from pydantic import create_model
+from pydantic import create_model, root_validator
 from sqlmodel import SQLModel, Field
 from sqlmodel.main import FieldInfo
 
@@ -75,6 +76,40 @@ def resource_create(resource_class: Type["AIoDConcept"]) -> Type[SQLModel]:
     return model
 
 
+def resource_patch(resource_class_create: Type[SQLModel]) -> Type[SQLModel]:
+    """
+    Create a SQLModel for a Patch class of a resource, based on its Create class. This Patch class
+    is a Pydantic class that can be used for PATCH requests, which contain a partial resource: all
+    fields are optional, and only the fields that are present in the request (the
+    `__fields_set__`) should be updated. The fields that are required in the Create class cannot be
+    set to null.
+    """
+    field_definitions = {}
+    for name, field in resource_class_create.__fields__.items():
+        field_info = copy.copy(field.field_info)
+        field_info.default = None
+        field_info.default_factory = None
+        field_definitions[name] = (Optional[field.outer_type_], field_info)
+    required = {name for name, field in resource_class_create.__fields__.items() if field.required}
+
+    def required_fields_not_null(cls, values: dict) -> dict:
+        if nulls := sorted(name for name in required if name in values and values[name] is None):
+            raise ValueError(f"The required fields cannot be null: {', '.join(nulls)}.")
+        return values
+
+    model = create_model(
+        resource_class_create.__name__.removesuffix("Create") + "Patch",
+        __base__=resource_class_create,
+        __validators__={
+            "required_fields_not_null": root_validator(pre=True, allow_reuse=True)(
+                required_fields_not_null
+            )
+        },
+        **field_definitions,
+    )
+    return model
+
+
 def resource_read(resource_class: Type["AIoDConcept"]) -> Type[SQLModel]:
     """
     Create a SQLModel for a Read class of a resource. This Read class is a Pydantic class
@@ -1,6 +1,9 @@
 import abc
+import collections
 import dataclasses
-from typing import Any, TypeVar, Generic, Dict, List, Type
+from contextlib import contextmanager
+from typing import Any, TypeVar, Generic, Dict, List, Type, Iterator, Sequence, TYPE_CHECKING
+from typing import Collection
 
 from fastapi import HTTPException
 from pydantic.utils import GetterDict
@@ -9,9 +12,16 @@ from starlette.status import HTTP_404_NOT_FOUND
 
 from database.model.helper_functions import get_relationships
 from database.model.named_relation import NamedRelation
+from database.model.named_relation_cache import find_or_create
+
+if TYPE_CHECKING:
+    from database.model.relationships import _ResourceRelationship
 
 MODEL = TypeVar("MODEL", bound=SQLModel)
 
+# Key in Session.info under which the NamedRelations are stored that are prefetched for a batch
+PREFETCHED_NAMED_RELATIONS = "prefetched_named_relations"
+
 
 class Serializer(abc.ABC, Generic[MODEL]):
     """Serialization from Pydantic class to ORM class"""
@@ -137,14 +147,11 @@ class FindByNameDeserializer(DeSerializer[NamedRelation]):
                 "Expected a single value. Do you need to use " "FindByNameDeserializerList instead?"
             )
         name = name.lower()
-        query = select(self.clazz.identifier).where(self.clazz.name == name)
-        identifier = session.scalars(query).first()
-        if identifier is None:
-            new_object = self.clazz(name=name)
-            session.add(new_object)
-            session.flush()
-            identifier = new_object.identifier
-        return identifier
+        prefetched = session.info.get(PREFETCHED_NAMED_RELATIONS, {})
+        if (self.clazz, name) in prefetched:
+            return prefetched[(self.clazz, name)].identifier
+        (named_relation,) = find_or_create(session, self.clazz, [name])
+        return named_relation.identifier
 
 
 @dataclasses.dataclass
@@ -158,15 +165,13 @@ class FindByNameDeserializerList(DeSerializer[NamedRelation]):
             return []
         if not isinstance(name, list):
             raise ValueError("Expected a list. Do you need to use FindByNameDeserializer instead?")
-        names = [n.lower() for n in name]
-        query = select(self.clazz).where(self.clazz.name.in_(names))  # type: ignore[attr-defined]
-        existing = session.scalars(query).all()
-        names_not_found = set(names) - {e.name for e in existing}
-        new_objects = [self.clazz(name=name) for name in names_not_found]
-        if any(names_not_found):
-            session.add_all(new_objects)
-            session.flush()
-        return sorted(existing + new_objects, key=lambda o: o.identifier)
+        names = {n.lower() for n in name}
+        prefetched = session.info.get(PREFETCHED_NAMED_RELATIONS, {})
+        found = [prefetched[(self.clazz, n)] for n in names if (self.clazz, n) in prefetched]
+        names_to_query = names - {f.name for f in found}
+        if names_to_query:
+            found += find_or_create(session, self.clazz, names_to_query)
+        return sorted(found, key=lambda o: o.identifier)
 
 
 @dataclasses.dataclass
@@ -207,6 +212,55 @@ class CastDeserializerList(CastDeserializer):
         return [self._deserialize_single_resource(v, session) for v in serialized]
 
 
+@dataclasses.dataclass(frozen=True)
+class DeserializationPlan:
+    """
+    The reflective work needed to deserialize a resource class, which is the same for every
+    request. Computed once per class by deserialization_plan.
+
+    Args:
+        attributes: the names of the properties of the (pydantic) schema, copied on an update.
+        relationships: the relationships of the RelationshipConfig.
+        named_relations: the relationships that use a FindByNameDeserializer(List), with their
+            NamedRelation class.
+        nested_classes: the relationships to objects that are completely present in the json
+            (using a CastDeserializer(List)), with their class.
+    """
+
+    attributes: tuple[str, ...]
+    relationships: tuple[tuple[str, "_ResourceRelationship"], ...]
+    named_relations: tuple[tuple[str, Type[NamedRelation]], ...]
+    nested_classes: tuple[tuple[str, Type[SQLModel]], ...]
+
+
+_deserialization_plans: dict[Any, DeserializationPlan] = {}
+
+
+def deserialization_plan(resource_class: Type[SQLModel]) -> DeserializationPlan:
+    """The DeserializationPlan of this class, computed once per class."""
+    if resource_class not in _deserialization_plans:
+        _deserialization_plans[resource_class] = _create_deserialization_plan(resource_class)
+    return _deserialization_plans[resource_class]
+
+
+def _create_deserialization_plan(resource_class: Type[SQLModel]) -> DeserializationPlan:
+    relationships = get_relationships(resource_class)
+    named_relations = []
+    nested_classes = []
+    for attribute, relationship in relationships.items():
+        deserializer = relationship.deserializer
+        if isinstance(deserializer, (FindByNameDeserializer, FindByNameDeserializerList)):
+            named_relations.append((attribute, deserializer.clazz))
+        elif isinstance(deserializer, CastDeserializer):
+            nested_classes.append((attribute, deserializer.clazz))
+    return DeserializationPlan(
+        attributes=tuple(resource_class.schema()["properties"]),
+        relationships=tuple(relationships.items()),
+        named_relations=tuple(named_relations),
+        nested_classes=tuple(nested_classes),
+    )
+
+
 def create_getter_dict(attribute_serializers: Dict[str, Serializer]):
     """Based on a dictionary of `variable_name, Serializer`, generate a `getter_dict`. A
     `getter_dict` is used by Pydantic to perform serialization.
@@ -214,24 +268,72 @@ def create_getter_dict(attribute_serializers: Dict[str, Serializer]):
     We have added a layer of Serializers instead of directly using a getter_dict, to make it
     easier to configure the serialization per object attribute, instead of for each complete
     object."""
-    attribute_names = set(attribute_serializers.keys())
+    # Bound once, instead of looked up for every attribute of every serialized object
+    methods = {
+        key: (serializer.value, serializer.serialize)
+        for key, serializer in attribute_serializers.items()
+    }
 
     class GetterDictSerializer(GetterDict):
         def get(self, key: Any, default: Any = None) -> Any:
-            # if key == "has_part" and hasattr(self._obj, "ai_resource"):
-            #     return [p.identifier for p in self._obj.ai_resource.has_part]
-            if key in attribute_names:
-                serializer = attribute_serializers[key]
-                attribute_value = serializer.value(model=self._obj, attribute_name=key)
+            if key in methods:
+                value, serialize = methods[key]
+                attribute_value = value(model=self._obj, attribute_name=key)
                 if attribute_value is not None:
                     if isinstance(attribute_value, list):
-                        return [serializer.serialize(v) for v in attribute_value]
-                    return serializer.serialize(attribute_value)
+                        return [serialize(v) for v in attribute_value]
+                    return serialize(attribute_value)
             return super().get(key, default)
 
     return GetterDictSerializer
 
 
+@contextmanager
+def prefetched_named_relations(
+    session: Session, resource_class: Type[SQLModel], resource_create_instances: Sequence[Any]
+) -> Iterator[None]:
+    """
+    Resolve all NamedRelations (e.g. keywords and licenses) of a batch of resources using a single
+    IN-query per table for the names that are not cached, creating the missing ones, so that the
+    FindByNameDeserializers do not have to query the database for every single resource.
+
+    The prefetched values are only valid within the current transaction, so this context should
+    be closed before committing or rolling back.
+    """
+    names: dict[type[NamedRelation], set[str]] = collections.defaultdict(set)
+    for resource_create_instance in resource_create_instances:
+        _collect_named_relations(resource_class, resource_create_instance, names)
+    prefetched: dict[tuple[type[NamedRelation], str], NamedRelation] = {}
+    for clazz, names_clazz in names.items():
+        found = find_or_create(session, clazz, names_clazz)
+        prefetched.update({(clazz, o.name): o for o in found})
+    session.info[PREFETCHED_NAMED_RELATIONS] = prefetched
+    try:
+        yield
+    finally:
+        session.info.pop(PREFETCHED_NAMED_RELATIONS, None)
+
+
+def _collect_named_relations(
+    resource_class: Type[SQLModel],
+    resource_create_instance: Any,
+    names: dict[type[NamedRelation], set[str]],
+):
+    """Add the names of all NamedRelations of this instance (including nested objects) to
+    `names`."""
+    plan = deserialization_plan(resource_class)
+    for attribute, named_relation_class in plan.named_relations:
+        value = getattr(resource_create_instance, attribute, None)
+        if value is not None:
+            values = value if isinstance(value, list) else [value]
+            names[named_relation_class].update(v.lower() for v in values)
+    for attribute, nested_class in plan.nested_classes:
+        value = getattr(resource_create_instance, attribute, None)
+        if value is not None:
+            for nested_instance in value if isinstance(value, list) else [value]:
+                _collect_named_relations(nested_class, nested_instance, names)
+
+
 def deserialize_resource_relationships(
     session: Session,
     resource_class: Type[SQLModel],
@@ -242,8 +344,8 @@ def deserialize_resource_relationships(
     objects in place."""
     if not hasattr(resource_class, "RelationshipConfig") or resource_create_instance is None:
         return
-    relationships = get_relationships(resource_class)
-    for attribute, relationship in relationships.items():
+    plan = deserialization_plan(resource_class)
+    for attribute, relationship in plan.relationships:
         if relationship.deserialized_path is None:
             new_value = None
             do_update_value = False
@@ -286,7 +388,7 @@ def deserialize_resource_relationships(
                     new_value = relationship.deserializer.deserialize(session, new_value)
                 setattr(resource, relationship.attribute(attribute), new_value)
 
-    for attribute, relationship in relationships.items():
+    for attribute, relationship in plan.relationships:
         if relationship.deserialized_path is not None:
             new_value = getattr(resource_create_instance, attribute)
             if relationship.deserializer:
@@ -308,8 +410,9 @@ def deserialize_object_relationship(session, resource, resource_create_instance,
         children = [children]
         children_create = [children_create]
     child_class = type(children[0])
+    child_attributes = deserialization_plan(child_class).attributes
     for child, child_create in zip(children, children_create):
-        for child_attribute in child_class.schema()["properties"]:
+        for child_attribute in child_attributes:
             if hasattr(child_create, child_attribute):
                 child_value = getattr(child_create, child_attribute)
                 setattr(child, child_attribute, child_value)
@@ -322,3 +425,110 @@ def deserialize_object_relationship(session, resource, resource_create_instance,
         child = child_class.from_orm(child_create)
         deserialize_resource_relationships(session, child_class, child, child_create)
         children.append(child)
+
+
+def patch_resource(
+    session: Session,
+    resource_class: Type[SQLModel],
+    resource: SQLModel,
+    resource_patch_instance: SQLModel,
+    fields: Collection[str],
+) -> bool:
+    """
+    In place update of the given fields of the resource (including its related objects), writing
+    only the values that differ: unchanged columns are not set, and collections are updated by
+    adding and removing the difference, instead of being replaced. Returns whether anything
+    changed.
+    """
+    plan = deserialization_plan(resource_class)
+    relationships = dict(plan.relationships)
+    changed = False
+    for attribute in plan.attributes:
+        if attribute in fields and attribute not in relationships:
+            new_value = getattr(resource_patch_instance, attribute)
+            if getattr(resource, attribute) != new_value:
+                setattr(resource, attribute, new_value)
+                changed = True
+    for attribute, relationship in plan.relationships:
+        if attribute not in fields or not relationship.include_in_create:
+            continue
+        new_value = getattr(resource_patch_instance, attribute)
+        target = (
+            resource
+            if relationship.deserialized_path is None
+            else getattr(resource, relationship.deserialized_path)
+        )
+        deserializer = relationship.deserializer
+        if isinstance(deserializer, CastDeserializer):
+            changed |= _patch_objects(session, target, attribute, deserializer, new_value)
+        elif isinstance(
+            deserializer, (FindByNameDeserializerList, FindByIdentifierDeserializerList)
+        ):
+            changed |= _patch_collection(
+                session, getattr(target, attribute), deserializer, new_value
+            )
+        else:
+            if deserializer is not None:
+                new_value = deserializer.deserialize(session, new_value)
+            if getattr(target, relationship.attribute(attribute)) != new_value:
+                setattr(target, relationship.attribute(attribute), new_value)
+                changed = True
+    return changed
+
+
+def _patch_collection(
+    session: Session,
+    collection: list[SQLModel],
+    deserializer: FindByNameDeserializerList | FindByIdentifierDeserializerList,
+    new_value: list | None,
+) -> bool:
+    """Update a many-to-many collection in place, so that only the link rows of the added and
+    removed objects are written."""
+    if isinstance(deserializer, FindByNameDeserializerList):
+        new_keys = {name.lower() for name in new_value or []}
+        current = {o.name: o for o in collection}
+    else:
+        new_keys = set(new_value or [])
+        current = {o.identifier: o for o in collection}
+    removed = [o for key, o in current.items() if key not in new_keys]
+    added = new_keys - current.keys()
+    for o in removed:
+        collection.remove(o)
+    if added:
+        collection.extend(deserializer.deserialize(session, sorted(added)))
+    return bool(removed or added)
+
+
+def _patch_objects(
+    session: Session,
+    resource: SQLModel,
+    attribute: str,
+    deserializer: CastDeserializer,
+    new_value: Any,
+) -> bool:
+    """Update the objects that are completely present in the json (e.g. the description or the
+    distributions) in place. The objects of a list are patched pairwise, as a whole."""
+    current = getattr(resource, attribute)
+    if isinstance(deserializer, CastDeserializerList):
+        new_values = new_value or []
+        n_new, n_existing = len(new_values), len(current)
+        changed = n_new != n_existing
+        for child, child_patch in zip(current, new_values):
+            changed |= patch_resource(
+                session, deserializer.clazz, child, child_patch, child_patch.__fields__.keys()
+            )
+        for child in current[n_new:]:
+            session.delete(child)
+        for child_patch in new_values[n_existing:]:
+            current.append(CastDeserializer(deserializer.clazz).deserialize(session, child_patch))
+        return changed
+    if new_value is None:
+        if current is None:
+            return False
+        session.delete(current)
+        setattr(resource, attribute, None)
+        return True
+    if current is None:
+        setattr(resource, attribute, deserializer.deserialize(session, new_value))
+        return True
+    return patch_resource(session, deserializer.clazz, current, new_value, new_value.__fields_set__)
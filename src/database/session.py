@@ -1,14 +1,156 @@
 """
 Enabling access to database sessions.
+
+The connection pool is configured in the [database] section of config.toml. Each worker thread
+that handles requests uses at most one connection at a time, so the pool is sized to the
+threadpool by default. The InstrumentedQueuePool keeps track of how long it takes to obtain a
+connection, so that the pool size can be tuned.
+
+Sessions with a read intent are routed to the read replicas, if configured. After a write, a
+client should read its own writes, which might not have been replicated yet. Within a
+`reads_from_primary()` block, read sessions therefore use the primary as well.
+
+The read endpoints are async, and use an AsyncDbSession instead, bound to an async engine (using
+asyncmy) with a connection pool of its own. Waiting for the database then does not hold a thread
+of the threadpool.
 """
 
-from contextlib import contextmanager
+import itertools
+import logging
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Iterator, Literal, Sequence
 
-from sqlalchemy.engine import Engine
+from sqlalchemy.engine import URL, Connection, Engine, make_url
+from sqlalchemy.exc import DBAPIError, TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
 from sqlmodel import Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from config import DB_CONFIG
 
+# The number of worker threads of each worker process, handling the synchronous endpoints
+THREADPOOL_SIZE = DB_CONFIG.get("threadpool_size", 40)
+
+# The async driver of each database backend
+ASYNC_DRIVERS = {"mysql": "mysql+asyncmy", "sqlite": "sqlite+aiosqlite"}
+
+_read_from_primary: ContextVar[bool] = ContextVar("read_from_primary", default=False)
+
+
+class PoolStatistics:
+    """The number of connection checkouts, and the time spent waiting for them."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, wait_seconds: float, timeout: bool = False):
+        with self._lock:
+            self.checkouts += 1
+            self.timeouts += timeout
+            self.wait_seconds_total += wait_seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, wait_seconds)
+
+    def as_dict(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": self.wait_seconds_total,
+                "wait_seconds_max": self.wait_seconds_max,
+                "wait_seconds_mean": (
+                    self.wait_seconds_total / self.checkouts if self.checkouts else 0.0
+                ),
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """A QueuePool that keeps track of the time it takes to check out a connection, including
+    the time waiting for a connection to be returned, and for creating a new connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.statistics = PoolStatistics()
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            self.statistics.record(time.perf_counter() - start, timeout=True)
+            raise
+        self.statistics.record(time.perf_counter() - start)
+        return connection
+
+
+class InstrumentedAsyncAdaptedQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    """The InstrumentedQueuePool of an async engine."""
+
+
+class ReplicaSet:
+    """
+    The engines of the read replicas. Connections are distributed over the replicas
+    round-robin. A replica that cannot be reached is skipped for retry_after seconds.
+
+    The async_engines, if given, connect to the same replicas as the engines (in the same order),
+    for the AsyncDbSessions.
+    """
+
+    def __init__(
+        self,
+        engines: Sequence[Engine],
+        async_engines: Sequence[AsyncEngine] = (),
+        retry_after: float = 30,
+    ):
+        self.engines = list(engines)
+        self.async_engines = list(async_engines)
+        self.retry_after = retry_after
+        self._counter = itertools.count()
+        self._unavailable_until: dict[int, float] = {}
+
+    def __len__(self) -> int:
+        return len(self.engines)
+
+    def connect(self) -> Connection | None:
+        """A connection to the next available replica, or None if none is available."""
+        for index in self._available():
+            try:
+                return self.engines[index].connect()
+            except DBAPIError:
+                self._set_unavailable(index)
+        return None
+
+    async def connect_async(self) -> AsyncConnection | None:
+        """An async connection to the next available replica, or None if none is available."""
+        for index in self._available():
+            try:
+                return await self.async_engines[index].connect()
+            except DBAPIError:
+                self._set_unavailable(index)
+        return None
+
+    def _available(self) -> Iterator[int]:
+        """The indices of the replicas that are not known to be unavailable, starting at the
+        next one."""
+        if not self.engines:
+            return
+        start = next(self._counter)
+        for i in range(len(self.engines)):
+            index = (start + i) % len(self.engines)
+            if self._unavailable_until.get(index, 0) <= time.monotonic():
+                yield index
+
+    def _set_unavailable(self, index: int):
+        logging.exception(f"Read replica {self.engines[index].url!r} is unavailable.")
+        self._unavailable_until[index] = time.monotonic() + self.retry_after
+
 
 class EngineSingleton:
     """Making sure the engine is created only once."""
@@ -18,35 +160,166 @@ class EngineSingleton:
     def __init__(self):
         if not EngineSingleton.__monostate:
             EngineSingleton.__monostate = self.__dict__
-            self.engine = create_engine(db_url(), echo=False, pool_recycle=3600)
+            self.engine = create_engine(
+                db_url(), echo=False, poolclass=InstrumentedQueuePool, **engine_options()
+            )
+            self.async_engine = create_async_engine(
+                async_db_url(db_url()),
+                echo=False,
+                poolclass=InstrumentedAsyncAdaptedQueuePool,
+                **engine_options(asynchronous=True),
+            )
+            addresses = list(_replica_addresses())
+            self.replicas = ReplicaSet(
+                [
+                    create_engine(
+                        db_url(host=host, port=port),
+                        echo=False,
+                        poolclass=InstrumentedQueuePool,
+                        **engine_options(),
+                    )
+                    for host, port in addresses
+                ],
+                [
+                    create_async_engine(
+                        async_db_url(db_url(host=host, port=port)),
+                        echo=False,
+                        poolclass=InstrumentedAsyncAdaptedQueuePool,
+                        **engine_options(asynchronous=True),
+                    )
+                    for host, port in addresses
+                ],
+                retry_after=DB_CONFIG.get("replica_retry_after", 30),
+            )
         else:
             self.__dict__ = EngineSingleton.__monostate
 
-    def patch(self, engine: Engine):
+    def patch(self, engine: Engine, replicas: Sequence[Engine] = ()):
+        """Use these databases instead. The async engines connect to the same databases, without
+        pooling the connections, because they might be used from different event loops."""
         self.__monostate["engine"] = engine  # type: ignore
+        self.__monostate["async_engine"] = create_async_engine(  # type: ignore
+            async_db_url(engine.url), poolclass=NullPool
+        )
+        self.__monostate["replicas"] = ReplicaSet(  # type: ignore
+            replicas,
+            [create_async_engine(async_db_url(r.url), poolclass=NullPool) for r in replicas],
+        )
+
 
+def _replica_addresses() -> Iterator[tuple[str, int]]:
+    for address in DB_CONFIG.get("replicas", []):
+        host, _, port = address.partition(":")
+        yield host, int(port) if port else DB_CONFIG.get("port", 3306)
 
-def db_url(including_db=True):
+
+def db_url(including_db=True, host: str | None = None, port: int | None = None):
     username = DB_CONFIG.get("name", "root")
     password = DB_CONFIG.get("password", "ok")
-    host = DB_CONFIG.get("host", "demodb")
-    port = DB_CONFIG.get("port", 3306)
+    host = host or DB_CONFIG.get("host", "demodb")
+    port = port or DB_CONFIG.get("port", 3306)
     database = DB_CONFIG.get("database", "aiod")
     if including_db:
         return f"mysql://{username}:{password}@{host}:{port}/{database}"
     return f"mysql://{username}:{password}@{host}:{port}"
 
 
+def async_db_url(url: str | URL) -> URL:
+    """The url of the same database, using the async driver."""
+    url = make_url(url)
+    return url.set(drivername=ASYNC_DRIVERS[url.get_backend_name()])
+
+
+def engine_options(asynchronous: bool = False) -> dict[str, Any]:
+    """The keyword arguments for create_engine (or create_async_engine), as configured in
+    config.toml."""
+    options = {
+        "pool_size": (
+            DB_CONFIG.get("async_pool_size", THREADPOOL_SIZE)
+            if asynchronous
+            else DB_CONFIG.get("pool_size", THREADPOOL_SIZE)
+        ),
+        "max_overflow": DB_CONFIG.get("max_overflow", 10),
+        "pool_timeout": DB_CONFIG.get("pool_timeout", 30),
+        "pool_recycle": DB_CONFIG.get("pool_recycle", 3600),
+        "pool_pre_ping": DB_CONFIG.get("pool_pre_ping", True),
+    }
+    if "isolation_level" in DB_CONFIG:
+        options["isolation_level"] = DB_CONFIG["isolation_level"]
+    return options
+
+
+def pool_statistics(engine: Engine) -> dict[str, Any]:
+    """The current usage of the connection pool of this engine, and, if it is instrumented, the
+    checkout statistics."""
+    pool = engine.pool
+    statistics: dict[str, Any] = {"status": pool.status()}
+    if isinstance(pool, QueuePool):
+        statistics |= {
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": max(pool.overflow(), 0),
+        }
+    if isinstance(pool, InstrumentedQueuePool):
+        statistics |= pool.statistics.as_dict()
+    return statistics
+
+
+@contextmanager
+def reads_from_primary(enabled: bool = True):
+    """Within this block, sessions with a read intent use the primary instead of a replica."""
+    token = _read_from_primary.set(enabled)
+    try:
+        yield
+    finally:
+        _read_from_primary.reset(token)
+
+
+def is_reading_from_primary() -> bool:
+    return _read_from_primary.get()
+
+
 @contextmanager
-def DbSession() -> Session:
+def DbSession(intent: Literal["read", "write"] = "write") -> Session:
     """
-    Returning a SQLModel session bound to the (configured) database engine.
+    Returning a SQLModel session bound to the (configured) database engine. A session with a
+    read intent, that should not be used to make changes, is bound to a read replica if
+    available.
 
     Alternatively, we could have used FastAPI Depends, but that only works for FastAPI - while
     the synchronization, for instance, also needs a Session, but doesn't use FastAPI.
     """
-    session = Session(EngineSingleton().engine)
+    engines = EngineSingleton()
+    connection = None
+    if intent == "read" and not _read_from_primary.get():
+        connection = engines.replicas.connect()
+    session = Session(connection if connection is not None else engines.engine)
     try:
         yield session
     finally:
         session.close()
+        if connection is not None:
+            connection.close()
+
+
+@asynccontextmanager
+async def AsyncDbSession(intent: Literal["read", "write"] = "write") -> AsyncIterator[AsyncSession]:
+    """
+    Returning a SQLModel AsyncSession bound to the async engine, or, for a read intent, to a read
+    replica if available, as DbSession.
+
+    Lazily loading relationships requires the sync API; use AsyncSession.run_sync to call code
+    that expects a Session. It still waits for the database without blocking the event loop.
+    """
+    engines = EngineSingleton()
+    connection = None
+    if intent == "read" and not _read_from_primary.get():
+        connection = await engines.replicas.connect_async()
+    session = AsyncSession(connection if connection is not None else engines.async_engine)
+    try:
+        yield session
+    finally:
+        await session.close()
+        if connection is not None:
+            await connection.close()
@@ -1,10 +1,12 @@
 """
 Utility functions for initializing the database and tables through SQLAlchemy.
 """
+from collections import defaultdict
 from operator import and_
+from typing import Optional, TypeAlias, Union
 
 import sqlmodel
-from sqlalchemy import text, create_engine
+from sqlalchemy import Column, Engine, MetaData, text, create_engine
 from sqlmodel import SQLModel, select
 
 from config import DB_CONFIG
@@ -26,6 +28,21 @@ def drop_or_create_database(delete_first: bool):
         connection.execute(text(f"CREATE DATABASE IF NOT EXISTS {database}"))
 
 
+def create_missing_indexes(metadata: MetaData, engine: Engine):
+    """
+    Create the indexes of the existing tables that are not yet in the database. create_all only
+    creates the indexes of new tables, so without this, an index that is added to an existing
+    column would only be created after rebuilding the database. Call it after create_all.
+    """
+    with engine.begin() as connection:
+        for table in metadata.sorted_tables:
+            for index in table.indexes:
+                # Functional indexes, such as the unique platform indexes, are not reported by
+                # every dialect. They are created together with their table.
+                if all(isinstance(e, Column) for e in index.expressions):
+                    index.create(connection, checkfirst=True)
+
+
 def _get_existing_resource(
     session: sqlmodel.Session, resource: AIoDConcept, clazz: type[SQLModel]
 ) -> AIoDConcept | None:
@@ -43,7 +60,45 @@ def _get_existing_resource(
     return session.scalars(query).first()
 
 
-def _create_or_fetch_related_objects(session: sqlmodel.Session, item: ResourceWithRelations):
+ResourceKey: TypeAlias = Union[str, tuple[Optional[str], Optional[str]]]
+
+
+def _resource_key(resource: AIoDConcept | str) -> ResourceKey:
+    """The key identifying an existing resource: the name for enums, otherwise the platform and
+    the platform_resource_identifier."""
+    if isinstance(resource, str):
+        return resource
+    return resource.platform, resource.platform_resource_identifier
+
+
+def _get_existing_keys(
+    session: sqlmodel.Session, resources: list[AIoDConcept | str], clazz: type[SQLModel]
+) -> set[ResourceKey]:
+    """The keys (see _resource_key) of the given resources that already exist in the database,
+    retrieved using a single query per platform."""
+    is_enum = NamedRelation in clazz.__mro__
+    if is_enum:
+        query = select(clazz.name).where(clazz.name.in_(resources))
+        return set(session.scalars(query).all())
+    identifiers_per_platform: dict[str | None, set[str | None]] = defaultdict(set)
+    for resource in resources:
+        if not isinstance(resource, str):
+            identifiers_per_platform[resource.platform].add(resource.platform_resource_identifier)
+    existing: set[ResourceKey] = set()
+    for platform, identifiers in identifiers_per_platform.items():
+        query = select(clazz.platform, clazz.platform_resource_identifier).where(
+            and_(
+                clazz.platform == platform,
+                clazz.platform_resource_identifier.in_(identifiers),
+            )
+        )
+        existing.update((platform, identifier) for platform, identifier in session.execute(query))
+    return existing
+
+
+def _create_or_fetch_related_objects(
+    session: sqlmodel.Session, item: ResourceWithRelations, commit: bool = True
+):
     """
     For all resources in the `related_resources`, get the identifier, by either
     inserting them in the database, or retrieving the existing values, and put the identifiers
@@ -74,7 +129,8 @@ def _create_or_fetch_related_objects(session: sqlmodel.Session, item: ResourceWi
                 ]
                 existing = _get_existing_resource(session, resource, router.resource_class)
                 if existing is None:
-                    created_resource = router.create_resource(session, resource)
+                    created_resource = router.create_resource(session, resource, commit=commit)
+                    session.flush()
                     identifiers.append(created_resource.identifier)
                 else:
                     identifiers.append(existing.identifier)
@@ -5,23 +5,35 @@ Note: order matters for overloaded paths
 (https://fastapi.tiangolo.com/tutorial/path-params/#order-matters).
 """
 import argparse
+import contextlib
 
+import anyio
 import pkg_resources
 import uvicorn
-from fastapi import Depends, FastAPI
+from fastapi import Depends, FastAPI, Request
 from fastapi.responses import HTMLResponse
 from sqlmodel import select
 
-from authentication import get_current_user, User
-from config import KEYCLOAK_CONFIG
-from database.deletion.triggers import add_delete_triggers
+from authentication import get_current_privileged_user, get_current_user, User
+from config import DB_CONFIG, KEYCLOAK_CONFIG
+from database.deletion.triggers import add_delete_triggers, add_deletion_log_triggers
 from database.model.concept.concept import AIoDConcept
 from database.model.platform.platform import Platform
 from database.model.platform.platform_names import PlatformName
-from database.session import EngineSingleton, DbSession
-from database.setup import drop_or_create_database
+from database.session import (
+    EngineSingleton,
+    DbSession,
+    THREADPOOL_SIZE,
+    pool_statistics,
+    reads_from_primary,
+)
+from database.setup import create_missing_indexes, drop_or_create_database
 from routers import resource_routers, parent_routers, enum_routers, uploader_routers
 from routers import search_routers
+from routers.change_router import ChangeRouter
+from routers.multi_search_router import MultiSearchRouter
+from routers.resource_counts import resource_counts
+from routers.response_cache import response_cache
 from setup_logger import setup_logger
 
 
@@ -68,13 +80,40 @@ def add_routes(app: FastAPI, url_prefix=""):
         """
         return user
 
+    for resource_router in resource_routers.router_list:
+        if issubclass(resource_router.resource_class, AIoDConcept):
+            resource_counts.register(
+                resource_router.resource_name_plural, resource_router.resource_class
+            )
+
     @app.get(url_prefix + "/counts/v1")
     def counts() -> dict:
+        """The number of resources per platform, computed using a single query and cached."""
+        return {
+            resource_name_plural: count
+            for resource_name_plural, count in resource_counts.get().items()
+            if count
+        }
+
+    @app.get(
+        url_prefix + "/cache_statistics/v1", dependencies=[Depends(get_current_privileged_user)]
+    )
+    def cache_statistics() -> dict:
+        """The effectiveness of the cache of the responses of the read endpoints."""
         return {
-            router.resource_name_plural: count
-            for router in resource_routers.router_list
-            if issubclass(router.resource_class, AIoDConcept)
-            and (count := router.get_resource_count_func()(detailed=True))
+            "hits": response_cache.hits,
+            "misses": response_cache.misses,
+            "hit_rate": response_cache.hit_rate,
+        }
+
+    @app.get(
+        url_prefix + "/database_statistics/v1", dependencies=[Depends(get_current_privileged_user)]
+    )
+    def database_statistics() -> dict:
+        """The usage of the database connection pools of this worker process."""
+        engines = EngineSingleton()
+        return pool_statistics(engines.engine) | {
+            "async": pool_statistics(engines.async_engine.sync_engine)
         }
 
     for router in (
@@ -85,6 +124,39 @@ def add_routes(app: FastAPI, url_prefix=""):
         + uploader_routers.router_list
     ):
         app.include_router(router.create(url_prefix))
+    app.include_router(ChangeRouter().create(url_prefix))
+    app.include_router(MultiSearchRouter().create(url_prefix))
+
+
+READ_YOUR_WRITES_COOKIE = "aiod_read_your_writes"
+
+
+def add_read_your_writes(app: FastAPI):
+    """
+    After a successful write, a client receives a short-lived cookie. As long as the client sends
+    this cookie, its read sessions use the primary database instead of a replica, so that it
+    reads its own writes.
+    """
+
+    @app.middleware("http")
+    async def read_your_writes(request: Request, call_next):
+        with reads_from_primary(READ_YOUR_WRITES_COOKIE in request.cookies):
+            response = await call_next(request)
+        if request.method in {"POST", "PUT", "PATCH", "DELETE"} and response.status_code < 400:
+            response.set_cookie(
+                READ_YOUR_WRITES_COOKIE,
+                "1",
+                max_age=DB_CONFIG.get("read_your_writes_seconds", 5),
+                httponly=True,
+            )
+        return response
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    """The database connection pool is sized to the threadpool, see database/session.py"""
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    yield
 
 
 def create_app() -> FastAPI:
@@ -102,6 +174,7 @@ def create_app() -> FastAPI:
         "://github.com/aiondemand/AIOD-rest-api/releases</a>.",
         version=pyproject_toml.version,
         swagger_ui_oauth2_redirect_url=f"{args.url_prefix}/docs/oauth2-redirect",
+        lifespan=lifespan,
         swagger_ui_init_oauth={
             "clientId": KEYCLOAK_CONFIG.get("client_id_swagger"),
             "realm": KEYCLOAK_CONFIG.get("realm"),
@@ -112,6 +185,7 @@ def create_app() -> FastAPI:
     )
     drop_or_create_database(delete_first=args.rebuild_db == "always")
     AIoDConcept.metadata.create_all(EngineSingleton().engine, checkfirst=True)
+    create_missing_indexes(AIoDConcept.metadata, EngineSingleton().engine)
     with DbSession() as session:
         existing_platforms = session.scalars(select(Platform)).all()
         if not any(existing_platforms):
@@ -122,8 +196,11 @@ def create_app() -> FastAPI:
             # whether platforms are already present. If platforms were not present, the db is
             # empty, and so the triggers should still be added.
             add_delete_triggers(AIoDConcept)
+    add_deletion_log_triggers(EngineSingleton().engine)
 
     add_routes(app, url_prefix=args.url_prefix)
+    if DB_CONFIG.get("replicas"):
+        add_read_your_writes(app)
     return app
 
 
@@ -0,0 +1,245 @@
+"""
+The change feed: the changes to all resources, ordered by the moment they were made, so that
+mirrors of the catalogue can synchronize incrementally.
+
+A change is either an upsert (the resource was created or updated, according to
+aiod_entry.date_modified) or a tombstone (the resource was deleted, according to date_deleted).
+Only the latest change of each resource is returned. The changes are ordered on (date,
+resource type, identifier), and paged by seeking on this key. Both dates are indexed, so the
+cost of a page does not depend on the size of the catalogue.
+
+The dates are set by the API when a change is made, not when it is committed. A transaction that
+commits late, or a worker with a lagging clock, could therefore add a change before the cursor of
+a mirror that already passed that date. To prevent mirrors from missing such changes, only the
+changes older than SAFETY_LAG are returned: the feed lags behind, but it is complete as long as
+write transactions are shorter than, and the clocks of the workers differ by less than, this lag.
+"""
+import base64
+import datetime
+import json
+from typing import Annotated, Any
+
+from fastapi import APIRouter, HTTPException, Query, status
+from pydantic import BaseModel, Field
+from sqlalchemy import and_, literal, or_, union_all
+from sqlalchemy.sql.operators import is_, is_not
+from sqlmodel import select
+
+from database.model.concept.aiod_entry import AIoDEntryORM
+from database.model.concept.concept import AIoDConcept
+from database.session import DbSession
+from error_handling import as_http_exception
+from routers import ResourceRouter, resource_routers
+from routers.response_cache import encode
+
+SAFETY_LAG = datetime.timedelta(minutes=1)
+
+
+class Change(BaseModel):
+    resource_type: str = Field(description="The type of the resource.", example="dataset")
+    identifier: int = Field(description="The AIoD identifier of the resource.")
+    date_changed: datetime.datetime = Field(
+        description="The aiod_entry.date_modified of the resource or, for a deleted resource, "
+        "its date_deleted, in UTC."
+    )
+    deleted: bool = Field(
+        description="If true, this is a tombstone: the resource was deleted, and should be "
+        "removed from the mirror."
+    )
+    resource: dict[str, Any] | None = Field(
+        description="The resource, in the aiod schema. Absent for deleted resources.",
+        default=None,
+    )
+
+
+class ChangeFeed(BaseModel):
+    changes: list[Change]
+    next: str | None = Field(
+        description="The cursor to pass as `since` to retrieve the changes that follow. It is "
+        "also returned if there are no changes, so that it can be used for the next poll."
+    )
+
+
+class ChangeRouter:
+    """Router for GET /changes/v1, the change feed of all AIoDConcepts."""
+
+    def __init__(self):
+        self.routers: list[ResourceRouter] = [
+            router
+            for router in resource_routers.router_list
+            if issubclass(router.resource_class, AIoDConcept)
+        ]
+        self.type_ranks = {router.resource_name: i for i, router in enumerate(self.routers)}
+
+    def create(self, url_prefix: str) -> APIRouter:
+        router = APIRouter()
+        router.add_api_route(
+            path=f"{url_prefix}/changes/v1",
+            endpoint=self.get_changes_func(),
+            response_model=ChangeFeed,
+            response_model_exclude_none=True,
+            name="Changes",
+            description="Retrieve the creations, updates and deletions of all resources, in the "
+            "order in which they were made. Mirrors of the catalogue can use this to synchronize "
+            "incrementally, by following the `next` cursor. Changes are only returned once they "
+            f"are {SAFETY_LAG.total_seconds():.0f} seconds old, so that no change is missed.",
+            tags=["changes"],
+        )
+        return router
+
+    def get_changes_func(self):
+        def get_changes(
+            since: Annotated[
+                str | None,
+                Query(
+                    description="Either the `next` cursor of a previous response, or an ISO 8601 "
+                    "datetime (UTC) to return the changes made on or after that moment. If "
+                    "omitted, all changes are returned, starting with the oldest.",
+                ),
+            ] = None,
+            limit: Annotated[
+                int, Query(description="The maximum number of changes.", ge=1, le=1000)
+            ] = 100,
+        ) -> ChangeFeed:
+            return self.get_changes(since, limit)
+
+        return get_changes
+
+    def get_changes(self, since: str | None, limit: int) -> ChangeFeed:
+        after = _parse_since(since, self.type_ranks)
+        until = datetime.datetime.utcnow() - SAFETY_LAG
+        try:
+            with DbSession(intent="read") as session:
+                query = self._changes_query(after, until, limit)
+                rows = session.execute(query).all()
+            identifiers_by_type: dict[int, list[str]] = {}
+            for row in rows:
+                if not row.deleted:
+                    identifiers_by_type.setdefault(row.type_rank, []).append(str(row.identifier))
+            resources = {}
+            for rank, identifiers in identifiers_by_type.items():
+                router = self.routers[rank]
+                batch = router.get_resources_batch(identifiers, schema="aiod")
+                for resource in batch.resources:
+                    resource_json = encode(resource, router.resource_class_read)
+                    resources[(rank, resource.identifier)] = resource_json
+        except Exception as e:
+            raise as_http_exception(e)
+        changes = [
+            Change(
+                resource_type=self.routers[row.type_rank].resource_name,
+                identifier=row.identifier,
+                date_changed=row.date_changed,
+                deleted=row.deleted,
+                resource=resources.get((row.type_rank, row.identifier)),
+            )
+            for row in rows
+            # A resource that was deleted after the query will be returned as tombstone later
+            if row.deleted or (row.type_rank, row.identifier) in resources
+        ]
+        if rows:
+            last = rows[-1]
+            return ChangeFeed(
+                changes=changes,
+                next=_encode_cursor(
+                    last.date_changed, self.routers[last.type_rank].resource_name, last.identifier
+                ),
+            )
+        return ChangeFeed(changes=changes, next=since)
+
+    def _changes_query(
+        self,
+        after: tuple[datetime.datetime, int, int] | None,
+        until: datetime.datetime,
+        limit: int,
+    ):
+        """
+        A UNION ALL of, for each resource type, the first `limit` upserts and the first `limit`
+        tombstones after the key and before until, each using an index on their date. The result
+        is ordered on the (date_changed, type_rank, identifier) key.
+        """
+        branches = []
+        for rank, router in enumerate(self.routers):
+            clz = router.resource_class
+            upserts = select(
+                AIoDEntryORM.date_modified.label("date_changed"),  # type: ignore[union-attr]
+                literal(rank).label("type_rank"),
+                clz.identifier.label("identifier"),
+                literal(False).label("deleted"),
+            ).join(clz.aiod_entry)
+            upserts = upserts.where(
+                is_(clz.date_deleted, None),
+                is_not(AIoDEntryORM.date_modified, None),
+                AIoDEntryORM.date_modified < until,  # type: ignore[operator]
+                _after(AIoDEntryORM.date_modified, rank, clz.identifier, after),
+            ).order_by(AIoDEntryORM.date_modified, clz.identifier)
+            tombstones = select(
+                clz.date_deleted.label("date_changed"),
+                literal(rank).label("type_rank"),
+                clz.identifier.label("identifier"),
+                literal(True).label("deleted"),
+            )
+            tombstones = tombstones.where(
+                is_not(clz.date_deleted, None),
+                clz.date_deleted < until,
+                _after(clz.date_deleted, rank, clz.identifier, after),
+            ).order_by(clz.date_deleted, clz.identifier)
+            branches += [
+                select(upserts.limit(limit).subquery()),
+                select(tombstones.limit(limit).subquery()),
+            ]
+        changes = union_all(*branches).subquery()
+        return (
+            select(changes)
+            .order_by(changes.c.date_changed, changes.c.type_rank, changes.c.identifier)
+            .limit(limit)
+        )
+
+
+def _after(date_column, rank: int, identifier_column, after):
+    """The where-clause selecting the changes of the resource type with this rank that follow
+    the (date_changed, type_rank, identifier) key."""
+    if after is None:
+        return True
+    date, after_rank, after_identifier = after
+    if rank > after_rank:
+        return date_column >= date
+    if rank < after_rank:
+        return date_column > date
+    return or_(date_column > date, and_(date_column == date, identifier_column > after_identifier))
+
+
+def _parse_since(
+    since: str | None, type_ranks: dict[str, int]
+) -> tuple[datetime.datetime, int, int] | None:
+    """The (date_changed, type_rank, identifier) key after which the changes should be
+    returned."""
+    if since is None:
+        return None
+    try:
+        date = datetime.datetime.fromisoformat(since)
+    except ValueError:
+        pass
+    else:
+        if date.tzinfo is not None:
+            date = date.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+        # Just before the first change on this date
+        return date, -1, -1
+    try:
+        key = json.loads(base64.urlsafe_b64decode(since.encode()))
+        date = datetime.datetime.fromisoformat(key["date"])
+        rank = type_ranks[key["type"]]
+        identifier = key["identifier"]
+    except (ValueError, KeyError, TypeError):
+        identifier = None
+    if not isinstance(identifier, int):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid since: expected a cursor or an ISO 8601 datetime.",
+        )
+    return date, rank, identifier
+
+
+def _encode_cursor(date: datetime.datetime, resource_type: str, identifier: int) -> str:
+    key = {"date": date.isoformat(), "type": resource_type, "identifier": identifier}
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
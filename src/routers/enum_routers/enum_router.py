@@ -5,7 +5,7 @@ from fastapi import APIRouter
 from sqlmodel import select, Session
 
 from database.model.named_relation import NamedRelation
-from database.session import DbSession
+from database.session import AsyncDbSession
 
 
 class EnumRouter(abc.ABC):
@@ -38,17 +38,18 @@ class EnumRouter(abc.ABC):
         return router
 
     def get_resources_func(self):
-        def get_resources():
-            with DbSession() as session:
+        async def get_resources():
+            async with AsyncDbSession(intent="read") as session:
                 query = select(self.resource_class)
-                resources = session.scalars(query).all()
+                resources = (await session.scalars(query)).all()
                 return [r.name for r in resources]
 
         return get_resources
 
-    def create_resource(self, session: Session, resource_create_instance: str):
+    def create_resource(self, session: Session, resource_create_instance: str, commit: bool = True):
         # Used by synchronization.py: router.create_resource
         resource = self.resource_class(name=resource_create_instance)
         session.add(resource)
-        session.commit()
+        if commit:
+            session.commit()
         return resource
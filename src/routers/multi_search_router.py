@@ -0,0 +1,190 @@
+"""
+Searching all resource types at once, e.g. for a single search box in a portal.
+
+All indices are searched using a single Elasticsearch _msearch request, with a query per index
+over the fields indexed for that resource type. Each index returns its best offset + limit hits,
+which are merged on their score. The documents contain the complete resources, so the database
+is not queried. Only for documents indexed before that, the resources are retrieved from the
+database if get_all is true, using a single query per resource type.
+"""
+from typing import Annotated, Any, Literal, TypeAlias
+
+from fastapi import APIRouter, HTTPException, Query, status
+from pydantic import BaseModel, Field
+
+from routers.search_router import (
+    GET_ALL_DESCRIPTION,
+    LIMIT_MAX,
+    SORT,
+    SearchRouter,
+    encode_resource,
+    validate_platforms,
+)
+from routers.search_routers import router_list
+from routers.search_routers.elasticsearch import ElasticsearchSingleton
+
+
+class SearchHit(BaseModel):
+    resource_type: str = Field(description="The type of the resource.", example="dataset")
+    score: float | None = Field(description="The relevance of the resource for the query.")
+    resource: dict[str, Any] = Field(description="The resource, in the aiod schema.")
+
+
+class MultiSearchResult(BaseModel):
+    total_hits: int = Field(description="The total number of results, of all resource types.")
+    total_hits_per_type: dict[str, int] = Field(
+        description="The total number of results per resource type."
+    )
+    hits: list[SearchHit] = Field(description="The resources matching the search query.")
+    limit: int = Field(description="The maximum number of returned results, as specified.")
+    offset: int = Field(description="The offset, as specified in the input.")
+
+
+class MultiSearchRouter:
+    """Router for GET /search/v1, searching the resources of all SearchRouters."""
+
+    def __init__(self, routers: list[SearchRouter] | None = None):
+        self.routers = {
+            router.es_index: router for router in (routers if routers is not None else router_list)
+        }
+        self.read_classes = {
+            name: router.resource_class_read for name, router in self.routers.items()
+        }
+        self.indexed_fields = sorted(
+            set().union(*(r.indexed_fields for r in self.routers.values()))
+        )
+
+    def create(self, url_prefix: str) -> APIRouter:
+        router = APIRouter()
+        router.add_api_route(
+            path=f"{url_prefix}/search/v1",
+            endpoint=self.search_func(),
+            response_model=MultiSearchResult,
+            name="Search",
+            description="Search for resources of all types at once. The results are ordered on "
+            "their relevance.",
+            tags=["search"],
+        )
+        return router
+
+    def search_func(self):
+        resource_type_names: TypeAlias = Literal[tuple(self.routers)]  # type: ignore
+        indexed_fields: TypeAlias = Literal[tuple(self.indexed_fields)]  # type: ignore
+
+        def search(
+            search_query: Annotated[
+                str,
+                Query(
+                    description="The text to find. It is used in an ElasticSearch match query.",
+                    examples=["Name of the resource"],
+                ),
+            ],
+            resource_types: Annotated[
+                list[resource_type_names] | None,
+                Query(
+                    description="Search for resources of these types. If empty, resources of "
+                    "all types will be returned.",
+                ),
+            ] = None,
+            search_fields: Annotated[
+                list[indexed_fields] | None,
+                Query(
+                    description="Search in these fields. If empty, the query will be matched "
+                    "against all fields of each type. A resource type that has none of these "
+                    "fields is not searched.",
+                ),
+            ] = None,
+            platforms: Annotated[
+                list[str] | None,
+                Query(
+                    description="Search for resources of these platforms. If empty, results from "
+                    "all platforms will be returned.",
+                    examples=["huggingface", "openml"],
+                ),
+            ] = None,
+            limit: Annotated[int, Query(ge=1, le=LIMIT_MAX)] = 10,
+            offset: Annotated[int, Query(ge=0, le=LIMIT_MAX)] = 0,
+            get_all: Annotated[
+                bool,
+                Query(description=GET_ALL_DESCRIPTION),
+            ] = False,
+        ) -> MultiSearchResult:
+            validate_platforms(platforms)
+            return self.search(
+                search_query, resource_types, search_fields, platforms, limit, offset, get_all
+            )
+
+        return search
+
+    def search(
+        self,
+        search_query: str,
+        resource_types: list[str] | None,
+        search_fields: list[str] | None,
+        platforms: list[str] | None,
+        limit: int,
+        offset: int,
+        get_all: bool,
+    ) -> MultiSearchResult:
+        searches: list[dict[str, Any]] = []
+        searched_types = []
+        for resource_type in resource_types or self.routers:
+            router = self.routers[resource_type]
+            fields = router.indexed_fields.intersection(search_fields or router.indexed_fields)
+            if fields:
+                searched_types.append(resource_type)
+                query = router.es_query(search_query, fields, platforms)
+                body = {"query": query, "size": offset + limit, "sort": ["_score", SORT]}
+                searches += [{"index": router.es_index}, body]
+        if not searches:
+            return MultiSearchResult(
+                total_hits=0, total_hits_per_type={}, hits=[], limit=limit, offset=offset
+            )
+
+        responses = ElasticsearchSingleton().client.msearch(searches=searches)["responses"]
+        total_hits_per_type = {}
+        scored_hits = []
+        for resource_type, response in zip(searched_types, responses):
+            if "error" in response:
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"Searching {resource_type} failed: {response['error']}",
+                )
+            total_hits_per_type[resource_type] = response["hits"]["total"]["value"]
+            scored_hits += [(resource_type, hit) for hit in response["hits"]["hits"]]
+        scored_hits.sort(
+            key=lambda type_hit: (
+                -(type_hit[1]["_score"] or 0),
+                type_hit[0],
+                type_hit[1]["_source"]["identifier"],
+            )
+        )
+        end = offset + limit
+        page = scored_hits[offset:end]
+        return MultiSearchResult(
+            total_hits=sum(total_hits_per_type.values()),
+            total_hits_per_type=total_hits_per_type,
+            hits=self._hits(page, get_all),
+            limit=limit,
+            offset=offset,
+        )
+
+    def _hits(self, page: list[tuple[str, dict[str, Any]]], get_all: bool) -> list[SearchHit]:
+        """The SearchHits of this page, retrieving the resources of each type at once."""
+        hits_per_type: dict[str, list[dict[str, Any]]] = {}
+        for resource_type, hit in page:
+            hits_per_type.setdefault(resource_type, []).append(hit)
+        resources = {}
+        for resource_type, hits in hits_per_type.items():
+            router = self.routers[resource_type]
+            read_class = self.read_classes[resource_type]
+            for resource in router.resources(read_class, hits, get_all):
+                resources[(resource_type, resource.identifier)] = encode_resource(resource)
+        return [
+            SearchHit(
+                resource_type=resource_type,
+                score=hit["_score"],
+                resource=resources[(resource_type, hit["_source"]["identifier"])],
+            )
+            for resource_type, hit in page
+        ]
@@ -2,13 +2,16 @@ import abc
 from typing import Union
 
 from fastapi import APIRouter, HTTPException
-from sqlmodel import SQLModel, select
+from sqlmodel import SQLModel, Session, select
+from starlette.responses import Response
 from starlette.status import HTTP_404_NOT_FOUND, HTTP_500_INTERNAL_SERVER_ERROR
 
 from database.model.concept.concept import AIoDConcept
+from database.model.eager_loading import eager_loading_options
 from database.model.helper_functions import non_abstract_subclasses
-from database.session import DbSession
+from database.session import AsyncDbSession
 from routers import resource_routers
+from routers.response_cache import CachedResponse, PARENTS_NAMESPACE, response_cache, serialize
 
 
 class ParentRouter(abc.ABC):
@@ -61,40 +64,55 @@ class ParentRouter(abc.ABC):
         return router
 
     def get_resource_func(self, classes_dict: dict, read_classes_dict: dict):
-        def get_resource(identifier: int):
-            with DbSession() as session:
-                query = select(self.parent_class_table).where(
-                    self.parent_class_table.identifier == identifier
-                )
-                parent_resource = session.scalars(query).first()
-                if not parent_resource:
-                    self.raise_404(identifier)
-                child_type: str = parent_resource.type
-                child_class = classes_dict[child_type]
-                child_class_read = read_classes_dict[child_type]
-                identifier_name = (
-                    self.resource_name + "_id"
-                    if hasattr(child_class, self.resource_name + "_id")
-                    else self.resource_name + "_identifier"
-                )
-
-                query_child = select(child_class).where(
-                    getattr(child_class, identifier_name) == identifier
-                )
-                child: AIoDConcept = session.scalars(query_child).first()
-                if child.date_deleted is not None:
-                    self.raise_404(identifier)
-
-                if not child:
-                    raise HTTPException(
-                        status_code=HTTP_500_INTERNAL_SERVER_ERROR,
-                        detail=f"The parent could be found, but the child ({child_type}) was not "
-                        f"found in our database",
+        async def get_resource(identifier: int):
+            key = await response_cache.key(PARENTS_NAMESPACE, self.resource_name_plural, identifier)
+            cached = await response_cache.get(key)
+            if cached is None:
+                async with AsyncDbSession(intent="read") as session:
+                    cached = await session.run_sync(
+                        self._get_resource, identifier, classes_dict, read_classes_dict
                     )
-                return child_class_read.from_orm(child)
+                await response_cache.set(key, cached)
+            return Response(content=cached.body, media_type="application/json")
 
         return get_resource
 
+    def _get_resource(
+        self, session: Session, identifier: int, classes_dict: dict, read_classes_dict: dict
+    ) -> CachedResponse:
+        query = select(self.parent_class_table).where(
+            self.parent_class_table.identifier == identifier
+        )
+        parent_resource = session.scalars(query).first()
+        if not parent_resource:
+            self.raise_404(identifier)
+        child_type: str = parent_resource.type
+        child_class = classes_dict[child_type]
+        child_class_read = read_classes_dict[child_type]
+        identifier_name = (
+            self.resource_name + "_id"
+            if hasattr(child_class, self.resource_name + "_id")
+            else self.resource_name + "_identifier"
+        )
+
+        query_child = (
+            select(child_class)
+            .where(getattr(child_class, identifier_name) == identifier)
+            .options(*eager_loading_options(child_class))
+        )
+        child: AIoDConcept = session.scalars(query_child).first()
+        if child.date_deleted is not None:
+            self.raise_404(identifier)
+
+        if not child:
+            raise HTTPException(
+                status_code=HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"The parent could be found, but the child ({child_type}) was not "
+                f"found in our database",
+            )
+        content = child_class_read.from_orm(child)
+        return CachedResponse(body=serialize(content, child_class_read), headers={})
+
     def raise_404(self, identifier: int):
         raise HTTPException(
             status_code=HTTP_404_NOT_FOUND,
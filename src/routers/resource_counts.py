@@ -0,0 +1,71 @@
+"""
+The number of (non-deleted) resources per platform, of all resources, as shown on the front page.
+
+The counts of all registered resources are computed using a single UNION ALL query, and cached
+with stale-while-revalidate: the counts can be outdated by at most counts_max_age seconds (or
+longer, while they are being recomputed), but a request never waits for the query, except for
+the first one.
+"""
+from typing import Type
+
+from sqlalchemy import func, literal, union_all
+from sqlalchemy.sql.operators import is_
+from sqlmodel import select
+
+from caching import StaleWhileRevalidate
+from config import CACHE_CONFIG
+from database.model.concept.concept import AIoDConcept
+from database.session import DbSession
+
+
+class ResourceCounts:
+    def __init__(self, max_age: float, stale_max_age: float):
+        self.resource_classes: dict[str, Type[AIoDConcept]] = {}
+        self._counts = StaleWhileRevalidate[dict[str, dict[str, int]]](
+            compute=self._count, max_age=max_age, stale_max_age=stale_max_age
+        )
+
+    def register(self, resource_name_plural: str, resource_class: Type[AIoDConcept]):
+        if self.resource_classes.get(resource_name_plural) is not resource_class:
+            self.resource_classes[resource_name_plural] = resource_class
+            self._counts.clear()
+
+    def get(self) -> dict[str, dict[str, int]]:
+        """For each registered resource, a dictionary of platform name (or "aiod") to count."""
+        return self._counts.get()
+
+    def get_resource(self, resource_name_plural: str) -> dict[str, int] | None:
+        """The counts of this resource, or None if it is not registered."""
+        if resource_name_plural not in self.resource_classes:
+            return None
+        return self.get().get(resource_name_plural)
+
+    def clear(self):
+        self._counts.clear()
+
+    def _count(self) -> dict[str, dict[str, int]]:
+        if not self.resource_classes:
+            return {}
+        query = union_all(
+            *[
+                select(
+                    literal(name).label("resource_name_plural"),
+                    clz.platform,
+                    func.count(clz.identifier).label("count"),
+                )
+                .where(is_(clz.date_deleted, None))
+                .group_by(clz.platform)
+                for name, clz in self.resource_classes.items()
+            ]
+        )
+        counts: dict[str, dict[str, int]] = {name: {} for name in self.resource_classes}
+        with DbSession(intent="read") as session:
+            for name, platform, count in session.execute(query).all():
+                counts[name][platform if platform else "aiod"] = count
+        return counts
+
+
+resource_counts = ResourceCounts(
+    max_age=CACHE_CONFIG.get("counts_max_age", 10),
+    stale_max_age=CACHE_CONFIG.get("counts_stale_max_age", 300),
+)
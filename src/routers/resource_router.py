@@ -1,37 +1,56 @@
 import abc
+import base64
+import binascii
 import datetime
+import functools
+import hashlib
+import json
 import traceback
+from email.utils import parsedate_to_datetime
 from functools import partial
-from typing import Literal, Union, Any, Annotated
+from typing import Literal, Union, Any, Annotated, Callable, Generic, Iterator, Mapping
 from typing import TypeVar, Type
 from wsgiref.handlers import format_date_time
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Path
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Path, Request
 from fastapi.encoders import jsonable_encoder
-from pydantic import BaseModel
-from sqlalchemy import and_, func
+from pydantic import BaseModel, create_model
+from pydantic.generics import GenericModel
+from sqlalchemy import and_, func, inspect, null, or_
+from sqlalchemy.orm import load_only
 from sqlalchemy.sql.operators import is_
 from sqlmodel import SQLModel, Session, select, Field
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, Response, StreamingResponse
 
 from authentication import get_current_user, User
 from config import KEYCLOAK_CONFIG
 from converters.schema_converters.schema_converter import SchemaConverter
+from database.model.ai_resource import resource_links  # noqa: F401 registers the session events
 from database.model.ai_resource.resource import AbstractAIResource
+from database.model.concept.aiod_entry import AIoDEntryORM
 from database.model.concept.concept import AIoDConcept
+from database.model.eager_loading import eager_loading_options, in_batches
 from database.model.platform.platform import Platform
 from database.model.platform.platform_names import PlatformName
 from database.model.resource_read_and_create import (
     resource_create,
+    resource_patch,
     resource_read,
 )
-from database.model.serializers import deserialize_resource_relationships
-from database.session import DbSession
+from database.model.serializers import (
+    deserialization_plan,
+    deserialize_resource_relationships,
+    patch_resource,
+    prefetched_named_relations,
+)
+from database.session import AsyncDbSession, DbSession
 from error_handling import as_http_exception
+from routers.resource_counts import resource_counts
+from routers.response_cache import CachedResponse, response_cache, serialize
 
 
 class Pagination(BaseModel):
-    """Offset-based pagination."""
+    """Offset-based pagination, with an opt-in keyset (cursor) mode."""
 
     offset: int = Field(
         Query(
@@ -47,12 +66,47 @@ class Pagination(BaseModel):
             le=1000,
         )
     )
+    cursor: str | None = Field(
+        Query(
+            description="Opaque cursor, as returned in the Next-Cursor header of a previous "
+            "response. If given, the results directly following that previous page are returned, "
+            "and the offset should be omitted. Contrary to the offset, walking through all "
+            "resources using the cursor does not get slower for later pages.",
+            default=None,
+        )
+    )
 
 
 RESOURCE = TypeVar("RESOURCE", bound=AbstractAIResource)
 RESOURCE_CREATE = TypeVar("RESOURCE_CREATE", bound=SQLModel)
 RESOURCE_READ = TypeVar("RESOURCE_READ", bound=SQLModel)
 
+BATCH_LIMIT = 1000
+BULK_LIMIT = 10000
+EXPORT_BATCH_SIZE = 500
+
+
+class BatchResult(GenericModel, Generic[RESOURCE_READ]):
+    resources: list[RESOURCE_READ] = Field(
+        description="The resources that were found, in the order of the requested identifiers."
+    )
+    missing: list[str] = Field(
+        description="The requested identifiers for which no resource exists, or for which the "
+        "resource was deleted."
+    )
+
+
+class BulkItemResult(BaseModel):
+    identifier: int | None = Field(
+        description="The identifier of the stored resource, if it was stored successfully.",
+        default=None,
+    )
+    status_code: int = Field(
+        description="200 if the resource was stored successfully. Otherwise, the status code that "
+        "the single-resource endpoint would have returned."
+    )
+    detail: str | None = Field(description="The reason why it was not stored.", default=None)
+
 
 class ResourceRouter(abc.ABC):
     """
@@ -61,16 +115,23 @@ class ResourceRouter(abc.ABC):
     It creates the basic endpoints for each resource:
     - GET /[resource]s/
     - GET /[resource]s/{identifier}
+    - GET /[resource]s/batch
+    - GET /[resource]s/export.ndjson
     - GET /platforms/{platform_name}/[resource]s/
     - GET /platforms/{platform_name}/[resource]s/{identifier}
+    - GET /platforms/{platform_name}/[resource]s/batch
     - POST /[resource]s
+    - POST /[resource]s/bulk
     - PUT /[resource]s/{identifier}
+    - PATCH /[resource]s/{identifier}
     - DELETE /[resource]s/{identifier}
     """
 
     def __init__(self):
         self.resource_class_create = resource_create(self.resource_class)
         self.resource_class_read = resource_read(self.resource_class)
+        self.resource_class_patch = resource_patch(self.resource_class_create)
+        self.deserialization_plan = deserialization_plan(self.resource_class)
 
     @property
     @abc.abstractmethod
@@ -157,6 +218,36 @@ class ResourceRouter(abc.ABC):
             description=f"Register a {self.resource_name} with AIoD.",
             **default_kwargs,
         )
+        # Should be registered before the /{identifier} route, to take precedence
+        router.add_api_route(
+            path=f"{url_prefix}/{self.resource_name_plural}/{version}/export.ndjson",
+            endpoint=self.export_resources_func(),
+            response_class=StreamingResponse,
+            name=f"Export {self.resource_name_plural}",
+            description=f"Stream all meta-data of the {self.resource_name_plural} as "
+            "newline-delimited JSON, one resource per line.",
+            **default_kwargs,
+        )
+        router.add_api_route(
+            path=f"{url_prefix}/{self.resource_name_plural}/{version}/bulk",
+            methods={"POST"},
+            endpoint=self.bulk_resources_func(),
+            response_model=list[BulkItemResult],
+            name=f"Bulk {self.resource_name_plural}",
+            description=f"Register multiple {self.resource_name_plural} with AIoD at once. The "
+            f"result contains, for each {self.resource_name}, its identifier or the reason it "
+            "could not be stored.",
+            **default_kwargs,
+        )
+        router.add_api_route(
+            path=f"{url_prefix}/{self.resource_name_plural}/{version}/batch",
+            endpoint=self.get_resources_batch_func(),
+            response_model=BatchResult[response_model],  # type: ignore
+            name=f"Batch of {self.resource_name_plural}",
+            description=f"Retrieve all meta-data for multiple {self.resource_name_plural}, "
+            f"identified by their AIoD identifiers.",
+            **default_kwargs,
+        )
         router.add_api_route(
             path=url_prefix + f"/{self.resource_name_plural}/{version}/{{identifier}}",
             endpoint=self.get_resource_func(),
@@ -174,6 +265,16 @@ class ResourceRouter(abc.ABC):
             description=f"Update an existing {self.resource_name}.",
             **default_kwargs,
         )
+        router.add_api_route(
+            path=f"{url_prefix}/{self.resource_name_plural}/{version}/{{identifier}}",
+            methods={"PATCH"},
+            endpoint=self.patch_resource_func(),
+            name=self.resource_name,
+            description=f"Update some of the fields of an existing {self.resource_name}. Fields "
+            "that are omitted are left unchanged. A list (e.g. the keywords) is replaced as a "
+            "whole.",
+            **default_kwargs,
+        )
         router.add_api_route(
             path=f"{url_prefix}/{self.resource_name_plural}/{version}/{{identifier}}",
             methods={"DELETE"},
@@ -192,6 +293,16 @@ class ResourceRouter(abc.ABC):
                 f"platform.",
                 **default_kwargs,
             )
+            router.add_api_route(
+                path=f"{url_prefix}/platforms/{{platform}}/{self.resource_name_plural}/{version}"
+                f"/batch",
+                endpoint=self.get_platform_resources_batch_func(),
+                response_model=BatchResult[response_model],  # type: ignore
+                name=f"Batch of {self.resource_name_plural}",
+                description=f"Retrieve all meta-data for multiple {self.resource_name_plural}, "
+                "identified by their platform-specific-identifiers.",
+                **default_kwargs,
+            )
             router.add_api_route(
                 path=f"{url_prefix}/platforms/{{platform}}/{self.resource_name_plural}/{version}"
                 f"/{{identifier}}",
@@ -204,47 +315,291 @@ class ResourceRouter(abc.ABC):
             )
         return router
 
-    def get_resources(self, schema: str, pagination: Pagination, platform: str | None = None):
-        """Fetch all resources of this platform in given schema, using pagination"""
+    async def get_resources(
+        self,
+        schema: str,
+        pagination: Pagination,
+        platform: str | None = None,
+        request_headers: Mapping[str, str] | None = None,
+        fields: tuple[str, ...] | None = None,
+    ) -> Response:
+        """
+        Fetch all resources of this platform in given schema, using pagination. If fields are
+        given, only those attributes are loaded and returned.
+
+        The response contains a weak ETag, based on the identifiers and modification dates of the
+        resources on this page. If it matches the If-None-Match request header, a 304 response is
+        returned, without loading the resources. The responses are cached.
+        """
         _raise_error_on_invalid_schema(self._possible_schemas, schema)
-        with DbSession() as session:
-            try:
+        cache_key = (
+            self._lists_namespace,
+            platform,
+            schema,
+            fields,
+            pagination.offset,
+            pagination.limit,
+            pagination.cursor,
+        )
+        load = partial(
+            self._load_resources,
+            schema=schema,
+            pagination=pagination,
+            platform=platform,
+            request_headers=request_headers,
+            fields=fields,
+        )
+        return await self._cached_or_load(cache_key, load, request_headers)
+
+    def _load_resources(
+        self,
+        session: Session,
+        schema: str,
+        pagination: Pagination,
+        platform: str | None,
+        request_headers: Mapping[str, str] | None,
+        fields: tuple[str, ...] | None,
+    ) -> CachedResponse | Response:
+        """The serialized page of resources, or a 304 response if it was not modified."""
+        try:
+            convert_schema = (
+                partial(self.schema_converters[schema].convert, session)
+                if schema != "aiod"
+                else self._schema_class(schema, fields).from_orm
+            )
+            where_clause = and_(
+                is_(self.resource_class.date_deleted, None),
+                (self.resource_class.platform == platform) if platform is not None else True,
+            )
+            versions_query = self._versions_query().where(where_clause)
+            versions = session.execute(self._paginate(versions_query, pagination, platform)).all()
+            headers = {"ETag": self._etag(schema, *versions, weak=True, fields=fields)}
+            if len(versions) == pagination.limit and versions:
+                headers["Next-Cursor"] = _encode_cursor(versions[-1].identifier, platform)
+            if _is_not_modified(request_headers, headers["ETag"]):
+                return self._not_modified(headers)
+
+            query = (
+                select(self.resource_class)
+                .where(where_clause)
+                .options(*self._loader_options(fields))
+            )
+            resources = session.scalars(self._paginate(query, pagination, platform)).all()
+            content = [convert_schema(resource) for resource in resources]
+            schema_class = self._schema_class(schema, fields)
+            return CachedResponse(
+                body=serialize(content, list[schema_class]),  # type: ignore[valid-type]
+                headers=headers,
+            )
+        except Exception as e:
+            raise as_http_exception(e)
+
+    def _versions_query(self):
+        """Select only the identifier and aiod_entry.date_modified, without loading the resource.
+        The date_modified is None for resources without aiod_entry."""
+        if not hasattr(self.resource_class, "aiod_entry"):
+            return select(self.resource_class.identifier, null().label("date_modified"))
+        return select(self.resource_class.identifier, AIoDEntryORM.date_modified).outerjoin(
+            self.resource_class.aiod_entry
+        )
+
+    def _paginate(self, query, pagination: Pagination, platform: str | None):
+        query = query.order_by(self.resource_class.identifier).limit(pagination.limit)
+        if pagination.cursor is None:
+            return query.offset(pagination.offset)
+        if pagination.offset:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="The offset cannot be combined with a cursor.",
+            )
+        # Seeking on the identifier (the primary key), instead of skipping rows, keeps the latency
+        # of a page independent of its depth. The platform in the cursor only ties it to the
+        # listing it was returned by.
+        last_identifier = _decode_cursor(pagination.cursor, platform)
+        return query.where(self.resource_class.identifier > last_identifier)
+
+    def get_resource(
+        self,
+        identifier: str,
+        schema: str,
+        platform: str | None = None,
+        fields: tuple[str, ...] | None = None,
+    ):
+        """
+        Get the resource identified by AIoD identifier (if platform is None) or by platform AND
+        platform-identifier (if platform is not None), return in given schema. If fields are
+        given, only those attributes are loaded and returned.
+        """
+        _raise_error_on_invalid_schema(self._possible_schemas, schema)
+        with DbSession(intent="read") as session:
+            return self._get_resource(session, identifier, schema, platform, fields)
+
+    def _get_resource(
+        self,
+        session: Session,
+        identifier: str,
+        schema: str,
+        platform: str | None,
+        fields: tuple[str, ...] | None,
+    ):
+        try:
+            resource = self._retrieve_resource(
+                session, identifier, platform=platform, eager_loading=True, fields=fields
+            )
+            if schema != "aiod":
+                return self.schema_converters[schema].convert(session, resource)
+            return self._schema_class(schema, fields).from_orm(resource)
+        except Exception as e:
+            raise as_http_exception(e)
+
+    async def get_resource_conditionally(
+        self,
+        identifier: str,
+        schema: str,
+        platform: str | None = None,
+        request_headers: Mapping[str, str] | None = None,
+        fields: tuple[str, ...] | None = None,
+    ) -> Response:
+        """
+        Get the resource, as in get_resource, including an ETag and Last-Modified header based on
+        aiod_entry.date_modified. If the resource was not modified according to the
+        If-None-Match or If-Modified-Since request headers, a 304 response is returned, using
+        only a single narrow query. The responses are cached.
+        """
+        _raise_error_on_invalid_schema(self._possible_schemas, schema)
+        namespace = self._resource_namespace(
+            *((identifier,) if platform is None else (platform, identifier))
+        )
+        cache_key = (namespace, schema, fields)
+        load = partial(
+            self._load_resource,
+            identifier=identifier,
+            schema=schema,
+            platform=platform,
+            request_headers=request_headers,
+            fields=fields,
+        )
+        return await self._cached_or_load(cache_key, load, request_headers)
+
+    def _load_resource(
+        self,
+        session: Session,
+        identifier: str,
+        schema: str,
+        platform: str | None,
+        request_headers: Mapping[str, str] | None,
+        fields: tuple[str, ...] | None,
+    ) -> CachedResponse | Response:
+        """The serialized resource, or a 304 response if it was not modified."""
+        headers = {}
+        try:
+            key_clause = (
+                (self.resource_class.identifier == identifier)
+                if platform is None
+                else and_(
+                    self.resource_class.platform_resource_identifier == identifier,
+                    self.resource_class.platform == platform,
+                )
+            )
+            query = self._versions_query().where(
+                key_clause, is_(self.resource_class.date_deleted, None)
+            )
+            version = session.execute(query).first()
+        except Exception as e:
+            raise as_http_exception(e)
+        if version is not None and version.date_modified is not None:
+            last_modified = version.date_modified.replace(tzinfo=datetime.timezone.utc)
+            headers["ETag"] = self._etag(schema, version, fields=fields)
+            headers["Last-Modified"] = format_date_time(last_modified.timestamp())
+            if _is_not_modified(request_headers, headers["ETag"], last_modified):
+                return self._not_modified(headers)
+        resource = self._get_resource(session, identifier, schema, platform, fields)
+        return CachedResponse(
+            body=serialize(resource, self._schema_class(schema, fields)), headers=headers
+        )
+
+    def get_resources_batch(
+        self, identifiers: list[str], schema: str, platform: str | None = None
+    ) -> BatchResult:
+        """
+        Get the resources identified by AIoD identifiers (if platform is None) or by platform AND
+        platform-identifiers (if platform is not None) using a single query, return in given
+        schema. Identifiers that cannot be found are reported, instead of raising an error.
+        """
+        _raise_error_on_invalid_schema(self._possible_schemas, schema)
+        if len(identifiers) > BATCH_LIMIT:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"At most {BATCH_LIMIT} identifiers can be requested at once.",
+            )
+        # The requested identifiers, as they will be found. AIoD identifiers such as "01" are
+        # normalised to the identifier of the resource, "1".
+        if platform is None:
+            key = self.resource_class.identifier
+            normalised = {i: _normalise_identifier(i) for i in identifiers}
+            values: set[int] | set[str] = {int(n) for n in normalised.values() if n is not None}
+        else:
+            _raise_error_on_invalid_platform(platform)
+            key = self.resource_class.platform_resource_identifier
+            normalised = {i: i for i in identifiers}
+            values = set(identifiers)
+        try:
+            with DbSession(intent="read") as session:
                 convert_schema = (
                     partial(self.schema_converters[schema].convert, session)
                     if schema != "aiod"
                     else self.resource_class_read.from_orm
                 )
-                where_clause = and_(
-                    is_(self.resource_class.date_deleted, None),
-                    (self.resource_class.platform == platform) if platform is not None else True,
-                )
                 query = (
                     select(self.resource_class)
-                    .where(where_clause)
-                    .offset(pagination.offset)
-                    .limit(pagination.limit)
+                    .where(
+                        key.in_(values),
+                        is_(self.resource_class.date_deleted, None),
+                        (self.resource_class.platform == platform)
+                        if platform is not None
+                        else True,
+                    )
+                    .options(*eager_loading_options(self.resource_class))
                 )
-
-                return self._wrap_with_headers(
-                    [convert_schema(resource) for resource in session.scalars(query).all()]
+                found = {str(getattr(r, key.key)): r for r in session.scalars(query).all()}
+                converted: dict[str | None, Any] = {
+                    identifier: convert_schema(r) for identifier, r in found.items()
+                }
+                return BatchResult(
+                    resources=[
+                        converted[normalised[i]] for i in identifiers if normalised[i] in converted
+                    ],
+                    missing=[i for i in identifiers if normalised[i] not in converted],
                 )
-            except Exception as e:
-                raise as_http_exception(e)
+        except Exception as e:
+            raise as_http_exception(e)
 
-    def get_resource(self, identifier: str, schema: str, platform: str | None = None):
+    def export_resources(self, schema: str, since: datetime.datetime | None) -> Iterator[str]:
         """
-        Get the resource identified by AIoD identifier (if platform is None) or by platform AND
-        platform-identifier (if platform is not None), return in given schema.
+        Yield all resources in given schema as lines of json, optionally only those modified
+        since a given date. The resources are fetched in batches, see in_batches. The identity
+        map of the session only keeps weak references to unmodified objects, so the memory usage
+        does not depend on the number of resources.
         """
-        _raise_error_on_invalid_schema(self._possible_schemas, schema)
-        try:
-            with DbSession() as session:
-                resource = self._retrieve_resource(session, identifier, platform=platform)
-                if schema != "aiod":
-                    return self.schema_converters[schema].convert(session, resource)
-                return self._wrap_with_headers(self.resource_class_read.from_orm(resource))
-        except Exception as e:
-            raise as_http_exception(e)
+        with DbSession(intent="read") as session:
+            convert_schema = (
+                partial(self.schema_converters[schema].convert, session)
+                if schema != "aiod"
+                else self.resource_class_read.from_orm
+            )
+            query = (
+                select(self.resource_class)
+                .where(is_(self.resource_class.date_deleted, None))
+                .options(*eager_loading_options(self.resource_class))
+            )
+            if since is not None:
+                query = query.join(self.resource_class.aiod_entry).where(
+                    AIoDEntryORM.date_modified >= since  # type: ignore[operator]
+                )
+            resources = in_batches(session, query, self.resource_class, EXPORT_BATCH_SIZE)
+            for resource in resources:
+                resource_json = jsonable_encoder(convert_schema(resource), exclude_none=True)
+                yield json.dumps(resource_json) + "\n"
 
     def get_resources_func(self):
         """
@@ -253,15 +608,49 @@ class ResourceRouter(abc.ABC):
         docstring and the variables are dynamic, and used in Swagger.
         """
 
-        def get_resources(
+        async def get_resources(
+            request: Request,
             pagination: Pagination = Depends(),
             schema: self._possible_schemas_type = "aiod",  # type:ignore
+            fields: self._fields_type = None,  # type:ignore
         ):
-            resources = self.get_resources(pagination=pagination, schema=schema, platform=None)
+            resources = await self.get_resources(
+                pagination=pagination,
+                schema=schema,
+                platform=None,
+                request_headers=request.headers,
+                fields=self._parse_fields(fields, schema),
+            )
             return resources
 
         return get_resources
 
+    def export_resources_func(self):
+        """
+        Return a function that can be used to stream all resources.
+        This function returns a function (instead of being that function directly) because the
+        docstring and the variables are dynamic, and used in Swagger.
+        """
+
+        def export_resources(
+            since: Annotated[
+                datetime.datetime | None,
+                Query(
+                    description="Only return the resources that were modified on or after this "
+                    "moment, based on aiod_entry.date_modified.",
+                ),
+            ] = None,
+            schema: self._possible_schemas_type = "aiod",  # type:ignore
+        ):
+            _raise_error_on_invalid_schema(self._possible_schemas, schema)
+            return StreamingResponse(
+                self.export_resources(schema=schema, since=since),
+                media_type="application/x-ndjson",
+                headers=self._deprecation_headers(),
+            )
+
+        return export_resources
+
     def get_resource_count_func(self):
         """
         Gets the total number of resources from the database.
@@ -275,32 +664,32 @@ class ResourceRouter(abc.ABC):
             ] = False,
         ):
             try:
-                with DbSession() as session:
-                    if not detailed:
-                        return (
-                            session.query(self.resource_class)
-                            .where(is_(self.resource_class.date_deleted, None))
-                            .count()
-                        )
-                    else:
-                        count_list = (
-                            session.query(
-                                self.resource_class.platform,
-                                func.count(self.resource_class.identifier),
-                            )
-                            .where(is_(self.resource_class.date_deleted, None))
-                            .group_by(self.resource_class.platform)
-                            .all()
-                        )
-                        return {
-                            platform if platform else "aiod": count
-                            for platform, count in count_list
-                        }
+                counts = resource_counts.get_resource(self.resource_name_plural)
+                if counts is None:
+                    counts = self._count_per_platform()
             except Exception as e:
                 raise as_http_exception(e)
+            if not detailed:
+                return sum(counts.values())
+            return counts
 
         return get_resource_count
 
+    def _count_per_platform(self) -> dict[str, int]:
+        """The number of resources per platform (or "aiod"), for resources of which the counts
+        are not kept by resource_counts."""
+        with DbSession(intent="read") as session:
+            count_list = (
+                session.query(
+                    self.resource_class.platform,
+                    func.count(self.resource_class.identifier),
+                )
+                .where(is_(self.resource_class.date_deleted, None))
+                .group_by(self.resource_class.platform)
+                .all()
+            )
+            return {platform if platform else "aiod": count for platform, count in count_list}
+
     def get_platform_resources_func(self):
         """
         Return a function that can be used to retrieve a list of resources for a platform.
@@ -308,7 +697,7 @@ class ResourceRouter(abc.ABC):
         docstring and the variables are dynamic, and used in Swagger.
         """
 
-        def get_resources(
+        async def get_resources(
             platform: Annotated[
                 str,
                 Path(
@@ -317,9 +706,17 @@ class ResourceRouter(abc.ABC):
                 ),
             ],
             pagination: Annotated[Pagination, Depends(Pagination)],
+            request: Request,
             schema: self._possible_schemas_type = "aiod",  # type:ignore
+            fields: self._fields_type = None,  # type:ignore
         ):
-            resources = self.get_resources(pagination=pagination, schema=schema, platform=platform)
+            resources = await self.get_resources(
+                pagination=pagination,
+                schema=schema,
+                platform=platform,
+                request_headers=request.headers,
+                fields=self._parse_fields(fields, schema),
+            )
             return resources
 
         return get_resources
@@ -331,15 +728,70 @@ class ResourceRouter(abc.ABC):
         docstring and the variables are dynamic, and used in Swagger.
         """
 
-        def get_resource(
+        async def get_resource(
             identifier: str,
+            request: Request,
             schema: self._possible_schemas_type = "aiod",  # type: ignore
+            fields: self._fields_type = None,  # type: ignore
         ):
-            resource = self.get_resource(identifier=identifier, schema=schema, platform=None)
-            return self._wrap_with_headers(resource)
+            return await self.get_resource_conditionally(
+                identifier=identifier,
+                schema=schema,
+                platform=None,
+                request_headers=request.headers,
+                fields=self._parse_fields(fields, schema),
+            )
 
         return get_resource
 
+    def get_resources_batch_func(self):
+        """
+        Return a function that can be used to retrieve multiple resources at once.
+        This function returns a function (instead of being that function directly) because the
+        docstring and the variables are dynamic, and used in Swagger.
+        """
+
+        def get_resources_batch(
+            identifier: Annotated[
+                list[str],
+                Query(description=f"The AIoD identifiers. At most {BATCH_LIMIT} can be given."),
+            ],
+            schema: self._possible_schemas_type = "aiod",  # type: ignore
+        ):
+            resources = self.get_resources_batch(identifier, schema=schema, platform=None)
+            return self._wrap_with_headers(resources)
+
+        return get_resources_batch
+
+    def get_platform_resources_batch_func(self):
+        """
+        Return a function that can be used to retrieve multiple resources of a platform at once.
+        This function returns a function (instead of being that function directly) because the
+        docstring and the variables are dynamic, and used in Swagger.
+        """
+
+        def get_resources_batch(
+            identifier: Annotated[
+                list[str],
+                Query(
+                    description="The identifiers under which the resources are known by the "
+                    f"platform. At most {BATCH_LIMIT} can be given.",
+                ),
+            ],
+            platform: Annotated[
+                str,
+                Path(
+                    description="Return resources of this platform",
+                    example="huggingface",
+                ),
+            ],
+            schema: self._possible_schemas_type = "aiod",  # type:ignore
+        ):
+            resources = self.get_resources_batch(identifier, schema=schema, platform=platform)
+            return self._wrap_with_headers(resources)
+
+        return get_resources_batch
+
     def get_platform_resource_func(self):
         """
         Return a function that can be used to retrieve a single resource of a platform.
@@ -347,7 +799,7 @@ class ResourceRouter(abc.ABC):
         docstring and the variables are dynamic, and used in Swagger.
         """
 
-        def get_resource(
+        async def get_resource(
             identifier: Annotated[
                 str,
                 Path(
@@ -361,9 +813,17 @@ class ResourceRouter(abc.ABC):
                     example="huggingface",
                 ),
             ],
+            request: Request,
             schema: self._possible_schemas_type = "aiod",  # type:ignore
+            fields: self._fields_type = None,  # type:ignore
         ):
-            return self.get_resource(identifier=identifier, schema=schema, platform=platform)
+            return await self.get_resource_conditionally(
+                identifier=identifier,
+                schema=schema,
+                platform=platform,
+                request_headers=request.headers,
+                fields=self._parse_fields(fields, schema),
+            )
 
         return get_resource
 
@@ -392,6 +852,7 @@ class ResourceRouter(abc.ABC):
                 with DbSession() as session:
                     try:
                         resource = self.create_resource(session, resource_create)
+                        response_cache.invalidate()
                         return self._wrap_with_headers({"identifier": resource.identifier})
                     except Exception as e:
                         self._raise_clean_http_exception(e, session, resource_create)
@@ -400,16 +861,203 @@ class ResourceRouter(abc.ABC):
 
         return register_resource
 
-    def create_resource(self, session: Session, resource_create_instance: SQLModel):
-        """Store a resource in the database"""
+    def create_resource(
+        self, session: Session, resource_create_instance: SQLModel, commit: bool = True
+    ):
+        """Store a resource in the database. If commit is False, committing is left to the
+        caller, so that multiple resources can be inserted in a single transaction."""
         resource = self.resource_class.from_orm(resource_create_instance)
         deserialize_resource_relationships(
             session, self.resource_class, resource, resource_create_instance
         )
         session.add(resource)
-        session.commit()
+        if commit:
+            session.commit()
         return resource
 
+    def update_resource(
+        self,
+        session: Session,
+        resource: RESOURCE,
+        resource_create_instance: SQLModel,
+        commit: bool = True,
+    ):
+        """Overwrite an existing resource with the values of the resource_create_instance. If
+        commit is False, committing is left to the caller."""
+        for attribute_name in self.deserialization_plan.attributes:
+            if hasattr(resource_create_instance, attribute_name):
+                new_value = getattr(resource_create_instance, attribute_name)
+                setattr(resource, attribute_name, new_value)
+        deserialize_resource_relationships(
+            session, self.resource_class, resource, resource_create_instance
+        )
+        if hasattr(resource, "aiod_entry"):
+            resource.aiod_entry.date_modified = datetime.datetime.utcnow()
+        resource = session.merge(resource)
+        if commit:
+            session.commit()
+        return resource
+
+    def patch_resource(
+        self,
+        session: Session,
+        resource: RESOURCE,
+        resource_patch_instance: SQLModel,
+        commit: bool = True,
+    ) -> bool:
+        """Update the fields of an existing resource that are set on the resource_patch_instance,
+        writing only what changed. Returns whether anything changed. If commit is False, committing
+        is left to the caller."""
+        changed = patch_resource(
+            session,
+            self.resource_class,
+            resource,
+            resource_patch_instance,
+            resource_patch_instance.__fields_set__,
+        )
+        if changed and hasattr(resource, "aiod_entry"):
+            resource.aiod_entry.date_modified = datetime.datetime.utcnow()
+        if commit:
+            session.commit()
+        return changed
+
+    def bulk_resources_func(self):
+        """
+        Return a function that can be used to register multiple resources at once.
+        This function returns a function (instead of being that function directly) because the
+        docstring is dynamic and used in Swagger.
+        """
+        clz_create = self.resource_class_create
+
+        def bulk_resources(
+            resource_create_instances: list[clz_create],  # type: ignore
+            update_existing: Annotated[
+                bool,
+                Query(
+                    description="If true, a resource with the same platform and "
+                    "platform_resource_identifier as an existing resource overwrites that "
+                    "resource, instead of resulting in a conflict.",
+                ),
+            ] = False,
+            chunk_size: Annotated[
+                int,
+                Query(description="The number of resources committed at once.", ge=1, le=1000),
+            ] = 100,
+            user: User = Depends(get_current_user),
+        ):
+            roles = [("create", "create")] + ([("update", "edit")] if update_existing else [])
+            for role, verb in roles:
+                if not user.has_any_role(
+                    KEYCLOAK_CONFIG.get("role"),
+                    f"{role}_{self.resource_name_plural}",
+                    f"crud_{self.resource_name_plural}",
+                ):
+                    raise HTTPException(
+                        status_code=status.HTTP_403_FORBIDDEN,
+                        detail=f"You do not have permission to {verb} {self.resource_name_plural}.",
+                    )
+            if len(resource_create_instances) > BULK_LIMIT:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"At most {BULK_LIMIT} {self.resource_name_plural} can be registered "
+                    "at once.",
+                )
+            try:
+                with DbSession() as session:
+                    results = []
+                    for start in range(0, len(resource_create_instances), chunk_size):
+                        end = start + chunk_size
+                        chunk = resource_create_instances[start:end]
+                        results.extend(self._store_chunk(session, chunk, update_existing))
+                    response_cache.invalidate()
+                    return self._wrap_with_headers(results)
+            except Exception as e:
+                raise as_http_exception(e)
+
+        return bulk_resources
+
+    def _store_chunk(
+        self, session: Session, resource_create_instances: list[SQLModel], update_existing: bool
+    ) -> list[BulkItemResult]:
+        """
+        Store the resources using a single query per related table to resolve names, and a single
+        commit. If that fails, the chunk is rolled back and the resources are stored one by one,
+        so that the reason of failure can be determined for each resource separately.
+        """
+        try:
+            existing: dict[tuple[str, str], Any] = (
+                self._existing_resources(session, resource_create_instances)
+                if update_existing
+                else {}
+            )
+            with prefetched_named_relations(
+                session, self.resource_class, resource_create_instances
+            ):
+                resources = []
+                for instance in resource_create_instances:
+                    resource = _existing_resource(existing, instance)
+                    if resource is not None:
+                        resource = self.update_resource(session, resource, instance, commit=False)
+                    else:
+                        resource = self.create_resource(session, instance, commit=False)
+                    resources.append(resource)
+                session.flush()
+            results = [BulkItemResult(identifier=r.identifier, status_code=200) for r in resources]
+            session.commit()
+            return results
+        except Exception:
+            session.rollback()
+        return [self._store_item(session, i, update_existing) for i in resource_create_instances]
+
+    def _store_item(
+        self, session: Session, resource_create_instance: SQLModel, update_existing: bool
+    ) -> BulkItemResult:
+        try:
+            try:
+                existing: dict[tuple[str, str], Any] = (
+                    self._existing_resources(session, [resource_create_instance])
+                    if update_existing
+                    else {}
+                )
+                resource = _existing_resource(existing, resource_create_instance)
+                if resource is not None:
+                    resource = self.update_resource(session, resource, resource_create_instance)
+                else:
+                    resource = self.create_resource(session, resource_create_instance)
+                return BulkItemResult(identifier=resource.identifier, status_code=200)
+            except Exception as e:
+                raise self._raise_clean_http_exception(e, session, resource_create_instance)
+        except Exception as e:
+            http_exception = as_http_exception(e)
+            return BulkItemResult(
+                status_code=http_exception.status_code, detail=http_exception.detail
+            )
+
+    def _existing_resources(
+        self, session: Session, resource_create_instances: list[SQLModel]
+    ) -> dict[tuple[str, str], RESOURCE]:
+        """The existing resources with the same platform and platform_resource_identifier as
+        any of these resource_create_instances, using a single query."""
+        identifiers_by_platform: dict[str, set[str]] = {}
+        for instance in resource_create_instances:
+            if (key := _platform_key(instance)) is not None:
+                identifiers_by_platform.setdefault(key[0], set()).add(key[1])
+        if not identifiers_by_platform:
+            return {}
+        query = select(self.resource_class).where(
+            is_(self.resource_class.date_deleted, None),
+            or_(
+                *[
+                    and_(
+                        self.resource_class.platform == platform,
+                        self.resource_class.platform_resource_identifier.in_(identifiers),
+                    )
+                    for platform, identifiers in identifiers_by_platform.items()
+                ]
+            ),
+        )
+        return {(r.platform, r.platform_resource_identifier): r for r in session.scalars(query)}
+
     def put_resource_func(self):
         """
         Return a function that can be used to update a resource.
@@ -436,26 +1084,48 @@ class ResourceRouter(abc.ABC):
             with DbSession() as session:
                 try:
                     resource = self._retrieve_resource(session, identifier)
-                    for attribute_name in resource.schema()["properties"]:
-                        if hasattr(resource_create_instance, attribute_name):
-                            new_value = getattr(resource_create_instance, attribute_name)
-                            setattr(resource, attribute_name, new_value)
-                    deserialize_resource_relationships(
-                        session, self.resource_class, resource, resource_create_instance
-                    )
-                    if hasattr(resource, "aiod_entry"):
-                        resource.aiod_entry.date_modified = datetime.datetime.utcnow()
-                    try:
-                        session.merge(resource)
-                        session.commit()
-                    except Exception as e:
-                        self._raise_clean_http_exception(e, session, resource_create_instance)
+                    self.update_resource(session, resource, resource_create_instance)
+                    response_cache.invalidate()
                     return self._wrap_with_headers(None)
                 except Exception as e:
                     raise self._raise_clean_http_exception(e, session, resource_create_instance)
 
         return put_resource
 
+    def patch_resource_func(self):
+        """
+        Return a function that can be used to partially update a resource.
+        This function returns a function (instead of being that function directly) because the
+        docstring is dynamic and used in Swagger.
+        """
+        clz_patch = self.resource_class_patch
+
+        def patch_resource(
+            identifier: int,
+            resource_patch_instance: clz_patch,  # type: ignore
+            user: User = Depends(get_current_user),
+        ):
+            if not user.has_any_role(
+                KEYCLOAK_CONFIG.get("role"),
+                f"update_{self.resource_name_plural}",
+                f"crud_{self.resource_name_plural}",
+            ):
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail=f"You do not have permission to edit {self.resource_name_plural}.",
+                )
+
+            with DbSession() as session:
+                try:
+                    resource = self._retrieve_resource(session, identifier, eager_loading=True)
+                    if self.patch_resource(session, resource, resource_patch_instance):
+                        response_cache.invalidate()
+                    return self._wrap_with_headers(None)
+                except Exception as e:
+                    raise self._raise_clean_http_exception(e, session, resource_patch_instance)
+
+        return patch_resource
+
     def delete_resource_func(self):
         """
         Return a function that can be used to delete a resource.
@@ -489,27 +1159,28 @@ class ResourceRouter(abc.ABC):
                         resource.date_deleted = datetime.datetime.utcnow()
                         session.add(resource)
                     session.commit()
+                    response_cache.invalidate()
                     return self._wrap_with_headers(None)
                 except Exception as e:
                     raise as_http_exception(e)
 
         return delete_resource
 
-    def _retrieve_resource(self, session, identifier, platform=None):
+    def _retrieve_resource(
+        self, session, identifier, platform=None, eager_loading=False, fields=None
+    ):
         if platform is None:
             query = select(self.resource_class).where(self.resource_class.identifier == identifier)
         else:
-            if platform not in {n.name for n in PlatformName}:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"platform '{platform}' not recognized.",
-                )
+            _raise_error_on_invalid_platform(platform)
             query = select(self.resource_class).where(
                 and_(
                     self.resource_class.platform_resource_identifier == identifier,
                     self.resource_class.platform == platform,
                 )
             )
+        if eager_loading:
+            query = query.options(*self._loader_options(fields))
         resource = session.scalars(query).first()
         if not resource or resource.date_deleted is not None:
             name = (
@@ -539,13 +1210,142 @@ class ResourceRouter(abc.ABC):
             ),
         ]
 
-    def _wrap_with_headers(self, resource):
+    @property
+    def _fields_type(self):
+        return Annotated[
+            str | None,
+            Query(
+                description="A comma-separated list of the attributes that should be returned, "
+                "e.g. 'identifier,name'. Only these attributes are retrieved from the database. "
+                "By default, all attributes are returned. Can only be used with the aiod schema.",
+            ),
+        ]
+
+    def _parse_fields(self, fields: str | None, schema: str) -> tuple[str, ...] | None:
+        """The requested fields, validated against the read class, in the order of the read
+        class. None if all fields should be returned."""
+        if fields is None:
+            return None
+        if schema != "aiod":
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Fields can only be selected using the aiod schema.",
+            )
+        requested = {field.strip() for field in fields.split(",") if field.strip()}
+        available = list(self.resource_class_read.__fields__)
+        invalid = requested - set(available)
+        if invalid or not requested:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid fields '{fields}'. Expected a comma-separated list of "
+                f"{', '.join(available)}.",
+            )
+        return tuple(field for field in available if field in requested)
+
+    def _schema_class(self, schema: str, fields: tuple[str, ...] | None = None) -> Type:
+        if schema != "aiod":
+            return self.schema_converters[schema].to_class
+        if fields is not None:
+            return _sparse_read_class(self.resource_class_read, fields)
+        return self.resource_class_read
+
+    def _loader_options(self, fields: tuple[str, ...] | None) -> tuple:
+        """The loader options to select only the columns and relationships needed to serialize
+        these fields (or all fields, if None)."""
+        if fields is None:
+            return eager_loading_options(self.resource_class)
+        columns = inspect(self.resource_class).column_attrs.keys()
+        return (
+            load_only(
+                self.resource_class.date_deleted,
+                *(getattr(self.resource_class, field) for field in fields if field in columns),
+            ),
+            *eager_loading_options(self.resource_class, frozenset(fields)),
+        )
+
+    @property
+    def _lists_namespace(self) -> str:
+        return f"{self.resource_name_plural}/lists"
+
+    def _resource_namespace(self, *key) -> str:
+        """The namespace of a single resource, given its identifier, or its platform and
+        platform_resource_identifier"""
+        return "/".join([self.resource_name_plural, *map(str, key)])
+
+    async def _cached_or_load(
+        self,
+        cache_key: tuple,
+        load: Callable[[Session], CachedResponse | Response],
+        request_headers: Mapping[str, str] | None,
+    ) -> Response:
+        """The cached response, or else the response loaded using a read session of the async
+        engine, which is then cached. The cache key is determined before loading, see
+        ResponseCache.key."""
+        key = await response_cache.key(*cache_key)
+        cached = await response_cache.get(key)
+        if cached is not None:
+            return self._cached_response(cached, request_headers)
+        async with AsyncDbSession(intent="read") as session:
+            loaded = await session.run_sync(load)
+        if isinstance(loaded, Response):
+            return loaded
+        await response_cache.set(key, loaded)
+        return self._cached_response(loaded)
+
+    def _cached_response(
+        self, cached: CachedResponse, request_headers: Mapping[str, str] | None = None
+    ) -> Response:
+        if "ETag" in cached.headers:
+            last_modified = (
+                parsedate_to_datetime(cached.headers["Last-Modified"])
+                if "Last-Modified" in cached.headers
+                else None
+            )
+            if _is_not_modified(request_headers, cached.headers["ETag"], last_modified):
+                return self._not_modified(cached.headers)
+        return Response(
+            content=cached.body,
+            media_type="application/json",
+            headers=cached.headers | self._deprecation_headers(),
+        )
+
+    def _deprecation_headers(self) -> dict[str, str]:
         if self.deprecated_from is None:
-            return resource
+            return {}
         timestamp = datetime.datetime.combine(
             self.deprecated_from, datetime.time.min, tzinfo=datetime.timezone.utc
         ).timestamp()
-        headers = {"Deprecated": format_date_time(timestamp)}
+        return {"Deprecated": format_date_time(timestamp)}
+
+    def _etag(
+        self,
+        schema: str,
+        *versions,
+        weak: bool = False,
+        fields: tuple[str, ...] | None = None,
+    ) -> str:
+        """An entity tag for the representation in given schema (and with given fields) of the
+        resources with these (identifier, date_modified) versions."""
+        representation = [self.resource_name, self.version, schema]
+        if fields is not None:
+            representation.append(",".join(fields))
+        representation += [
+            (identifier, date_modified.isoformat() if date_modified else None)
+            for identifier, date_modified in versions
+        ]
+        digest = hashlib.sha256(json.dumps(representation).encode()).hexdigest()[:32]
+        return f'W/"{digest}"' if weak else f'"{digest}"'
+
+    def _not_modified(self, headers: dict[str, str]) -> Response:
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED, headers=headers | self._deprecation_headers()
+        )
+
+    def _wrap_with_headers(self, resource, headers: dict[str, str] | None = None):
+        headers = dict(headers) if headers else {}
+        headers.update(self._deprecation_headers())
+        if not headers:
+            return resource
         return JSONResponse(content=jsonable_encoder(resource, exclude_none=True), headers=headers)
 
     def _raise_clean_http_exception(
@@ -623,3 +1423,97 @@ def _raise_error_on_invalid_schema(possible_schemas, schema):
             detail=f"Invalid schema {schema}. Expected {' or '.join(possible_schemas)}",
             status_code=status.HTTP_400_BAD_REQUEST,
         )
+
+
+def _is_not_modified(
+    request_headers: Mapping[str, str] | None,
+    etag: str,
+    last_modified: datetime.datetime | None = None,
+) -> bool:
+    """Whether the client already holds this version, according to the If-None-Match or (only if
+    If-None-Match is absent) the If-Modified-Since request header. Uses weak comparison."""
+    if request_headers is None:
+        return False
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or etag.removeprefix("W/") in tags
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=datetime.timezone.utc)
+    # HTTP dates have a resolution of seconds
+    return last_modified.replace(microsecond=0) <= since
+
+
+@functools.lru_cache(maxsize=256)  # bounded, since the fields are chosen by the client
+def _sparse_read_class(resource_class_read: Type[SQLModel], fields: tuple[str, ...]) -> Type:
+    """A read class containing only these fields of the resource_class_read, serialized in the
+    same way."""
+    definitions = {
+        name: (resource_class_read.__fields__[name].annotation, field.field_info)
+        for name, field in resource_class_read.__fields__.items()
+        if name in fields
+    }
+    return create_model(
+        resource_class_read.__name__, __config__=resource_class_read.__config__, **definitions
+    )
+
+
+def _platform_key(resource) -> tuple[str, str] | None:
+    """The platform and platform_resource_identifier, or None if the resource lacks either."""
+    platform = getattr(resource, "platform", None)
+    platform_resource_identifier = getattr(resource, "platform_resource_identifier", None)
+    if platform is None or platform_resource_identifier is None:
+        return None
+    return platform, platform_resource_identifier
+
+
+def _existing_resource(existing: dict[tuple[str, str], Any], resource_create) -> Any | None:
+    """The existing resource that this resource_create overwrites, if any. Resources without a
+    platform key never match an existing resource."""
+    key = _platform_key(resource_create)
+    return existing.get(key) if key is not None else None
+
+
+def _raise_error_on_invalid_platform(platform: str):
+    if platform not in {n.name for n in PlatformName}:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"platform '{platform}' not recognized.",
+        )
+
+
+def _normalise_identifier(identifier: str) -> str | None:
+    """The AIoD identifier as it is stored, e.g. "1" for "01", or None if it is not a number."""
+    try:
+        return str(int(identifier))
+    except ValueError:
+        return None
+
+
+def _encode_cursor(identifier: int, platform: str | None) -> str:
+    """Encode the key of the last returned resource into an opaque cursor."""
+    key = {"identifier": identifier, "platform": platform}
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+
+def _decode_cursor(cursor: str, platform: str | None) -> int:
+    """Return the identifier after which the next page starts, given an opaque cursor."""
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        identifier = key["identifier"]
+        cursor_platform = key["platform"]
+    except (binascii.Error, json.JSONDecodeError, UnicodeDecodeError, KeyError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor.")
+    if not isinstance(identifier, int) or cursor_platform != platform:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor: it does not belong to this listing.",
+        )
+    return identifier
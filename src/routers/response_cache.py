@@ -0,0 +1,162 @@
+"""
+Caching of the serialized responses of the read endpoints.
+
+A write can change the responses of other resources as well (e.g. adding a dataset to the
+has_part of a news item changes the is_part_of of the dataset), so every write invalidates all
+cached responses. This is done by incrementing a generation counter, which is part of every key:
+the old responses become unreachable, and are evicted once they expire (or, for the in-process
+backend, when the cache is full). Writes are rare compared to reads, so the cache stays effective.
+
+With read replicas, a response loaded from a replica right after a write might not include that
+write yet. Storing it under the new generation would keep it cached for max_age, so for the
+replication lag after a write, only responses read from the primary are stored.
+
+Note that with the in-process (memory) backend, other worker processes are not notified of
+writes, so that their responses can be stale until they expire. Use the redis backend to share
+the cache (and its invalidation) between worker processes.
+
+The read endpoints are async, so they use the async methods of the backend, which do not block
+the event loop.
+"""
+import dataclasses
+import json
+import threading
+from typing import Any
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import parse_obj_as
+
+from caching import CacheBackend, MemoryCacheBackend, RedisCacheBackend
+from config import CACHE_CONFIG, DB_CONFIG
+from database.session import is_reading_from_primary
+
+PARENTS_NAMESPACE = "parents"
+GENERATION_KEY = "response_generation"
+INVALIDATED_KEY = "response_invalidated"
+
+
+@dataclasses.dataclass
+class CachedResponse:
+    body: bytes
+    headers: dict[str, str]
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        backend: CacheBackend,
+        max_age: float,
+        enabled: bool = True,
+        replication_lag: float = 0,
+    ):
+        """
+        Args:
+            backend: the store of the serialized responses.
+            max_age: the maximum number of seconds that a response is cached.
+            enabled: whether responses are cached at all.
+            replication_lag: the maximum number of seconds that the read replicas lag behind the
+                primary, 0 if there are no replicas.
+        """
+        self.backend = backend
+        self.max_age = max_age
+        self.enabled = enabled
+        self.replication_lag = replication_lag
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    async def key(self, namespace: str, *key: Any) -> str:
+        """
+        The key of a response, including the current generation. It should be determined before
+        loading the response: a write that is committed while the response is loading, will then
+        invalidate the (possibly stale) response that is stored under this key.
+        """
+        generation = await self.backend.counter_async(GENERATION_KEY)
+        return f"response:{generation}:{namespace}:{json.dumps(key, default=str)}"
+
+    async def get(self, key: str) -> CachedResponse | None:
+        if not self.enabled or is_reading_from_primary():
+            # A client that should read its own writes, should not get a response that might
+            # have been cached from a lagging replica.
+            return None
+        value = await self.backend.get_async(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        cached = json.loads(value)
+        return CachedResponse(body=cached["body"].encode(), headers=cached["headers"])
+
+    async def set(self, key: str, response: CachedResponse):
+        if not self.enabled:
+            return
+        if (
+            self.replication_lag
+            and not is_reading_from_primary()
+            and await self.backend.get_async(INVALIDATED_KEY) is not None
+        ):
+            # The response might have been loaded from a replica that lags behind the last write
+            return
+        value = json.dumps({"body": response.body.decode(), "headers": response.headers})
+        await self.backend.set_async(key, value.encode(), self.max_age)
+
+    def invalidate(self):
+        """Invalidate all cached responses."""
+        self.backend.increment(GENERATION_KEY)
+        if self.replication_lag:
+            self.backend.set(INVALIDATED_KEY, b"1", self.replication_lag)
+
+    def clear(self):
+        """Only supported by the memory backend. Used in tests."""
+        if isinstance(self.backend, MemoryCacheBackend):
+            self.backend.clear()
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def _create_response_cache() -> ResponseCache:
+    backend: CacheBackend
+    if CACHE_CONFIG.get("backend", "memory") == "redis":
+        backend = RedisCacheBackend(url=CACHE_CONFIG["redis_url"])
+    else:
+        backend = MemoryCacheBackend(maxsize=CACHE_CONFIG.get("size", 1000))
+    return ResponseCache(
+        backend=backend,
+        max_age=CACHE_CONFIG.get("max_age", 60),
+        enabled=CACHE_CONFIG.get("enabled", True),
+        replication_lag=(
+            DB_CONFIG.get("read_your_writes_seconds", 5) if DB_CONFIG.get("replicas") else 0
+        ),
+    )
+
+
+response_cache = _create_response_cache()
+
+
+def encode(content: Any, response_model: Any) -> Any:
+    """
+    Convert the content to json-compatible data as FastAPI would for a route with this
+    response_model, excluding None values. The content is validated against the response_model
+    first, so that attributes that are not part of it (e.g. the identifiers of ORM subclasses) are
+    dropped.
+    """
+    validated = parse_obj_as(response_model, jsonable_encoder(content))
+    return jsonable_encoder(validated, exclude_none=True)
+
+
+def serialize(content: Any, response_model: Any) -> bytes:
+    """Serialize the content as FastAPI would for a route with this response_model, see
+    encode."""
+    return json.dumps(
+        encode(content, response_model),
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
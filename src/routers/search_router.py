@@ -1,7 +1,14 @@
 import abc
-from typing import TypeVar, Generic, Any, Type, Literal, Annotated, TypeAlias
+import base64
+import binascii
+import functools
+import hashlib
+import json
+from typing import TypeVar, Generic, Any, Type, Literal, Annotated, TypeAlias, Iterable
 
+from elasticsearch import NotFoundError
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
 from pydantic.generics import GenericModel
 from sqlmodel import SQLModel, select, Field
@@ -9,6 +16,7 @@ from starlette import status
 
 from database.model.concept.aiod_entry import AIoDEntryRead
 from database.model.concept.concept import AIoDConcept
+from database.model.eager_loading import eager_loading_options
 from database.model.platform.platform import Platform
 from database.model.resource_read_and_create import resource_read
 from database.session import DbSession
@@ -17,6 +25,15 @@ from .search_routers.elasticsearch import ElasticsearchSingleton
 
 SORT = {"identifier": "asc"}
 LIMIT_MAX = 1000
+CURSOR_START = "*"
+GET_ALL_DESCRIPTION = (
+    "Resources indexed by the search indexer are always returned completely. Resources indexed "
+    "before the search indexer was introduced only contain their indexed fields in Elasticsearch: "
+    "if true, these are retrieved completely from the database; if false, only their indexed "
+    "fields are returned."
+)
+# How long Elasticsearch keeps a point in time open after the last request using it
+POINT_IN_TIME_KEEP_ALIVE = "1m"
 
 RESOURCE = TypeVar("RESOURCE", bound=AIoDConcept)
 RESOURCE_READ = TypeVar("RESOURCE_READ", bound=BaseModel)
@@ -29,6 +46,16 @@ class SearchResult(GenericModel, Generic[RESOURCE_READ]):
         description="The maximum number of returned results, as specified in the " "input."
     )
     offset: int = Field(description="The offset, as specified in the input.")
+    next_cursor: str | None = Field(
+        default=None,
+        description="If a cursor was given in the input, the cursor of the next page. It is "
+        "empty on the last page.",
+    )
+
+
+def encode_resource(resource: SQLModel) -> dict[str, Any]:
+    """The resource as returned by the resource endpoints, leaving out the None values."""
+    return jsonable_encoder(resource, exclude_none=True)
 
 
 class SearchRouter(Generic[RESOURCE], abc.ABC):
@@ -64,9 +91,14 @@ class SearchRouter(Generic[RESOURCE], abc.ABC):
     def indexed_fields(self) -> set[str]:
         """The set of indexed fields"""
 
+    @functools.cached_property
+    def resource_class_read(self) -> Type[SQLModel]:
+        """The read class of the resource, which is also the schema of the documents."""
+        return resource_read(self.resource_class)  # type: ignore
+
     def create(self, url_prefix: str) -> APIRouter:
         router = APIRouter()
-        read_class = resource_read(self.resource_class)  # type: ignore
+        read_class = self.resource_class_read
         indexed_fields: TypeAlias = Literal[tuple(self.indexed_fields)]  # type: ignore
 
         @router.get(
@@ -101,59 +133,122 @@ class SearchRouter(Generic[RESOURCE], abc.ABC):
             ] = None,
             limit: Annotated[int, Query(ge=1, le=LIMIT_MAX)] = 10,
             offset: Annotated[int, Query(ge=0)] = 0,
-            get_all: Annotated[
-                bool,
+            cursor: Annotated[
+                str | None,
                 Query(
-                    description="If true, a request to the database is made to retrieve all data. "
-                    "If false, only the indexed information is returned.",
+                    description="Opaque cursor, as returned in the next_cursor of a previous "
+                    f"result, or '{CURSOR_START}' for the first page. If given, the results "
+                    "directly following the previous page are returned, and the offset should be "
+                    "omitted. Contrary to the offset, walking through all results using the "
+                    "cursor does not get slower for later pages. The results are those of the "
+                    "moment the first page was requested.",
                 ),
+            ] = None,
+            get_all: Annotated[
+                bool,
+                Query(description=GET_ALL_DESCRIPTION),
             ] = False,
         ):
-            try:
-                with DbSession() as session:
-                    query = select(Platform)
-                    database_platforms = session.scalars(query).all()
-                    platform_names = {p.name for p in database_platforms}
-            except Exception as e:
-                raise as_http_exception(e)
-
-            if platforms and not set(platforms).issubset(platform_names):
+            validate_platforms(platforms)
+            query = self.es_query(search_query, search_fields or self.indexed_fields, platforms)
+
+            next_cursor = None
+            if cursor is None:
+                result = ElasticsearchSingleton().client.search(
+                    index=self.es_index, query=query, from_=offset, size=limit, sort=SORT
+                )
+            elif offset:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"The available platforms are: {platform_names}",
-                )
-            fields = search_fields if search_fields else self.indexed_fields
-            query_matches = [{"match": {f: search_query}} for f in fields]
-            query = {"bool": {"should": query_matches, "minimum_should_match": 1}}
-            if platforms:
-                platform_matches = [{"match": {"platform": p}} for p in platforms]
-                query["bool"]["must"] = {
-                    "bool": {"should": platform_matches, "minimum_should_match": 1}
-                }
-
-            result = ElasticsearchSingleton().client.search(
-                index=self.es_index, query=query, from_=offset, size=limit, sort=SORT
-            )
-            total_hits = result["hits"]["total"]["value"]
-            if get_all:
-                identifiers = [hit["_source"]["identifier"] for hit in result["hits"]["hits"]]
-                resources: list[SQLModel] = self._db_query(
-                    read_class, self.resource_class, identifiers
+                    detail="The offset cannot be combined with a cursor.",
                 )
             else:
-                resources: list[Type[read_class]] = [  # type: ignore
-                    self._cast_resource(read_class, hit["_source"])
-                    for hit in result["hits"]["hits"]
-                ]
+                result, next_cursor = self._search_after(query, cursor, limit)
             return SearchResult[read_class](  # type: ignore
-                total_hits=total_hits,
-                resources=resources,
+                total_hits=result["hits"]["total"]["value"],
+                resources=self.resources(read_class, result["hits"]["hits"], get_all),
                 limit=limit,
                 offset=offset,
+                next_cursor=next_cursor,
             )
 
         return router
 
+    def es_query(
+        self, search_query: str, fields: Iterable[str], platforms: list[str] | None
+    ) -> dict[str, Any]:
+        """The Elasticsearch query matching the search_query against any of the fields."""
+        query_matches = [{"match": {f: search_query}} for f in fields]
+        query = {"bool": {"should": query_matches, "minimum_should_match": 1}}
+        if platforms:
+            platform_matches = [{"match": {"platform": p}} for p in platforms]
+            query["bool"]["must"] = {
+                "bool": {"should": platform_matches, "minimum_should_match": 1}
+            }
+        return query
+
+    def resources(
+        self, read_class: Type[SQLModel], hits: list[dict[str, Any]], get_all: bool
+    ) -> list[SQLModel]:
+        """
+        The resources of the Elasticsearch hits. The documents written by the search indexer
+        contain the complete resource. Only documents that were indexed before that, containing
+        just the indexed fields, are retrieved from the database if get_all.
+        """
+        if get_all:
+            identifiers = [
+                hit["_source"]["identifier"] for hit in hits if not _is_complete(hit["_source"])
+            ]
+            if identifiers:
+                from_db = self._db_query(read_class, self.resource_class, identifiers)
+                resources = {resource.identifier: resource for resource in from_db}
+                return [
+                    resources.get(hit["_source"]["identifier"])
+                    or self._cast_resource(read_class, hit["_source"])
+                    for hit in hits
+                ]
+        return [self._cast_resource(read_class, hit["_source"]) for hit in hits]  # type: ignore
+
+    def _search_after(
+        self, query: dict[str, Any], cursor: str, limit: int
+    ) -> tuple[dict[str, Any], str | None]:
+        """
+        Search the page following the cursor, using a point in time, so that the pages are
+        consistent with each other, and search_after on the sort values of the last hit, so that
+        no hits need to be skipped.
+
+        Returns:
+            the search result and the cursor of the next page, or None on the last page.
+        """
+        client = ElasticsearchSingleton().client
+        query_digest = _digest(self.es_index, query)
+        if cursor == CURSOR_START:
+            point_in_time = client.open_point_in_time(
+                index=self.es_index, keep_alive=POINT_IN_TIME_KEEP_ALIVE
+            )["id"]
+            search_after = None
+        else:
+            point_in_time, search_after = _decode_cursor(cursor, query_digest)
+        try:
+            result = client.search(
+                query=query,
+                size=limit,
+                sort=SORT,
+                pit={"id": point_in_time, "keep_alive": POINT_IN_TIME_KEEP_ALIVE},
+                search_after=search_after,
+            )
+        except NotFoundError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor: it has expired. Please start again from the first page.",
+            )
+        point_in_time = result["pit_id"]  # The id can change between requests
+        hits = result["hits"]["hits"]
+        if len(hits) < limit:
+            client.close_point_in_time(id=point_in_time)
+            return result, None
+        return result, _encode_cursor(point_in_time, hits[-1]["sort"], query_digest)
+
     def _db_query(
         self,
         read_class: Type[SQLModel],
@@ -161,9 +256,13 @@ class SearchRouter(Generic[RESOURCE], abc.ABC):
         identifiers: list[int],
     ) -> list[SQLModel]:
         try:
-            with DbSession() as session:
+            with DbSession(intent="read") as session:
                 filter_ = resource_class.identifier.in_(identifiers)  # type: ignore[attr-defined]
-                query = select(resource_class).where(filter_)
+                query = (
+                    select(resource_class)
+                    .where(filter_)
+                    .options(*eager_loading_options(resource_class))
+                )
                 resources = session.scalars(query).all()
                 identifiers_found = {resource.identifier for resource in resources}
                 identifiers_missing = set(identifiers) - identifiers_found
@@ -178,9 +277,35 @@ class SearchRouter(Generic[RESOURCE], abc.ABC):
         except Exception as e:
             raise as_http_exception(e)
 
+    def es_document(self, resource: AIoDConcept) -> dict[str, Any]:
+        """
+        The document in Elasticsearch of this resource. It is the complete resource, as returned
+        by the GET endpoint, so that searching does not need the database. To be able to search
+        on them, the indexed fields, the date_modified of the aiod_entry and the description are
+        added at the top level as well.
+        """
+        read = self.resource_class_read.from_orm(resource)
+        document = jsonable_encoder(read, exclude_none=True)
+        model_to_es = {val: key for key, val in self.key_translations.items()}
+        fields = self.indexed_fields - {"description_plain", "description_html"}
+        for field in fields:
+            document[model_to_es.get(field, field)] = getattr(resource, field)
+        document["identifier"] = resource.identifier
+        document["date_modified"] = resource.aiod_entry.date_modified
+        description = resource.description  # type: ignore[attr-defined]
+        document["description_plain"] = description.plain if description else None
+        document["description_html"] = description.html if description else None
+        document["type"] = self.es_index
+        return document
+
     def _cast_resource(
         self, read_class: Type[SQLModel], resource_dict: dict[str, Any]
     ) -> Type[RESOURCE]:
+        if _is_complete(resource_dict):
+            fields = {
+                key: val for key, val in resource_dict.items() if key in read_class.__fields__
+            }
+            return read_class.parse_obj(fields)  # type: ignore
         kwargs = {
             self.key_translations.get(key, key): val
             for key, val in resource_dict.items()
@@ -195,3 +320,55 @@ class SearchRouter(Generic[RESOURCE], abc.ABC):
             "html": resource_dict["description_html"],
         }
         return resource
+
+
+def validate_platforms(platforms: list[str] | None):
+    """Raise an HTTPException if any of the platforms does not exist. The database is only
+    queried if platforms are given."""
+    if not platforms:
+        return
+    try:
+        with DbSession(intent="read") as session:
+            platform_names = set(session.scalars(select(Platform.name)).all())
+    except Exception as e:
+        raise as_http_exception(e)
+    if not set(platforms).issubset(platform_names):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"The available platforms are: {platform_names}",
+        )
+
+
+def _is_complete(resource_dict: dict[str, Any]) -> bool:
+    """Whether the document contains the complete resource, instead of only the indexed fields,
+    as indexed by logstash."""
+    return "aiod_entry" in resource_dict
+
+
+def _digest(es_index: str, query: dict[str, Any]) -> str:
+    """A short digest of the search, to make sure that a cursor is only used for its search."""
+    search = json.dumps({"index": es_index, "query": query}, sort_keys=True)
+    return hashlib.sha256(search.encode()).hexdigest()[:16]
+
+
+def _encode_cursor(point_in_time: str, search_after: list, query_digest: str) -> str:
+    """Encode the point in time and the sort values of the last hit into an opaque cursor."""
+    key = {"pit": point_in_time, "search_after": search_after, "query": query_digest}
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+
+def _decode_cursor(cursor: str, query_digest: str) -> tuple[str, list]:
+    """Return the point in time and the sort values after which the next page starts."""
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        point_in_time = key["pit"]
+        search_after = key["search_after"]
+        cursor_digest = key["query"]
+    except (binascii.Error, json.JSONDecodeError, UnicodeDecodeError, KeyError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor.")
+    if not isinstance(search_after, list) or cursor_digest != query_digest:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor: it does not belong to this search.",
+        )
+    return point_in_time, search_after
@@ -7,6 +7,7 @@ from .search_router_organisations import SearchRouterOrganisations
 from .search_router_projects import SearchRouterProjects
 from .search_router_publications import SearchRouterPublications
 from .search_router_services import SearchRouterServices
+from search_indexer.outbox import track_changes
 from ..search_router import SearchRouter
 
 router_list: list[SearchRouter] = [
@@ -20,3 +21,6 @@ router_list: list[SearchRouter] = [
     SearchRouterPublications(),
     SearchRouterServices(),
 ]
+
+for router in router_list:
+    track_changes(router.resource_class, router.es_index)
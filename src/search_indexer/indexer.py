@@ -0,0 +1,152 @@
+"""
+The search indexer keeps the Elasticsearch indices up to date with the database, by draining the
+search outbox (see search_indexer/outbox.py). It replaces the logstash pipelines that polled all
+tables for changes.
+
+For every batch of outbox rows, the current state of the changed resources is read from the
+database, using one query per index. The resources that exist and are not deleted are indexed,
+the others are removed from the index, using a single bulk request. Because the current state is
+used instead of the change itself, draining is idempotent: handling an outbox row twice, or rows
+in a different order, gives the same result. The outbox rows are only removed after Elasticsearch
+accepted all operations, so that a failed batch is retried. The outbox rows of an index that is
+being rebuilt are skipped until the rebuild is done (see search_indexer/reindex.py).
+
+Only a single indexer should run. Two indexers handling different changes of the same resource
+could write the resulting documents in the wrong order, leaving a stale document in the index. The
+outbox rows are locked, so that an indexer that is started by accident waits for the other one.
+
+Usage, from the src directory:
+    python3 search_indexer/indexer.py --batch-size 500 --poll-interval 1
+"""
+import argparse
+import logging
+import time
+from collections import defaultdict
+from typing import Any
+
+from elasticsearch import Elasticsearch, helpers
+from sqlalchemy import Select, delete
+from sqlalchemy.orm import Session
+from sqlmodel import select
+
+from database.model.eager_loading import eager_loading_options
+from database.session import DbSession
+from routers.search_router import SearchRouter
+from routers.search_routers import router_list
+from routers.search_routers.elasticsearch import ElasticsearchSingleton
+from search_indexer.outbox import SearchOutbox, SearchReindex
+from setup_logger import setup_logger
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Index the changes of the search outbox.")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=500,
+        help="The maximum number of outbox rows that are handled in a single bulk request.",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=1,
+        help="The number of seconds to wait for new changes, once the outbox is empty.",
+    )
+    return parser.parse_args()
+
+
+def es_id(es_index: str, identifier: int) -> str:
+    """The document identifier in Elasticsearch, which is the same as the one used by logstash."""
+    return f"{es_index}_{identifier}"
+
+
+def index_changes(session: Session, client: Elasticsearch, batch_size: int = 500) -> int:
+    """
+    Handle the oldest batch of outbox rows, and remove them from the outbox. The rows of indices
+    that are being rebuilt are skipped.
+
+    Returns:
+        the number of outbox rows that were handled.
+    """
+    rebuilding = select(SearchReindex.es_index)
+    query = (
+        select(SearchOutbox)
+        .where(SearchOutbox.es_index.not_in(rebuilding))  # type: ignore[attr-defined]
+        .order_by(SearchOutbox.identifier)
+        .limit(batch_size)
+        .with_for_update()
+    )
+    changes = session.scalars(query).all()
+    if not changes:
+        return 0
+    identifiers_per_index: dict[str, set[int]] = defaultdict(set)
+    for change in changes:
+        identifiers_per_index[change.es_index].add(change.resource_identifier)
+
+    routers = {router.es_index: router for router in router_list}
+    actions: list[dict[str, Any]] = []
+    for es_index, identifiers in identifiers_per_index.items():
+        actions += _actions(session, routers[es_index], identifiers)
+    helpers.bulk(client, actions, ignore_status=404)  # 404: deleting a document that is absent
+
+    outbox_identifiers = [change.identifier for change in changes]
+    session.execute(
+        delete(SearchOutbox).where(
+            SearchOutbox.identifier.in_(outbox_identifiers)  # type: ignore[attr-defined]
+        )
+    )
+    session.commit()
+    return len(changes)
+
+
+def indexed_resources(router: SearchRouter) -> Select:
+    """The query of the resources that should be in the index of this router: the ones that are
+    not deleted, loading everything that is needed for their documents."""
+    resource_class: Any = router.resource_class
+    return (
+        select(resource_class)
+        .where(resource_class.date_deleted.is_(None))
+        .options(*eager_loading_options(resource_class))
+    )
+
+
+def _actions(session: Session, router: SearchRouter, identifiers: set[int]) -> list[dict[str, Any]]:
+    """The bulk actions that make the index reflect the current state of these resources."""
+    resource_class: Any = router.resource_class
+    query = indexed_resources(router).where(resource_class.identifier.in_(identifiers))
+    resources = {resource.identifier: resource for resource in session.scalars(query).all()}
+    actions = []
+    for identifier in sorted(identifiers):
+        action: dict[str, Any] = {
+            "_index": router.es_index,
+            "_id": es_id(router.es_index, identifier),
+        }
+        if identifier in resources:
+            action["_op_type"] = "index"
+            action["_source"] = router.es_document(resources[identifier])
+        else:
+            action["_op_type"] = "delete"
+        actions.append(action)
+    return actions
+
+
+def main():
+    args = _parse_args()
+    setup_logger()
+    client = ElasticsearchSingleton().client
+    logging.info("Indexing the changes of the search outbox...")
+    while True:
+        try:
+            with DbSession() as session:
+                n_handled = index_changes(session, client, args.batch_size)
+        except Exception:
+            logging.exception("Indexing failed, retrying after the poll interval.")
+            n_handled = 0
+        if n_handled:
+            logging.info(f"Indexed {n_handled} changes.")
+        if n_handled < args.batch_size:
+            time.sleep(args.poll_interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+The transactional outbox of the search indexer. Every insert, update or delete of a resource that
+is searchable in Elasticsearch adds a row to the search_outbox table, in the same transaction as
+the change itself. The indexer (see search_indexer/indexer.py) drains this table into
+Elasticsearch, so that a change is indexed if, and only if, it is committed.
+
+The changes are collected by SQLAlchemy mapper events during a flush, and written using a single
+INSERT after the flush. A change of only the aiod_entry of a resource (e.g. its date_modified,
+which is updated on every change through the API) counts as a change of the resource itself. The
+aiod_entry does not refer back to its resource, so every session keeps track of the resources by
+their aiod_entry_identifier, as they are loaded or inserted.
+
+The documents contain the links between AIResources in both directions (e.g. has_part and
+is_part_of). Linking resource A to resource B therefore changes both documents, while only A is
+changed. So for every changed link, the resources on both sides are added to the outbox, by
+selecting the resources of the changed ai_resource identifiers after the flush.
+
+Bulk statements, such as the ones used by the hard_delete script, do not trigger these events.
+This is fine for the hard deletes, because the resources were already removed from the index when
+they were soft deleted.
+"""
+import weakref
+from typing import Type
+
+from sqlalchemy import event, insert, literal, select
+from sqlalchemy.orm import Mapper, Session, attributes, object_session
+from sqlmodel import Field, SQLModel
+
+from database.model.ai_resource.resource_links import changed_links
+from database.model.ai_resource.resource_table import AIResourceORM
+from database.model.concept.aiod_entry import AIoDEntryORM
+from database.model.concept.concept import AIoDConcept
+from database.model.field_length import SHORT
+
+PENDING_CHANGES = "pending_search_outbox_changes"
+AIOD_ENTRY_OWNERS = "search_outbox_aiod_entry_owners"
+PENDING_AI_RESOURCES = "pending_search_outbox_ai_resources"
+
+_tracked: dict[Type[AIoDConcept], str] = {}  # resource class -> es_index
+
+
+class SearchOutbox(SQLModel, table=True):  # type: ignore [call-arg]
+    """A resource that has changed, and should be (re)indexed in, or removed from,
+    Elasticsearch."""
+
+    __tablename__ = "search_outbox"
+
+    identifier: int = Field(default=None, primary_key=True)
+    es_index: str = Field(max_length=SHORT)
+    resource_identifier: int = Field()
+
+
+class SearchReindex(SQLModel, table=True):  # type: ignore [call-arg]
+    """An index that is being rebuilt (see search_indexer/reindex.py). The indexer leaves its
+    outbox rows alone until the rebuild is done, so that they are applied to the new index."""
+
+    __tablename__ = "search_reindex"
+
+    es_index: str = Field(max_length=SHORT, primary_key=True)
+
+
+def track_changes(resource_class: Type[AIoDConcept], es_index: str):
+    """Add a row to the search outbox on every insert, update or delete of this resource class."""
+    if resource_class in _tracked:
+        return
+    _tracked[resource_class] = es_index
+    for identifier in ("after_insert", "after_update", "after_delete"):
+        event.listen(resource_class, identifier, _register_change)
+    for identifier in ("load", "refresh"):
+        event.listen(resource_class, identifier, _register_loaded_owner)
+
+
+def _register_change(mapper: Mapper, connection, target: AIoDConcept):
+    session = object_session(target)
+    if session is not None:
+        pending = session.info.setdefault(PENDING_CHANGES, set())
+        pending.add((_tracked[mapper.class_], target.identifier))
+        _register_owner(session, target)
+
+
+def _register_loaded_owner(target: AIoDConcept, context, *args):
+    # The context is None for the instances created by Session.merge
+    session = object_session(target)
+    if session is not None:
+        _register_owner(session, target)
+
+
+def _register_owner(session: Session, target: AIoDConcept):
+    """Keep track of the resource owning the aiod_entry, as long as the resource is in use."""
+    aiod_entry_identifier = target.__dict__.get("aiod_entry_identifier")
+    if aiod_entry_identifier is not None:
+        owners = session.info.setdefault(AIOD_ENTRY_OWNERS, weakref.WeakValueDictionary())
+        owners[aiod_entry_identifier] = target
+
+
+@event.listens_for(Session, "before_flush")
+def _register_aiod_entry_changes(session: Session, flush_context, instances):
+    """Flag the resources of which only the aiod_entry changed, so that the after_update event is
+    triggered for them as well."""
+    owners = session.info.get(AIOD_ENTRY_OWNERS)
+    if not owners:
+        return
+    for entry in session.dirty:
+        if isinstance(entry, AIoDEntryORM):
+            owner = owners.get(entry.identifier)
+            if (
+                owner is not None
+                and owner.__dict__.get("aiod_entry_identifier") == entry.identifier
+            ):
+                attributes.flag_dirty(owner)
+
+
+@event.listens_for(Session, "before_flush")
+def _register_ai_resource_link_changes(session: Session, flush_context, instances):
+    """Register the ai_resources on both sides of the links that were added or removed."""
+    ai_resources = changed_links(session)
+    if ai_resources:
+        session.info.setdefault(PENDING_AI_RESOURCES, []).extend(ai_resources)
+
+
+@event.listens_for(Session, "after_flush")
+def _write_outbox(session: Session, flush_context):
+    pending = session.info.pop(PENDING_CHANGES, None)
+    if pending:
+        rows = [
+            {"es_index": es_index, "resource_identifier": identifier}
+            for es_index, identifier in sorted(pending)
+        ]
+        session.connection().execute(insert(SearchOutbox), rows)
+    pending_ai_resources = session.info.pop(PENDING_AI_RESOURCES, None)
+    if pending_ai_resources:
+        _write_outbox_of_ai_resources(session, pending_ai_resources)
+
+
+def _write_outbox_of_ai_resources(session: Session, ai_resources: list[AIResourceORM]):
+    """Add the resources of these ai_resources to the outbox, using a single INSERT ... SELECT
+    per resource type."""
+    identifiers_per_type: dict[str, set[int]] = {}
+    for ai_resource in ai_resources:
+        identifiers_per_type.setdefault(ai_resource.type, set()).add(ai_resource.identifier)
+    for resource_class, es_index in _tracked.items():
+        identifiers = identifiers_per_type.get(resource_class.__tablename__)
+        if not identifiers or not hasattr(resource_class, "ai_resource_id"):
+            continue
+        resources = select(literal(es_index), resource_class.identifier).where(
+            resource_class.ai_resource_id.in_(sorted(identifiers))
+        )
+        session.connection().execute(
+            insert(SearchOutbox).from_select(["es_index", "resource_identifier"], resources)
+        )
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard(session: Session):
+    session.info.pop(PENDING_CHANGES, None)
+    session.info.pop(PENDING_AI_RESOURCES, None)
@@ -0,0 +1,210 @@
+"""
+Rebuilds Elasticsearch indices without downtime, e.g. after a change of the mapping.
+
+For every SearchRouter, a new versioned index (e.g. dataset_20240101120000) is created and
+filled with all resources, which are read from the database in batches and loaded using parallel
+bulk requests. During the load, refreshing is disabled and there are no replicas, which makes the
+load considerably faster. Afterwards, the alias with the name of the SearchRouter.es_index (e.g.
+dataset) is atomically moved to the new index, and the old index is removed. Searching keeps
+working on the old index until that moment.
+
+During the rebuild, the search indexer (see search_indexer/indexer.py) leaves the outbox rows of
+the index alone. Searching therefore shows the state of the start of the rebuild, until the swap.
+Afterwards, the indexer applies the changes that were made during the load to the new index,
+including deletes. Changes committed before the start are seen by the load itself.
+
+The indices are filled initially in the same way: the es_setup container in the docker-compose
+file creates them empty, after which they are built using --only-new. Indices that are a concrete
+index instead of an alias, such as those still filled by logstash, are built as well.
+
+Usage, from the src directory:
+    python3 search_indexer/reindex.py [--indices dataset news] [--threads 4] [--only-new]
+"""
+import argparse
+import dataclasses
+import datetime
+import logging
+import time
+from typing import Any, Iterator
+
+from elasticsearch import Elasticsearch, helpers
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+
+from database.model.eager_loading import in_batches
+from database.session import DbSession
+from routers.search_router import SearchRouter
+from routers.search_routers import router_list
+from routers.search_routers.elasticsearch import ElasticsearchSingleton
+from search_indexer.indexer import es_id, indexed_resources
+from search_indexer.outbox import SearchReindex
+from setup.es_setup.definitions import generate_mapping
+from setup_logger import setup_logger
+
+
+@dataclasses.dataclass
+class ReindexResult:
+    alias: str
+    index: str
+    n_documents: int
+    seconds: float
+
+    @property
+    def documents_per_second(self) -> float:
+        return self.n_documents / self.seconds if self.seconds else 0.0
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Rebuild the Elasticsearch indices.")
+    parser.add_argument(
+        "--indices",
+        nargs="+",
+        choices=[router.es_index for router in router_list],
+        help="The indices to rebuild. By default, all indices are rebuilt.",
+    )
+    parser.add_argument(
+        "--only-new",
+        action="store_true",
+        help="Only build the indices that were never built by this script, leaving the others.",
+    )
+    parser.add_argument(
+        "--threads", type=int, default=4, help="The number of parallel bulk requests."
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=500, help="The number of documents per bulk request."
+    )
+    parser.add_argument(
+        "--replicas",
+        type=int,
+        default=1,
+        help="The number of replicas of the new index, set after loading it.",
+    )
+    return parser.parse_args()
+
+
+def reindex(
+    session: Session,
+    client: Elasticsearch,
+    router: SearchRouter,
+    threads: int = 4,
+    chunk_size: int = 500,
+    replicas: int = 1,
+) -> ReindexResult:
+    """Build a new index for this router, and move the alias router.es_index to it."""
+    alias = router.es_index
+    _pause_indexing(session, alias)
+    try:
+        return _rebuild(session, client, router, threads, chunk_size, replicas)
+    finally:
+        _resume_indexing(session, alias)
+
+
+def _rebuild(
+    session: Session,
+    client: Elasticsearch,
+    router: SearchRouter,
+    threads: int,
+    chunk_size: int,
+    replicas: int,
+) -> ReindexResult:
+    alias = router.es_index
+    index = f"{alias}_{datetime.datetime.utcnow():%Y%m%d%H%M%S}"
+    client.indices.create(
+        index=index,
+        mappings=generate_mapping(router.resource_class_read, router.indexed_fields)["mappings"],
+        settings={"index": {"refresh_interval": "-1", "number_of_replicas": 0}},
+    )
+    start = time.perf_counter()
+    n_documents = 0
+    try:
+        for ok, _ in helpers.parallel_bulk(
+            client,
+            _actions(session, router, index, chunk_size),
+            thread_count=threads,
+            chunk_size=chunk_size,
+        ):
+            n_documents += ok
+    except Exception:
+        client.indices.delete(index=index)  # The alias still points to the old index
+        raise
+    seconds = time.perf_counter() - start
+
+    client.indices.put_settings(
+        index=index,
+        settings={"index": {"refresh_interval": None, "number_of_replicas": replicas}},
+    )
+    client.indices.refresh(index=index)
+    _swap_alias(client, alias, index)
+    return ReindexResult(alias=alias, index=index, n_documents=n_documents, seconds=seconds)
+
+
+def _actions(
+    session: Session, router: SearchRouter, index: str, chunk_size: int
+) -> Iterator[dict[str, Any]]:
+    resources = in_batches(session, indexed_resources(router), router.resource_class, chunk_size)
+    for resource in resources:
+        yield {
+            "_op_type": "index",
+            "_index": index,
+            "_id": es_id(router.es_index, resource.identifier),
+            "_source": router.es_document(resource),
+        }
+
+
+def _swap_alias(client: Elasticsearch, alias: str, index: str):
+    """Atomically point the alias to the new index, removing the old index."""
+    actions: list[dict[str, Any]] = [{"add": {"index": index, "alias": alias}}]
+    if client.indices.exists_alias(name=alias):
+        old_indices = list(client.indices.get_alias(name=alias).body)
+        actions += [{"remove_index": {"index": old_index}} for old_index in old_indices]
+    elif client.indices.exists(index=alias):
+        # A concrete index with the name of the alias, created before the aliases were used
+        actions.append({"remove_index": {"index": alias}})
+    client.indices.update_aliases(actions=actions)
+
+
+def is_built(client: Elasticsearch, router: SearchRouter) -> bool:
+    """Whether the index of this router was built by this script, i.e. whether it is an alias."""
+    return bool(client.indices.exists_alias(name=router.es_index))
+
+
+def _pause_indexing(session: Session, es_index: str):
+    """Let the indexer skip the outbox rows of this index. The row is merged, so that a rebuild
+    that was killed before it could resume the indexing can simply be restarted."""
+    session.merge(SearchReindex(es_index=es_index))
+    session.commit()
+
+
+def _resume_indexing(session: Session, es_index: str):
+    session.rollback()
+    session.execute(delete(SearchReindex).where(SearchReindex.es_index == es_index))
+    session.commit()
+
+
+def main():
+    args = _parse_args()
+    setup_logger()
+    client = ElasticsearchSingleton().client
+    routers = [r for r in router_list if args.indices is None or r.es_index in args.indices]
+    for router in routers:
+        if args.only_new and is_built(client, router):
+            logging.info(f"Index {router.es_index} was built before, skipping it.")
+            continue
+        logging.info(f"Rebuilding index {router.es_index}...")
+        with DbSession() as session:
+            result = reindex(
+                session,
+                client,
+                router,
+                threads=args.threads,
+                chunk_size=args.chunk_size,
+                replicas=args.replicas,
+            )
+        logging.info(
+            f"Rebuilt index {result.alias} as {result.index}: {result.n_documents} documents in "
+            f"{result.seconds:.1f}s ({result.documents_per_second:.0f} docs/sec)."
+        )
+
+
+if __name__ == "__main__":
+    main()
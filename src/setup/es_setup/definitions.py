@@ -1,11 +1,64 @@
+import copy
+import datetime
+import decimal
+from typing import Any, Iterable, Type
+
+from pydantic import BaseModel
+
+TEXT = {"type": "text", "fields": {"keyword": {"type": "keyword"}}}
+# Longer values are stored in the _source, but cannot be filtered on
+KEYWORD = {"type": "keyword", "ignore_above": 256}
+
 BASE_MAPPING = {
     "mappings": {
         "properties": {
             "date_modified": {"type": "date"},
             "identifier": {"type": "long"},
-            "name": {"type": "text", "fields": {"keyword": {"type": "keyword"}}},
-            "description_plain": {"type": "text", "fields": {"keyword": {"type": "keyword"}}},
-            "description_html": {"type": "text", "fields": {"keyword": {"type": "keyword"}}},
+            "name": TEXT,
+            "description_plain": TEXT,
+            "description_html": TEXT,
+            "type": {"type": "keyword"},
         }
     }
 }
+
+
+def generate_mapping(read_class: Type[BaseModel], indexed_fields: Iterable[str]) -> dict[str, Any]:
+    """
+    The mapping of the documents of a resource, which contain the complete resource as serialized
+    by its read class (see SearchRouter.es_document). The indexed fields can be searched as text,
+    the other fields are mapped according to their type, so that they can be filtered on.
+    Unknown fields are stored, but not indexed.
+    """
+    mapping: dict[str, Any] = copy.deepcopy(BASE_MAPPING)
+    mapping["mappings"]["dynamic"] = False
+    properties = mapping["mappings"]["properties"]
+    for field_name, field_mapping in _properties(read_class).items():
+        properties.setdefault(field_name, field_mapping)
+    for field_name in indexed_fields:
+        properties[field_name] = TEXT
+    return mapping
+
+
+def _properties(model: Type[BaseModel]) -> dict[str, Any]:
+    """The mapping of the fields of a pydantic model. Lists do not need a separate mapping in
+    Elasticsearch: a list of keywords is mapped as keyword."""
+    return {name: _field_mapping(field.type_) for name, field in model.__fields__.items()}
+
+
+def _field_mapping(type_: Any) -> dict[str, Any]:
+    if not isinstance(type_, type):
+        return {"type": "object", "enabled": False}
+    if issubclass(type_, BaseModel):
+        return {"properties": _properties(type_)}
+    if issubclass(type_, bool):
+        return {"type": "boolean"}
+    if issubclass(type_, int):
+        return {"type": "long"}
+    if issubclass(type_, (float, decimal.Decimal)):
+        return {"type": "double"}
+    if issubclass(type_, (datetime.date, datetime.datetime)):
+        return {"type": "date"}
+    if issubclass(type_, str):
+        return KEYWORD
+    return {"type": "object", "enabled": False}
@@ -3,41 +3,28 @@
 
 """Generates the elasticsearch indices
 
-Launched by the es_logstash_setup container in the docker-compose file.
+Launched by the es_setup container in the docker-compose file, which afterwards fills the new
+indices using search_indexer/reindex.py --only-new. Existing indices are left untouched: to apply a
+changed mapping, use search_indexer/reindex.py.
 """
 
-import copy
 import logging
 
-from definitions import BASE_MAPPING
+from definitions import generate_mapping
 from routers.search_routers import router_list
 from routers.search_routers.elasticsearch import ElasticsearchSingleton
-from setup.logstash_setup.generate_logstash_config_files import GLOBAL_FIELDS
 from setup_logger import setup_logger
 
 
-def generate_mapping(fields):
-    mapping = copy.deepcopy(BASE_MAPPING)
-    for field_name in fields:
-        mapping["mappings"]["properties"][field_name] = {
-            "type": "text",
-            "fields": {"keyword": {"type": "keyword"}},
-        }
-    return mapping
-
-
 def main():
     setup_logger()
     es_client = ElasticsearchSingleton().client
-    entities = {
-        router.es_index: list(router.indexed_fields ^ GLOBAL_FIELDS) for router in router_list
-    }
     logging.info("Generating indices...")
-    for es_index, fields in entities.items():
-        mapping = generate_mapping(fields)
+    for router in router_list:
+        mapping = generate_mapping(router.resource_class_read, router.indexed_fields)
 
         # ignore 400 cause by IndexAlreadyExistsException when creating an index
-        es_client.indices.create(index=es_index, body=mapping, ignore=400)
+        es_client.indices.create(index=router.es_index, body=mapping, ignore=400)
     logging.info("Generating indices completed.")
 
 
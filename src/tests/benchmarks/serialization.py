@@ -0,0 +1,93 @@
+"""
+Microbenchmark of the CPU time per request that is spent on the (de)serialization of a dataset.
+
+An in-memory sqlite database is used, so that the database round trips take little time
+compared to the work done in Python. The numbers are only meaningful relative to each other,
+e.g. to compare a change against its base commit.
+
+Usage, from the src directory:
+    DB=SQLite python -m tests.benchmarks.serialization --repetitions 500
+"""
+import argparse
+import json
+import logging
+import time
+from typing import Callable
+
+from sqlmodel import Session, create_engine
+
+from database.model.concept.concept import AIoDConcept
+from database.model.platform.platform import Platform
+from database.model.platform.platform_names import PlatformName
+from routers.resource_routers import DatasetRouter
+from setup_logger import setup_logger
+from tests.testutils.paths import path_test_resources
+
+
+def _body() -> dict:
+    body = {}
+    for scheme in ("aiod_concept", "ai_resource", "ai_asset"):
+        with open(path_test_resources() / "schemes" / "aiod" / f"{scheme}.json", "r") as f:
+            body.update(json.load(f))
+    return body
+
+
+def _cpu_time_per_call(function: Callable[[], object], repetitions: int) -> float:
+    function()  # warm-up, e.g. filling the caches
+    start = time.process_time()
+    for _ in range(repetitions):
+        function()
+    return (time.process_time() - start) / repetitions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--repetitions", type=int, default=500)
+    args = parser.parse_args()
+    setup_logger()
+
+    engine = create_engine("sqlite://")
+    AIoDConcept.metadata.create_all(engine)
+    router = DatasetRouter()
+    instance = router.resource_class_create.parse_obj(_body())
+    new_instance = router.resource_class_create.parse_obj(
+        _body() | {"platform_resource_identifier": "2"}
+    )
+    with Session(engine) as session:
+        session.add_all([Platform(name=name) for name in PlatformName])
+        resource = router.create_resource(session, instance)
+        identifier = resource.identifier
+
+        def post():
+            router.create_resource(session, new_instance, commit=False)
+            session.flush()
+            session.rollback()
+
+        def put():
+            existing = router._retrieve_resource(session, identifier)
+            router.update_resource(session, existing, instance, commit=False)
+            session.flush()
+            session.rollback()
+
+        def get():
+            existing = router._retrieve_resource(session, identifier, eager_loading=True)
+            router.resource_class_read.from_orm(existing)
+
+        loaded = router._retrieve_resource(session, identifier, eager_loading=True)
+
+        def serialize():
+            """The serialization of GET, without the query"""
+            router.resource_class_read.from_orm(loaded)
+
+        for name, function in [
+            ("POST", post),
+            ("PUT", put),
+            ("GET", get),
+            ("serialize", serialize),
+        ]:
+            seconds = _cpu_time_per_call(function, args.repetitions)
+            logging.info(f"{name:<10} {seconds * 1e6:10.0f} µs CPU per request")
+
+
+if __name__ == "__main__":
+    main()
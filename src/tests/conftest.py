@@ -1 +1,30 @@
+import pytest
+
+from authentication import introspection_cache, jwks_cache
+from database.model.named_relation_cache import named_relation_cache
+from routers.resource_counts import resource_counts
+from routers.response_cache import response_cache
+
 pytest_plugins = ["tests.testutils.default_instances", "tests.testutils.default_sqlalchemy"]
+
+
+@pytest.fixture(autouse=True)
+def clear_authentication_caches():
+    """The tests mock different users using the same token, so the results should not be cached"""
+    introspection_cache.clear()
+    jwks_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    """The database is cleared after each test, so the cached responses are invalid as well"""
+    response_cache.clear()
+    resource_counts.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_named_relation_cache():
+    """The database is cleared after each test, so the cached identifiers are invalid as well"""
+    named_relation_cache.clear()
+    yield
+    named_relation_cache.clear()
@@ -1,4 +1,6 @@
 import json
+import time
+
 import responses
 
 from connectors.openml.openml_dataset_connector import OpenMlDatasetConnector
@@ -24,6 +26,37 @@ def test_first_run():
     assert {len(d.citation) for d in datasets} == {0}
 
 
+def test_concurrent_fetch_preserves_order():
+    state = {}
+    connector = OpenMlDatasetConnector(limit_per_iteration=2, n_workers=4)
+    with responses.RequestsMock() as mocked_requests:
+        for offset in (0, 2):
+            mock_list_data(mocked_requests, offset)
+        for i in range(2, 5):
+            mock_get_data(mocked_requests, str(i))
+
+        datasets = list(connector.run(state, from_identifier=0, limit=None))
+
+    assert [d.platform_resource_identifier for d in datasets] == ["2", "3", "4"]
+    assert state["last_id"] == 4, state
+
+
+def test_concurrent_fetch_stops_early():
+    connector = OpenMlDatasetConnector(n_workers=2)
+    started = []
+
+    def fetch_record(identifier: int) -> int:
+        started.append(identifier)
+        time.sleep(0.05)
+        return identifier
+
+    results = connector.fetch_concurrently(fetch_record, range(100))
+    assert next(results) == 0
+    results.close()
+    time.sleep(0.2)
+    assert len(started) <= 2 * connector.n_workers + 1, "Only a bounded window is fetched ahead"
+
+
 def test_request_empty_list():
     """Tests if the state doesn't change after a request when OpenML returns an empty list."""
     state = {"offset": 2, "last_id": 3}
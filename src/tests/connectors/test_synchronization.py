@@ -0,0 +1,119 @@
+import logging
+import pathlib
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy.engine import Engine
+from sqlmodel import select
+
+from connectors import synchronization
+from connectors.example.example import ExampleDatasetConnector
+from connectors.record_error import RecordError
+from connectors.synchronization import save_batch_to_database, synchronize
+from database.model.ai_resource.keyword import Keyword
+from database.model.dataset.dataset import Dataset
+from database.model.resource_read_and_create import resource_create
+from database.session import DbSession
+from routers.resource_routers import DatasetRouter
+from tests.testutils.query_count import count_queries
+
+DatasetCreate = resource_create(Dataset)
+
+
+def _dataset(identifier: str, keywords: list[str], platform="example"):
+    return DatasetCreate(
+        name=f"dataset {identifier}",
+        platform=platform,
+        platform_resource_identifier=identifier,
+        keyword=keywords,
+    )
+
+
+def test_save_batch(engine: Engine):
+    connector = ExampleDatasetConnector()
+    items = [_dataset(str(i), ["shared", f"keyword {i}"]) for i in range(5)]
+    items.append(RecordError(identifier="6", error="Error while fetching"))
+    with DbSession() as session:
+        errors = save_batch_to_database(session, connector, DatasetRouter(), items)
+    assert [e.identifier for e in errors] == ["6"]
+
+    with DbSession() as session:
+        datasets = session.scalars(select(Dataset)).all()
+        assert {d.platform_resource_identifier for d in datasets} == {str(i) for i in range(5)}
+        assert {k.name for k in datasets[0].keyword} == {"shared", "keyword 0"}
+        keywords = session.scalars(select(Keyword)).all()
+        assert len(keywords) == 6
+
+
+def test_save_batch_skips_existing(engine: Engine):
+    connector = ExampleDatasetConnector()
+    with DbSession() as session:
+        save_batch_to_database(session, connector, DatasetRouter(), [_dataset("1", ["a"])])
+    with DbSession() as session:
+        items = [_dataset("1", ["b"]), _dataset("2", ["b"])]
+        errors = save_batch_to_database(session, connector, DatasetRouter(), items)
+    assert errors == []
+    with DbSession() as session:
+        datasets = session.scalars(select(Dataset).order_by(Dataset.identifier)).all()
+        assert [d.platform_resource_identifier for d in datasets] == ["1", "2"]
+        assert [k.name for k in datasets[0].keyword] == ["a"]
+
+
+def test_save_batch_failure_is_reported_per_record(engine: Engine):
+    connector = ExampleDatasetConnector()
+    items = [
+        _dataset("1", ["a"]),
+        _dataset("2", ["a"], platform="unknown_platform"),
+        _dataset("3", ["a"]),
+    ]
+    with DbSession() as session:
+        errors = save_batch_to_database(session, connector, DatasetRouter(), items)
+    assert len(errors) == 1
+    with DbSession() as session:
+        datasets = session.scalars(select(Dataset)).all()
+        assert {d.platform_resource_identifier for d in datasets} == {"1", "3"}
+
+
+def test_save_batch_resolves_names_once_per_table(engine: Engine):
+    connector = ExampleDatasetConnector()
+    items = [_dataset(str(i), ["shared", f"keyword {i}"]) for i in range(10)]
+    with DbSession() as session:
+        with count_queries(engine) as statements:
+            save_batch_to_database(session, connector, DatasetRouter(), items)
+    keyword_selects = [s for s in statements if s.startswith("SELECT") and "FROM keyword" in s]
+    assert len(keyword_selects) == 1, keyword_selects
+
+
+def test_synchronize_recycles_session(
+    engine: Engine,
+    tmp_path: pathlib.Path,
+    caplog: pytest.LogCaptureFixture,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    n_sessions = 0
+
+    @contextmanager
+    def counting_session():
+        nonlocal n_sessions
+        n_sessions += 1
+        with DbSession() as session:
+            yield session
+
+    monkeypatch.setattr(synchronization, "DbSession", counting_session)
+    items = (_dataset(str(i), ["shared"]) for i in range(5))
+    with caplog.at_level(logging.INFO):
+        synchronize(
+            items,
+            connector=ExampleDatasetConnector(),
+            router=DatasetRouter(),
+            state={},
+            state_path=tmp_path / "state.json",
+            error_path=tmp_path / "errors.csv",
+            batch_size=2,
+            recycle_session_every=2,
+        )
+    assert n_sessions == 3
+    assert sum("Peak memory usage" in record.message for record in caplog.records) == 3
+    with DbSession() as session:
+        datasets = session.scalars(select(Dataset)).all()
+        assert {d.platform_resource_identifier for d in datasets} == {str(i) for i in range(5)}
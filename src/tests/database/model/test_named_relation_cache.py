@@ -0,0 +1,125 @@
+from unittest.mock import Mock
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlmodel import select
+from starlette.testclient import TestClient
+
+from authentication import keycloak_openid
+
+from database.deletion.triggers import add_deletion_log_triggers
+from database.model.ai_resource.keyword import Keyword
+from database.model.dataset.dataset import Dataset
+from database.model.named_relation_cache import (
+    NamedRelationGeneration,
+    _insert,
+    named_relation_cache,
+)
+from database.model.serializers import FindByNameDeserializerList
+from database.session import DbSession
+from tests.testutils.query_count import count_queries
+
+
+def _keyword_selects(statements: list[str]) -> list[str]:
+    return [s for s in statements if s.startswith("SELECT") and "FROM keyword" in s]
+
+
+def test_names_are_cached_after_commit(engine: Engine):
+    deserializer = FindByNameDeserializerList(Keyword)
+    with DbSession() as session:
+        keywords = deserializer.deserialize(session, ["a", "B"])
+        identifier_b = {k.name: k.identifier for k in keywords}["b"]
+        assert named_relation_cache.get(Keyword, "a") is None, "Not cached before the commit"
+        session.commit()
+    assert named_relation_cache.get(Keyword, "b") == identifier_b
+
+    with DbSession() as session:
+        with count_queries(engine) as statements:
+            cached = deserializer.deserialize(session, ["A", "b", "c"])
+        assert {k.name for k in cached} == {"a", "b", "c"}
+        assert len(_keyword_selects(statements)) == 1
+        session.commit()
+
+    with DbSession() as session:
+        with count_queries(engine) as statements:
+            deserializer.deserialize(session, ["a", "b", "c"])
+        assert _keyword_selects(statements) == []
+
+
+def test_rolled_back_names_are_not_cached(engine: Engine):
+    with DbSession() as session:
+        FindByNameDeserializerList(Keyword).deserialize(session, ["a"])
+        session.rollback()
+    with DbSession() as session:
+        session.commit()
+    assert named_relation_cache.get(Keyword, "a") is None
+
+
+def test_insert_existing_name_uses_existing_row(engine: Engine):
+    with DbSession() as session:
+        session.add(Keyword(name="a"))
+        session.commit()
+        (existing,) = session.scalars(select(Keyword)).all()
+        existing_identifier = existing.identifier
+
+    with DbSession() as session:
+        # As if "a" was inserted by a concurrent session, after checking whether it existed
+        keywords = _insert(session, Keyword, {"a", "b"})
+        session.commit()
+        assert {k.name: k.identifier for k in keywords}["a"] == existing_identifier
+        assert {k.name for k in session.scalars(select(Keyword)).all()} == {"a", "b"}
+
+
+def test_cache_cleared_on_hard_delete(engine: Engine):
+    with DbSession() as session:
+        keywords = FindByNameDeserializerList(Keyword).deserialize(session, ["orphan"])
+        session.add(Dataset(name="dataset", keyword=keywords))
+        session.commit()
+    assert named_relation_cache.get(Keyword, "orphan") is not None
+
+    with DbSession() as session:
+        dataset = session.scalars(select(Dataset)).one()
+        session.delete(dataset)
+        session.commit()
+        assert session.scalars(select(Keyword)).all() == [], "Deleted by the trigger"
+
+    with DbSession() as session:
+        with count_queries(engine) as statements:
+            (keyword,) = FindByNameDeserializerList(Keyword).deserialize(session, ["orphan"])
+        assert len(_keyword_selects(statements)) == 1, "The cache should be cleared"
+        session.commit()
+        assert session.get(Keyword, keyword.identifier) is not None
+
+
+def test_cache_invalidated_by_deletes_of_other_processes(
+    client: TestClient, engine: Engine, mocked_privileged_token: Mock
+):
+    keycloak_openid.introspect = mocked_privileged_token
+    headers = {"Authorization": "Fake token"}
+    body = {"name": "dataset", "keyword": ["orphan"]}
+    response = client.post("/datasets/v1", json=body, headers=headers)
+    assert response.status_code == 200, response.json()
+    assert named_relation_cache.get(Keyword, "orphan") is not None
+
+    with engine.begin() as connection:
+        # As the hard_delete script would, without notifying this process
+        connection.execute(text("DELETE FROM dataset"))
+        assert connection.execute(text("SELECT * FROM keyword")).all() == [], "Orphan deleted"
+
+    response = client.post("/datasets/v1", json=body, headers=headers)
+    assert response.status_code == 200, response.json()
+    response = client.get(f"/datasets/v1/{response.json()['identifier']}")
+    assert response.json()["keyword"] == ["orphan"]
+
+
+def test_deletions_increment_the_generation(engine: Engine):
+    add_deletion_log_triggers(engine)  # Installed again, as on every startup
+    with DbSession() as session:
+        session.add_all([Keyword(name=name) for name in ("a", "b", "c")])
+        session.commit()
+    with engine.begin() as connection:
+        connection.execute(text("DELETE FROM keyword WHERE name = 'a'"))
+        connection.execute(text("DELETE FROM keyword WHERE name IN ('b', 'c')"))
+    with DbSession() as session:
+        (counter,) = session.scalars(select(NamedRelationGeneration)).all()
+        assert counter.generation == 3
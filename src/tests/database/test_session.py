@@ -0,0 +1,186 @@
+import tempfile
+from unittest.mock import Mock
+
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlmodel import Session, create_engine
+from starlette.testclient import TestClient
+
+from authentication import keycloak_openid
+from database.model.concept.concept import AIoDConcept
+from database.model.platform.platform import Platform
+from database.model.platform.platform_names import PlatformName
+from database.session import (
+    AsyncDbSession,
+    DbSession,
+    EngineSingleton,
+    InstrumentedQueuePool,
+    ReplicaSet,
+    engine_options,
+    pool_statistics,
+    reads_from_primary,
+)
+from main import add_read_your_writes, add_routes
+from routers.response_cache import response_cache
+from tests.testutils.test_resource import TestResource, factory
+
+
+@pytest.fixture
+def instrumented_engine():
+    with tempfile.NamedTemporaryFile() as temporary_file:
+        engine = create_engine(
+            f"sqlite:///{temporary_file.name}?check_same_thread=False",
+            poolclass=InstrumentedQueuePool,
+            pool_size=1,
+            max_overflow=0,
+            pool_timeout=0.01,
+        )
+        yield engine
+        engine.dispose()
+
+
+def test_pool_statistics(instrumented_engine):
+    with instrumented_engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        statistics = pool_statistics(instrumented_engine)
+        assert statistics["checked_out"] == 1
+        with pytest.raises(PoolTimeoutError):
+            instrumented_engine.connect()
+
+    statistics = pool_statistics(instrumented_engine)
+    assert statistics["size"] == 1
+    assert statistics["checked_out"] == 0
+    assert statistics["checked_in"] == 1
+    assert statistics["checkouts"] == 2
+    assert statistics["timeouts"] == 1
+    assert statistics["wait_seconds_max"] >= 0.01
+    assert statistics["wait_seconds_mean"] == statistics["wait_seconds_total"] / 2
+
+
+def test_engine_options():
+    options = engine_options()
+    assert options["pool_size"] >= 1
+    assert options["pool_pre_ping"] is True
+
+
+@pytest.mark.parametrize(
+    "endpoint,key", [("/database_statistics/v1", "status"), ("/cache_statistics/v1", "hit_rate")]
+)
+def test_statistics_endpoints(
+    client: TestClient, mocked_token: Mock, mocked_privileged_token: Mock, endpoint: str, key: str
+):
+    response = client.get(endpoint)
+    assert response.status_code == 401, response.json()
+    keycloak_openid.introspect = mocked_token
+    response = client.get(endpoint, headers={"Authorization": "Fake token"})
+    assert response.status_code == 403, response.json()
+    keycloak_openid.introspect = mocked_privileged_token
+    response = client.get(endpoint, headers={"Authorization": "Fake privileged token"})
+    assert response.status_code == 200, response.json()
+    assert key in response.json()
+
+
+@pytest.fixture
+def replica(engine: Engine):
+    """An empty database, used as read replica of the test database."""
+    with tempfile.NamedTemporaryFile() as temporary_file:
+        replica = create_engine(f"sqlite:///{temporary_file.name}?check_same_thread=False")
+        AIoDConcept.metadata.create_all(replica)
+        EngineSingleton().patch(engine, replicas=[replica])
+        yield replica
+        EngineSingleton().patch(engine)
+        replica.dispose()
+
+
+def test_replica_set_round_robin(replica: Engine, engine: Engine):
+    replicas = ReplicaSet([replica, engine])
+    urls = []
+    for _ in range(4):
+        connection = replicas.connect()
+        assert connection is not None
+        with connection:
+            urls.append(connection.engine.url)
+    assert urls == [replica.url, engine.url] * 2
+
+
+def test_replica_set_failover(replica: Engine):
+    unavailable = create_engine("sqlite:////nonexistent/directory/db.sqlite")
+    replicas = ReplicaSet([unavailable, replica], retry_after=60)
+    for _ in range(3):
+        connection = replicas.connect()
+        assert connection is not None
+        with connection:
+            assert connection.engine is replica
+    assert ReplicaSet([unavailable]).connect() is None
+
+
+def test_db_session_intent(replica: Engine, engine: Engine):
+    with DbSession() as session:
+        assert session.get_bind().engine is engine
+    with DbSession(intent="read") as session:
+        assert session.get_bind().engine is replica
+    with reads_from_primary():
+        with DbSession(intent="read") as session:
+            assert session.get_bind().engine is engine
+
+
+@pytest.mark.asyncio
+async def test_async_db_session_intent(replica: Engine, engine: Engine):
+    async with AsyncDbSession() as session:
+        assert session.get_bind().url.database == engine.url.database
+    async with AsyncDbSession(intent="read") as session:
+        assert session.get_bind().engine.url.database == replica.url.database
+    with reads_from_primary():
+        async with AsyncDbSession(intent="read") as session:
+            assert session.get_bind().url.database == engine.url.database
+
+
+def test_read_your_writes(replica: Engine, mocked_privileged_token: Mock, body_asset: dict):
+    keycloak_openid.introspect = mocked_privileged_token
+    app = FastAPI()
+    add_routes(app)
+    add_read_your_writes(app)
+    client = TestClient(app, base_url="http://localhost")
+    response = client.post("/datasets/v1", json=body_asset, headers={"Authorization": "Fake"})
+    assert response.status_code == 200, response.json()
+    assert "aiod_read_your_writes" in response.cookies
+
+    response = client.get("/datasets/v1/1")
+    assert response.status_code == 200, response.json()
+
+    response_cache.clear()
+    other_client = TestClient(app, base_url="http://localhost")
+    response = other_client.get("/datasets/v1/1")
+    assert response.status_code == 404, "The replica is empty, since it is not replicated"
+
+
+def test_response_cache_not_filled_from_lagging_replica(
+    replica: Engine,
+    client_test_resource: TestClient,
+    engine_test_resource_filled: Engine,
+    mocked_privileged_token: Mock,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.setattr(response_cache, "replication_lag", 5)
+    keycloak_openid.introspect = mocked_privileged_token
+    with Session(replica) as session:
+        session.add_all([Platform(name=name) for name in PlatformName])
+        session.add(factory(title="A title"))
+        session.commit()
+
+    body = {"title": "new title", "platform": "example", "platform_resource_identifier": "1"}
+    response = client_test_resource.put(
+        "/test_resources/v0/1", json=body, headers={"Authorization": "Fake token"}
+    )
+    assert response.status_code == 200, response.json()
+    response = client_test_resource.get("/test_resources/v0/1")
+    assert response.json()["title"] == "A title", "The write is not yet replicated"
+
+    with Session(replica) as session:
+        session.get(TestResource, 1).title = "new title"
+        session.commit()
+    response = client_test_resource.get("/test_resources/v0/1")
+    assert response.json()["title"] == "new title", "The stale response should not be cached"
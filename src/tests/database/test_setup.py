@@ -0,0 +1,21 @@
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+from database.model.concept.concept import AIoDConcept
+from database.setup import create_missing_indexes
+
+
+def _index_names(engine: Engine, table: str) -> set[str]:
+    return {index["name"] for index in inspect(engine).get_indexes(table)}
+
+
+def test_create_missing_indexes(engine: Engine):
+    with engine.begin() as connection:
+        connection.execute(text("DROP INDEX ix_aiod_entry_date_modified"))
+        connection.execute(text("DROP INDEX ix_dataset_date_deleted"))
+    assert "ix_aiod_entry_date_modified" not in _index_names(engine, "aiod_entry")
+
+    create_missing_indexes(AIoDConcept.metadata, engine)
+    assert "ix_aiod_entry_date_modified" in _index_names(engine, "aiod_entry")
+    assert "ix_dataset_date_deleted" in _index_names(engine, "dataset")
+    create_missing_indexes(AIoDConcept.metadata, engine)  # Existing indexes are left alone
@@ -0,0 +1,113 @@
+from unittest.mock import Mock
+
+from sqlalchemy.engine import Engine
+from starlette.testclient import TestClient
+
+from authentication import keycloak_openid
+from routers.response_cache import response_cache
+from tests.testutils.query_count import count_queries
+
+
+def test_get_etag_and_last_modified(
+    client_test_resource: TestClient, engine_test_resource_filled: Engine
+):
+    response = client_test_resource.get("/test_resources/v0/1")
+    assert response.status_code == 200, response.json()
+    assert response.headers["etag"].startswith('"')
+    assert response.headers["last-modified"].endswith("GMT")
+
+    response_platform = client_test_resource.get("/platforms/example/test_resources/v0/1")
+    assert response_platform.headers["etag"] == response.headers["etag"]
+
+
+def test_get_if_none_match(client_test_resource: TestClient, engine_test_resource_filled: Engine):
+    etag = client_test_resource.get("/test_resources/v0/1").headers["etag"]
+    response_cache.clear()
+    with count_queries(engine_test_resource_filled) as statements:
+        response = client_test_resource.get("/test_resources/v0/1", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert len(statements) == 1, "\n".join(statements)
+
+    response = client_test_resource.get(
+        "/test_resources/v0/1", headers={"If-None-Match": '"other", W/' + etag}
+    )
+    assert response.status_code == 304
+    response = client_test_resource.get("/test_resources/v0/1", headers={"If-None-Match": '"a"'})
+    assert response.status_code == 200, response.json()
+
+
+def test_get_if_modified_since(
+    client_test_resource: TestClient, engine_test_resource_filled: Engine
+):
+    last_modified = client_test_resource.get("/test_resources/v0/1").headers["last-modified"]
+    response = client_test_resource.get(
+        "/test_resources/v0/1", headers={"If-Modified-Since": last_modified}
+    )
+    assert response.status_code == 304
+    response = client_test_resource.get(
+        "/test_resources/v0/1", headers={"If-Modified-Since": "Mon, 01 Jan 2001 00:00:00 GMT"}
+    )
+    assert response.status_code == 200, response.json()
+    response = client_test_resource.get(
+        "/test_resources/v0/1", headers={"If-Modified-Since": "not a date"}
+    )
+    assert response.status_code == 200, response.json()
+
+
+def test_get_etag_changes_after_put(
+    client_test_resource: TestClient,
+    engine_test_resource_filled: Engine,
+    mocked_privileged_token: Mock,
+):
+    keycloak_openid.introspect = mocked_privileged_token
+    etag = client_test_resource.get("/test_resources/v0/1").headers["etag"]
+    body = {"title": "new title", "platform": "example", "platform_resource_identifier": "1"}
+    response = client_test_resource.put(
+        "/test_resources/v0/1", json=body, headers={"Authorization": "Fake token"}
+    )
+    assert response.status_code == 200, response.json()
+
+    response = client_test_resource.get("/test_resources/v0/1", headers={"If-None-Match": etag})
+    assert response.status_code == 200, response.json()
+    assert response.json()["title"] == "new title"
+    assert response.headers["etag"] != etag
+
+
+def test_get_not_found_ignores_if_none_match(client_test_resource: TestClient):
+    response = client_test_resource.get("/test_resources/v0/99", headers={"If-None-Match": "*"})
+    assert response.status_code == 404, response.json()
+
+
+def test_list_weak_etag(
+    client_test_resource: TestClient,
+    engine_test_resource_filled: Engine,
+    mocked_privileged_token: Mock,
+):
+    keycloak_openid.introspect = mocked_privileged_token
+    response = client_test_resource.get("/test_resources/v0")
+    assert response.status_code == 200, response.json()
+    etag = response.headers["etag"]
+    assert etag.startswith('W/"')
+
+    response_cache.clear()
+    with count_queries(engine_test_resource_filled) as statements:
+        response = client_test_resource.get("/test_resources/v0", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert len(statements) == 1, "\n".join(statements)
+
+    response = client_test_resource.get(
+        "/test_resources/v0", params={"limit": 5}, headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304, "Same resources, so same ETag"
+
+    body = {"title": "title", "platform": "example", "platform_resource_identifier": "2"}
+    response = client_test_resource.post(
+        "/test_resources/v0", json=body, headers={"Authorization": "Fake token"}
+    )
+    assert response.status_code == 200, response.json()
+    response = client_test_resource.get("/test_resources/v0", headers={"If-None-Match": etag})
+    assert response.status_code == 200, response.json()
+    assert len(response.json()) == 2
+    assert response.headers["etag"] != etag
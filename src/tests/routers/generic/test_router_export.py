@@ -0,0 +1,93 @@
+import copy
+import datetime
+import json
+from unittest.mock import Mock
+
+import pytest
+from starlette.testclient import TestClient
+
+from authentication import keycloak_openid
+from database.model.concept.aiod_entry import AIoDEntryORM
+from database.model.concept.status import Status
+from database.session import DbSession, EngineSingleton
+from routers import resource_router
+from tests.testutils.query_count import count_queries
+from tests.testutils.test_resource import factory
+
+
+def _ndjson(text: str) -> list[dict]:
+    return [json.loads(line) for line in text.splitlines()]
+
+
+def test_export_happy_path(
+    client_test_resource: TestClient, draft: Status, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setattr(resource_router, "EXPORT_BATCH_SIZE", 2)
+    with DbSession() as session:
+        session.add_all(
+            [
+                factory(title=f"resource_{i}", status=draft, platform_resource_identifier=str(i))
+                for i in range(5)
+            ]
+            + [
+                factory(
+                    title="deleted",
+                    status=draft,
+                    platform_resource_identifier="5",
+                    date_deleted=datetime.datetime.now(),
+                )
+            ]
+        )
+        session.commit()
+    with count_queries(EngineSingleton().engine) as statements:
+        response = client_test_resource.get("/test_resources/v0/export.ndjson")
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"] == "application/x-ndjson"
+    resources = _ndjson(response.text)
+    assert [r["title"] for r in resources] == [f"resource_{i}" for i in range(5)]
+    assert [r["identifier"] for r in resources] == [1, 2, 3, 4, 5]
+    batches = [statement for statement in statements if "LIMIT" in statement]
+    assert len(batches) == 3, "\n".join(statements)
+
+
+def test_export_since(client_test_resource: TestClient, draft: Status):
+    with DbSession() as session:
+        old, new = factory(title="old", status=draft), factory(
+            title="new", status=draft, platform_resource_identifier="2"
+        )
+        old.aiod_entry = AIoDEntryORM(status=draft, date_modified=datetime.datetime(2020, 1, 1))
+        new.aiod_entry = AIoDEntryORM(status=draft, date_modified=datetime.datetime(2022, 1, 1))
+        session.add_all([old, new])
+        session.commit()
+    response = client_test_resource.get(
+        "/test_resources/v0/export.ndjson", params={"since": "2021-01-01T00:00:00"}
+    )
+    assert response.status_code == 200, response.text
+    assert [r["title"] for r in _ndjson(response.text)] == ["new"]
+
+
+def test_export_invalid_schema(client_test_resource: TestClient):
+    response = client_test_resource.get(
+        "/test_resources/v0/export.ndjson", params={"schema": "nonexistent"}
+    )
+    assert response.status_code == 422, response.json()
+
+
+@pytest.mark.parametrize("schema", ["aiod", "schema.org", "dcat-ap"])
+def test_export_datasets_schema(
+    client: TestClient, mocked_privileged_token: Mock, body_asset: dict, schema: str
+):
+    keycloak_openid.introspect = mocked_privileged_token
+    for i in range(3):
+        body = copy.deepcopy(body_asset)
+        body["platform_resource_identifier"] = str(i)
+        response = client.post("/datasets/v1", json=body, headers={"Authorization": "Fake token"})
+        assert response.status_code == 200, response.json()
+
+    response = client.get("/datasets/v1/export.ndjson", params={"schema": schema})
+    assert response.status_code == 200, response.text
+    exported = _ndjson(response.text)
+    assert len(exported) == 3
+    for i, resource in enumerate(exported):
+        expected = client.get(f"/datasets/v1/{i + 1}", params={"schema": schema}).json()
+        assert resource == expected
@@ -0,0 +1,67 @@
+from unittest.mock import Mock
+
+from sqlalchemy.engine import Engine
+from starlette.testclient import TestClient
+
+from authentication import keycloak_openid
+from tests.testutils.query_count import count_queries
+
+
+def test_get_all_fields(client_test_resource: TestClient, engine_test_resource_filled: Engine):
+    with count_queries(engine_test_resource_filled) as statements:
+        response = client_test_resource.get(
+            "/test_resources/v0", params={"fields": "identifier,title"}
+        )
+    assert response.status_code == 200, response.json()
+    assert response.json() == [{"identifier": 1, "title": "A title"}]
+    select_resources = statements[-1]
+    assert "testresource.title" in select_resources
+    assert "testresource.platform_resource_identifier" not in select_resources
+    assert "JOIN" not in select_resources
+
+
+def test_get_fields(client_test_resource: TestClient, engine_test_resource_filled: Engine):
+    response = client_test_resource.get("/test_resources/v0/1", params={"fields": "title"})
+    assert response.status_code == 200, response.json()
+    assert response.json() == {"title": "A title"}
+    full = client_test_resource.get("/test_resources/v0/1")
+    assert response.headers["etag"] != full.headers["etag"]
+
+    response = client_test_resource.get(
+        "/platforms/example/test_resources/v0/1", params={"fields": "platform, identifier"}
+    )
+    assert response.status_code == 200, response.json()
+    assert response.json() == {"platform": "example", "identifier": 1}
+
+
+def test_get_fields_invalid(client_test_resource: TestClient, engine_test_resource_filled: Engine):
+    for fields in ("title,unknown", ",", "date_deleted"):
+        response = client_test_resource.get("/test_resources/v0", params={"fields": fields})
+        assert response.status_code == 400, response.json()
+        assert response.json()["detail"].startswith(f"Invalid fields '{fields}'.")
+
+
+def test_get_fields_relationship(
+    client: TestClient, engine: Engine, mocked_privileged_token: Mock, body_asset: dict
+):
+    keycloak_openid.introspect = mocked_privileged_token
+    response = client.post("/datasets/v1", json=body_asset, headers={"Authorization": "Fake token"})
+    assert response.status_code == 200, response.json()
+
+    with count_queries(engine) as statements:
+        response = client.get("/datasets/v1", params={"fields": "name,keyword"})
+    assert response.status_code == 200, response.json()
+    (dataset,) = response.json()
+    assert set(dataset) == {"name", "keyword"}
+    assert set(dataset["keyword"]) == set(body_asset["keyword"])
+    assert not any("distribution" in statement for statement in statements)
+
+    response = client.get("/datasets/v1/1", params={"fields": "aiod_entry"})
+    assert response.status_code == 200, response.json()
+    assert response.json()["aiod_entry"]["status"] == "draft"
+
+
+def test_get_fields_schema(client: TestClient):
+    response = client.get("/datasets/v1", params={"fields": "name", "schema": "schema.org"})
+    assert response.status_code == 400, response.json()
+    assert response.json()["detail"] == "Fields can only be selected using the aiod schema."
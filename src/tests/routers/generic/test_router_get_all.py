@@ -27,3 +27,48 @@ def test_get_all_happy_path(client_test_resource: TestClient, draft: Status):
     assert response_2["identifier"] == 2
     assert response_2["title"] == "My second test resource"
     assert "deprecated" not in response.headers
+
+
+def test_get_all_cursor(client_test_resource: TestClient, draft: Status):
+    with DbSession() as session:
+        session.add_all(
+            [
+                factory(title=f"resource_{i}", status=draft, platform_resource_identifier=str(i))
+                for i in range(5)
+            ]
+        )
+        session.commit()
+    titles: list[str] = []
+    params = {"limit": 2}
+    while True:
+        response = client_test_resource.get("/test_resources/v0", params=params)
+        assert response.status_code == 200, response.json()
+        titles.extend(r["title"] for r in response.json())
+        if "next-cursor" not in response.headers:
+            break
+        params = {"limit": 2, "cursor": response.headers["next-cursor"]}
+    assert titles == [f"resource_{i}" for i in range(5)]
+
+
+def test_get_all_cursor_invalid(client_test_resource: TestClient):
+    response = client_test_resource.get("/test_resources/v0", params={"cursor": "invalid"})
+    assert response.status_code == 400, response.json()
+    assert response.json()["detail"] == "Invalid cursor."
+
+
+def test_get_all_cursor_with_offset(client_test_resource: TestClient, draft: Status):
+    with DbSession() as session:
+        session.add_all(
+            [
+                factory(title=f"resource_{i}", status=draft, platform_resource_identifier=str(i))
+                for i in range(2)
+            ]
+        )
+        session.commit()
+    response = client_test_resource.get("/test_resources/v0", params={"limit": 1})
+    cursor = response.headers["next-cursor"]
+    response = client_test_resource.get(
+        "/test_resources/v0", params={"cursor": cursor, "offset": 1}
+    )
+    assert response.status_code == 400, response.json()
+    assert response.json()["detail"] == "The offset cannot be combined with a cursor."
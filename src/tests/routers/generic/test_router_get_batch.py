@@ -0,0 +1,94 @@
+import datetime
+
+from starlette.testclient import TestClient
+
+from database.model.concept.status import Status
+from database.session import DbSession
+from tests.testutils.test_resource import factory
+
+
+def _add_resources(draft: Status):
+    with DbSession() as session:
+        session.add_all(
+            [
+                factory(title=f"resource_{i}", status=draft, platform_resource_identifier=f"p{i}")
+                for i in range(1, 4)
+            ]
+            + [
+                factory(
+                    title="deleted",
+                    status=draft,
+                    platform_resource_identifier="p4",
+                    date_deleted=datetime.datetime.now(),
+                )
+            ]
+        )
+        session.commit()
+
+
+def test_batch_happy_path(client_test_resource: TestClient, draft: Status):
+    _add_resources(draft)
+    response = client_test_resource.get(
+        "/test_resources/v0/batch", params={"identifier": ["3", "1", "99", "4", "2"]}
+    )
+    assert response.status_code == 200, response.json()
+    response_json = response.json()
+    assert [r["identifier"] for r in response_json["resources"]] == [3, 1, 2]
+    assert [r["title"] for r in response_json["resources"]] == [
+        "resource_3",
+        "resource_1",
+        "resource_2",
+    ]
+    assert response_json["missing"] == ["99", "4"]
+
+
+def test_batch_normalises_identifiers(client_test_resource: TestClient, draft: Status):
+    _add_resources(draft)
+    response = client_test_resource.get(
+        "/test_resources/v0/batch", params={"identifier": ["01", "+2", "x"]}
+    )
+    assert response.status_code == 200, response.json()
+    response_json = response.json()
+    assert [r["identifier"] for r in response_json["resources"]] == [1, 2]
+    assert response_json["missing"] == ["x"]
+
+
+def test_batch_platform(client_test_resource: TestClient, draft: Status):
+    _add_resources(draft)
+    response = client_test_resource.get(
+        "/platforms/example/test_resources/v0/batch", params={"identifier": ["p2", "p1", "1"]}
+    )
+    assert response.status_code == 200, response.json()
+    response_json = response.json()
+    assert [r["identifier"] for r in response_json["resources"]] == [2, 1]
+    assert response_json["missing"] == ["1"]
+
+
+def test_batch_wrong_platform(client_test_resource: TestClient, draft: Status):
+    _add_resources(draft)
+    response = client_test_resource.get(
+        "/platforms/openml/test_resources/v0/batch", params={"identifier": ["p1"]}
+    )
+    assert response.status_code == 200, response.json()
+    assert response.json() == {"resources": [], "missing": ["p1"]}
+
+    response = client_test_resource.get(
+        "/platforms/nonexistent_platform/test_resources/v0/batch", params={"identifier": ["p1"]}
+    )
+    assert response.status_code == 400, response.json()
+    assert response.json()["detail"] == "platform 'nonexistent_platform' not recognized."
+
+
+def test_batch_too_many(client_test_resource: TestClient):
+    response = client_test_resource.get(
+        "/test_resources/v0/batch", params={"identifier": [str(i) for i in range(1001)]}
+    )
+    assert response.status_code == 400, response.json()
+    assert response.json()["detail"] == "At most 1000 identifiers can be requested at once."
+
+
+def test_single_get_still_works(client_test_resource: TestClient, draft: Status):
+    _add_resources(draft)
+    response = client_test_resource.get("/test_resources/v0/1")
+    assert response.status_code == 200, response.json()
+    assert response.json()["title"] == "resource_1"
@@ -1,5 +1,6 @@
 import datetime
 
+from sqlalchemy.engine import Engine
 from starlette.testclient import TestClient
 
 from database.model.agent.contact import Contact
@@ -8,6 +9,7 @@ from database.model.concept.aiod_entry import AIoDEntryORM
 from database.model.concept.status import Status
 from database.model.knowledge_asset.publication import Publication
 from database.session import DbSession
+from tests.testutils.query_count import count_queries
 from tests.testutils.test_resource import factory
 
 
@@ -99,3 +101,22 @@ def test_get_count_total(
         "publications": {"aiod": 2, "example": 1},
     }
     assert "deprecated" not in response.headers
+
+
+def test_get_count_total_single_query(
+    client: TestClient, engine: Engine, person: Person, publication: Publication
+):
+    with DbSession() as session:
+        session.add(person)
+        session.merge(publication)
+        session.commit()
+
+    with count_queries(engine) as statements:
+        response = client.get("/counts/v1")
+        assert response.status_code == 200, response.json()
+        assert response.json() == {"persons": {"example": 1}, "publications": {"example": 1}}
+        response = client.get("/counts/publications/v1", params={"detailed": True})
+        assert response.json() == {"example": 1}
+        response = client.get("/counts/persons/v1")
+        assert response.json() == 1
+    assert len(statements) == 1, "\n".join(statements)
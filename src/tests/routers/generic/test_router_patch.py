@@ -0,0 +1,97 @@
+import copy
+from unittest.mock import Mock
+
+import pytest
+from sqlalchemy.engine import Engine
+from starlette.testclient import TestClient
+
+from authentication import introspection_cache, keycloak_openid
+from tests.testutils.query_count import count_queries
+
+HEADERS = {"Authorization": "Fake token"}
+
+
+@pytest.fixture
+def dataset_json(client: TestClient, mocked_privileged_token: Mock, body_asset: dict) -> dict:
+    keycloak_openid.introspect = mocked_privileged_token
+    body = copy.deepcopy(body_asset)
+    response = client.post("/datasets/v1", json=body, headers=HEADERS)
+    assert response.status_code == 200, response.json()
+    return client.get("/datasets/v1/1").json()
+
+
+def _writes(statements: list[str]) -> list[str]:
+    """The writing statements, shortened to e.g. "DELETE FROM dataset_keyword_link"."""
+    return [
+        " ".join(s.split()[:3])
+        for s in statements
+        if s.split()[0] in ("INSERT", "UPDATE", "DELETE")
+    ]
+
+
+def test_patch_changes_only_given_fields(client: TestClient, dataset_json: dict):
+    patch = {"name": "new name", "keyword": ["tag1", "tag3"], "aiod_entry": {"status": "published"}}
+    response = client.patch("/datasets/v1/1", json=patch, headers=HEADERS)
+    assert response.status_code == 200, response.json()
+
+    patched = client.get("/datasets/v1/1").json()
+    assert patched["name"] == "new name"
+    assert set(patched["keyword"]) == {"tag1", "tag3"}
+    assert patched["aiod_entry"]["status"] == "published"
+    assert patched["aiod_entry"]["date_modified"] > dataset_json["aiod_entry"]["date_modified"]
+    for unchanged in ("description", "distribution", "note", "version", "alternate_name"):
+        assert patched[unchanged] == dataset_json[unchanged]
+
+
+def test_patch_collection_writes_difference(client: TestClient, engine: Engine, dataset_json: dict):
+    patch = {"keyword": ["tag1", "tag3"]}
+    with count_queries(engine) as statements:
+        response = client.patch("/datasets/v1/1", json=patch, headers=HEADERS)
+    assert response.status_code == 200, response.json()
+    writes = _writes(statements)
+    assert writes.count("DELETE FROM dataset_keyword_link") == 1, "Only tag2 should be unlinked"
+    assert writes.count("INSERT INTO dataset_keyword_link") == 1, "Only tag3 should be linked"
+    assert "UPDATE dataset SET" not in writes
+    assert set(client.get("/datasets/v1/1").json()["keyword"]) == {"tag1", "tag3"}
+
+
+def test_patch_objects_in_place(client: TestClient, engine: Engine, dataset_json: dict):
+    distribution = dataset_json["distribution"][0] | {"name": "new.pdf"}
+    patch = {"distribution": [distribution], "description": {"plain": "new description"}}
+    with count_queries(engine) as statements:
+        response = client.patch("/datasets/v1/1", json=patch, headers=HEADERS)
+    assert response.status_code == 200, response.json()
+    inserts_and_deletes = [s for s in _writes(statements) if s.startswith(("INSERT", "DELETE"))]
+    assert inserts_and_deletes == ["INSERT INTO search_outbox"], statements
+
+    patched = client.get("/datasets/v1/1").json()
+    assert patched["distribution"] == [distribution]
+    assert patched["description"] == dataset_json["description"] | {"plain": "new description"}
+
+
+def test_patch_without_changes(client: TestClient, engine: Engine, dataset_json: dict):
+    patch = {key: dataset_json[key] for key in ("name", "keyword", "description", "distribution")}
+    with count_queries(engine) as statements:
+        response = client.patch("/datasets/v1/1", json=patch, headers=HEADERS)
+    assert response.status_code == 200, response.json()
+    assert _writes(statements) == []
+    patched = client.get("/datasets/v1/1").json()
+    assert patched["aiod_entry"]["date_modified"] == dataset_json["aiod_entry"]["date_modified"]
+
+
+def test_patch_required_field_to_null(client: TestClient, dataset_json: dict):
+    response = client.patch("/datasets/v1/1", json={"name": None}, headers=HEADERS)
+    assert response.status_code == 422, response.json()
+    assert "name" in response.json()["detail"][0]["msg"]
+
+
+def test_patch_non_existent(client: TestClient, dataset_json: dict):
+    response = client.patch("/datasets/v1/2", json={"name": "new name"}, headers=HEADERS)
+    assert response.status_code == 404, response.json()
+
+
+def test_patch_unauthorized(client: TestClient, dataset_json: dict, mocked_token: Mock):
+    keycloak_openid.introspect = mocked_token
+    introspection_cache.clear()
+    response = client.patch("/datasets/v1/1", json={"name": "new name"}, headers=HEADERS)
+    assert response.status_code == 403, response.json()
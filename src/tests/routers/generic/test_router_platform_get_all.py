@@ -30,3 +30,29 @@ def test_get_all_happy_path(client_test_resource: TestClient):
     assert response_2["identifier"] == 2
     assert response_2["title"] == "My second test resource"
     assert "deprecated" not in response.headers
+
+
+def test_get_all_cursor(client_test_resource: TestClient):
+    with DbSession() as session:
+        session.add_all(
+            [
+                TestResource(title="1", platform="example", platform_resource_identifier="1"),
+                TestResource(title="2", platform="openml", platform_resource_identifier="2"),
+                TestResource(title="3", platform="example", platform_resource_identifier="3"),
+            ]
+        )
+        session.commit()
+    url = "/platforms/example/test_resources/v0"
+    response = client_test_resource.get(url, params={"limit": 1})
+    assert [r["title"] for r in response.json()] == ["1"]
+    cursor = response.headers["next-cursor"]
+
+    response = client_test_resource.get(url, params={"limit": 1, "cursor": cursor})
+    assert response.status_code == 200, response.json()
+    assert [r["title"] for r in response.json()] == ["3"]
+
+    response = client_test_resource.get(
+        "/platforms/openml/test_resources/v0", params={"cursor": cursor}
+    )
+    assert response.status_code == 400, response.json()
+    assert response.json()["detail"] == "Invalid cursor: it does not belong to this listing."
@@ -0,0 +1,131 @@
+import copy
+from unittest.mock import Mock
+
+from sqlalchemy.engine import Engine
+from starlette.testclient import TestClient
+
+from authentication import keycloak_openid
+from tests.testutils.query_count import count_queries
+
+
+def test_bulk_happy_path(client_test_resource: TestClient, mocked_privileged_token: Mock):
+    keycloak_openid.introspect = mocked_privileged_token
+    body = [
+        {"title": f"title{i}", "platform": "example", "platform_resource_identifier": str(i)}
+        for i in range(5)
+    ]
+    response = client_test_resource.post(
+        "/test_resources/v0/bulk",
+        json=body,
+        params={"chunk_size": 2},
+        headers={"Authorization": "Fake token"},
+    )
+    assert response.status_code == 200, response.json()
+    assert response.json() == [{"identifier": i, "status_code": 200} for i in range(1, 6)]
+    response = client_test_resource.get("/test_resources/v0", params={"limit": 10})
+    assert [r["title"] for r in response.json()] == [f"title{i}" for i in range(5)]
+
+
+def test_bulk_errors_per_item(client_test_resource: TestClient, mocked_privileged_token: Mock):
+    keycloak_openid.introspect = mocked_privileged_token
+    headers = {"Authorization": "Fake token"}
+    existing = {"title": "existing", "platform": "example", "platform_resource_identifier": "1"}
+    response = client_test_resource.post("/test_resources/v0", json=existing, headers=headers)
+    assert response.status_code == 200, response.json()
+
+    body = [
+        {"title": "conflict", "platform": "example", "platform_resource_identifier": "1"},
+        {"title": "new", "platform": "example", "platform_resource_identifier": "2"},
+        {"title": "invalid", "platform": None, "platform_resource_identifier": "3"},
+    ]
+    response = client_test_resource.post("/test_resources/v0/bulk", json=body, headers=headers)
+    assert response.status_code == 200, response.json()
+    conflict, new, invalid = response.json()
+    assert conflict == {
+        "status_code": 409,
+        "detail": "There already exists a test_resource with the same platform and "
+        "platform_resource_identifier, with identifier=1.",
+    }
+    assert new == {"identifier": 2, "status_code": 200}
+    assert invalid == {
+        "status_code": 400,
+        "detail": "If platform is NULL, platform_resource_identifier should also be NULL, and "
+        "vice versa.",
+    }
+
+
+def test_bulk_update_existing(client_test_resource: TestClient, mocked_privileged_token: Mock):
+    keycloak_openid.introspect = mocked_privileged_token
+    headers = {"Authorization": "Fake token"}
+    old = {"title": "old", "platform": "example", "platform_resource_identifier": "1"}
+    response = client_test_resource.post("/test_resources/v0", json=old, headers=headers)
+    assert response.status_code == 200, response.json()
+
+    body = [
+        {"title": "updated", "platform": "example", "platform_resource_identifier": "1"},
+        {"title": "new", "platform": "example", "platform_resource_identifier": "2"},
+    ]
+    response = client_test_resource.post(
+        "/test_resources/v0/bulk",
+        json=body,
+        params={"update_existing": True},
+        headers=headers,
+    )
+    assert response.status_code == 200, response.json()
+    assert response.json() == [
+        {"identifier": 1, "status_code": 200},
+        {"identifier": 2, "status_code": 200},
+    ]
+    response = client_test_resource.get("/test_resources/v0/1")
+    assert response.json()["title"] == "updated"
+
+
+def test_bulk_update_existing_without_platform(
+    client_test_resource: TestClient, mocked_privileged_token: Mock
+):
+    keycloak_openid.introspect = mocked_privileged_token
+    body = [{"title": "first"}, {"title": "second"}]
+    response = client_test_resource.post(
+        "/test_resources/v0/bulk",
+        json=body,
+        params={"update_existing": True},
+        headers={"Authorization": "Fake token"},
+    )
+    assert response.status_code == 200, response.json()
+    assert response.json() == [
+        {"identifier": 1, "status_code": 200},
+        {"identifier": 2, "status_code": 200},
+    ]
+
+
+def test_bulk_unauthorized(client_test_resource: TestClient, mocked_token: Mock):
+    keycloak_openid.introspect = mocked_token
+    body = [{"title": "title", "platform": "example", "platform_resource_identifier": "1"}]
+    response = client_test_resource.post(
+        "/test_resources/v0/bulk", json=body, headers={"Authorization": "Fake token"}
+    )
+    assert response.status_code == 403, response.json()
+    assert response.json()["detail"] == "You do not have permission to create test_resources."
+
+
+def test_bulk_datasets_resolves_names_once(
+    client: TestClient, engine: Engine, mocked_privileged_token: Mock, body_asset: dict
+):
+    keycloak_openid.introspect = mocked_privileged_token
+    body = []
+    for i in range(5):
+        dataset = copy.deepcopy(body_asset)
+        dataset["platform_resource_identifier"] = str(i)
+        body.append(dataset)
+    with count_queries(engine) as statements:
+        response = client.post(
+            "/datasets/v1/bulk", json=body, headers={"Authorization": "Fake token"}
+        )
+    assert response.status_code == 200, response.json()
+    assert [r["status_code"] for r in response.json()] == [200] * 5
+    keyword_selects = [s for s in statements if s.startswith("SELECT") and "FROM keyword" in s]
+    assert len(keyword_selects) == 1, "\n".join(keyword_selects)
+
+    response = client.get("/datasets/v1/5")
+    assert response.status_code == 200, response.json()
+    assert set(response.json()["keyword"]) == set(body_asset["keyword"])
@@ -0,0 +1,95 @@
+"""
+The number of queries needed to list resources should not depend on the number of resources.
+If these tests fail after adding a relationship, make sure that it is loaded eagerly (see
+database/model/eager_loading.py).
+"""
+
+import copy
+from unittest.mock import Mock
+
+import pytest
+from sqlalchemy.engine import Engine
+from starlette.testclient import TestClient
+
+from authentication import keycloak_openid
+from tests.testutils.query_count import count_queries
+
+N_RESOURCES = 5
+MAX_QUERIES_PER_PAGE = 40
+
+
+@pytest.mark.parametrize(
+    "resource_name_plural,body_fixture",
+    [
+        ("datasets", "body_asset"),
+        ("experiments", "body_asset"),
+        ("ml_models", "body_asset"),
+        ("publications", "body_asset"),
+        ("case_studies", "body_asset"),
+        ("organisations", "body_agent"),
+        ("persons", "body_agent"),
+    ],
+)
+def test_list_query_count_independent_of_page_size(
+    client: TestClient,
+    engine: Engine,
+    mocked_privileged_token: Mock,
+    request: pytest.FixtureRequest,
+    resource_name_plural: str,
+    body_fixture: str,
+):
+    keycloak_openid.introspect = mocked_privileged_token
+    for i in range(N_RESOURCES):
+        body = copy.deepcopy(request.getfixturevalue(body_fixture))
+        body["platform_resource_identifier"] = str(i)
+        response = client.post(
+            f"/{resource_name_plural}/v1", json=body, headers={"Authorization": "Fake token"}
+        )
+        assert response.status_code == 200, response.json()
+
+    with count_queries(engine) as statements_single:
+        response = client.get(f"/{resource_name_plural}/v1", params={"limit": 1})
+        assert response.status_code == 200, response.json()
+    with count_queries(engine) as statements_all:
+        response = client.get(f"/{resource_name_plural}/v1", params={"limit": N_RESOURCES})
+        assert response.status_code == 200, response.json()
+        assert len(response.json()) == N_RESOURCES
+
+    assert len(statements_all) == len(statements_single), "\n".join(statements_all)
+    assert len(statements_all) <= MAX_QUERIES_PER_PAGE, "\n".join(statements_all)
+
+
+def test_batch_query_count_independent_of_batch_size(
+    client: TestClient, engine: Engine, mocked_privileged_token: Mock, body_asset: dict
+):
+    keycloak_openid.introspect = mocked_privileged_token
+    for i in range(N_RESOURCES):
+        body = copy.deepcopy(body_asset)
+        body["platform_resource_identifier"] = str(i)
+        response = client.post("/datasets/v1", json=body, headers={"Authorization": "Fake token"})
+        assert response.status_code == 200, response.json()
+
+    with count_queries(engine) as statements_single:
+        response = client.get("/datasets/v1/batch", params={"identifier": ["1"]})
+        assert response.status_code == 200, response.json()
+    identifiers = [str(i) for i in range(1, N_RESOURCES + 1)]
+    with count_queries(engine) as statements_all:
+        response = client.get("/datasets/v1/batch", params={"identifier": identifiers})
+        assert response.status_code == 200, response.json()
+        assert len(response.json()["resources"]) == N_RESOURCES
+
+    assert len(statements_all) == len(statements_single), "\n".join(statements_all)
+
+
+def test_get_query_count(client: TestClient, engine: Engine, dataset_body_posted: None):
+    with count_queries(engine) as statements:
+        response = client.get("/datasets/v1/1")
+        assert response.status_code == 200, response.json()
+    assert len(statements) <= MAX_QUERIES_PER_PAGE, "\n".join(statements)
+
+
+@pytest.fixture
+def dataset_body_posted(client: TestClient, mocked_privileged_token: Mock, body_asset: dict):
+    keycloak_openid.introspect = mocked_privileged_token
+    response = client.post("/datasets/v1", json=body_asset, headers={"Authorization": "Fake token"})
+    assert response.status_code == 200, response.json()
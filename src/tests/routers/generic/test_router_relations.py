@@ -17,6 +17,7 @@ from database.model.serializers import (
     FindByNameDeserializer,
     CastDeserializerList,
     FindByNameDeserializerList,
+    deserialization_plan,
 )
 from database.session import DbSession
 from routers import ResourceRouter
@@ -257,3 +258,14 @@ def test_put_happy_path(client_with_testobject: TestClient, mocked_privileged_to
     assert related_objects[1]["field2"] == "val2-2"
 
     # TODO: test that the same instance of RelatedObjectORM is updated if new values are added
+
+
+def test_deserialization_plan():
+    plan = deserialization_plan(TestObject)
+    assert deserialization_plan(TestObject) is plan, "Computed once per class"
+    assert "title" in plan.attributes
+    assert dict(plan.named_relations) == {
+        "named_string": TestEnum,
+        "named_string_list": TestEnum2,
+    }
+    assert dict(plan.nested_classes)["related_objects"] is TestRelatedObjectOrm
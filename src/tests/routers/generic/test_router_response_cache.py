@@ -0,0 +1,123 @@
+import asyncio
+from unittest.mock import Mock
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.testclient import TestClient
+
+from authentication import keycloak_openid
+from routers import resource_router
+from database.session import DbSession, EngineSingleton
+from routers.response_cache import response_cache
+from tests.testutils.query_count import count_queries
+from tests.testutils.test_resource import TestResource
+
+
+def test_get_cached(client_test_resource: TestClient, engine_test_resource_filled: Engine):
+    response = client_test_resource.get("/test_resources/v0/1")
+    assert response.status_code == 200, response.json()
+    with count_queries(engine_test_resource_filled) as statements:
+        cached = client_test_resource.get("/test_resources/v0/1")
+    assert len(statements) == 0, "\n".join(statements)
+    assert cached.status_code == 200, cached.json()
+    assert cached.json() == response.json()
+    assert cached.headers["etag"] == response.headers["etag"]
+    assert (response_cache.hits, response_cache.misses) == (1, 1)
+
+    response = client_test_resource.get(
+        "/test_resources/v0/1", headers={"If-None-Match": cached.headers["etag"]}
+    )
+    assert response.status_code == 304
+
+
+def test_list_cached_per_pagination(
+    client_test_resource: TestClient, engine_test_resource_filled: Engine
+):
+    response = client_test_resource.get("/test_resources/v0", params={"limit": 1})
+    assert response.status_code == 200, response.json()
+    with count_queries(engine_test_resource_filled) as statements:
+        cached = client_test_resource.get("/test_resources/v0", params={"limit": 1})
+    assert len(statements) == 0, "\n".join(statements)
+    assert cached.json() == response.json()
+    assert cached.headers["next-cursor"] == response.headers["next-cursor"]
+
+    with count_queries(engine_test_resource_filled) as statements:
+        response = client_test_resource.get("/test_resources/v0", params={"offset": 1})
+    assert response.status_code == 200, response.json()
+    assert response.json() == []
+    assert len(statements) > 0
+
+
+def test_writes_invalidate(
+    client_test_resource: TestClient,
+    engine_test_resource_filled: Engine,
+    mocked_privileged_token: Mock,
+):
+    keycloak_openid.introspect = mocked_privileged_token
+    headers = {"Authorization": "Fake token"}
+    assert client_test_resource.get("/test_resources/v0/1").json()["title"] == "A title"
+    assert len(client_test_resource.get("/test_resources/v0").json()) == 1
+
+    body = {"title": "new title", "platform": "example", "platform_resource_identifier": "1"}
+    response = client_test_resource.put("/test_resources/v0/1", json=body, headers=headers)
+    assert response.status_code == 200, response.json()
+    assert client_test_resource.get("/test_resources/v0/1").json()["title"] == "new title"
+
+    body = {"title": "second", "platform": "example", "platform_resource_identifier": "2"}
+    response = client_test_resource.post("/test_resources/v0", json=body, headers=headers)
+    assert response.status_code == 200, response.json()
+    assert len(client_test_resource.get("/test_resources/v0").json()) == 2
+
+    response = client_test_resource.delete("/test_resources/v0/1", headers=headers)
+    assert response.status_code == 200, response.json()
+    assert client_test_resource.get("/test_resources/v0/1").status_code == 404
+    assert len(client_test_resource.get("/test_resources/v0").json()) == 1
+    assert response_cache.hits == 0
+
+
+def test_database_accessed_from_event_loop(
+    client_test_resource: TestClient, engine_test_resource_filled: Engine
+):
+    """The read endpoints use the async engine, instead of a thread of the threadpool."""
+    running_loops = []
+
+    def before_cursor_execute(*args):
+        try:
+            running_loops.append(asyncio.get_running_loop())
+        except RuntimeError:
+            running_loops.append(None)
+
+    sync_engine = EngineSingleton().async_engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        response = client_test_resource.get("/test_resources/v0/1")
+        assert response.status_code == 200, response.json()
+        response = client_test_resource.get("/test_resources/v0")
+        assert response.status_code == 200, response.json()
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", before_cursor_execute)
+    assert running_loops
+    assert None not in running_loops
+
+
+def test_write_during_load_invalidates(
+    client_test_resource: TestClient,
+    engine_test_resource_filled: Engine,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    load_resource = resource_router.ResourceRouter._load_resource
+
+    def load_then_write(*args, **kwargs):
+        """A write is committed after the response is loaded, but before it is cached."""
+        loaded = load_resource(*args, **kwargs)
+        with DbSession() as session:
+            session.get(TestResource, 1).title = "new title"
+            session.commit()
+        response_cache.invalidate()
+        return loaded
+
+    monkeypatch.setattr(resource_router.ResourceRouter, "_load_resource", load_then_write)
+    assert client_test_resource.get("/test_resources/v0/1").json()["title"] == "A title"
+    monkeypatch.setattr(resource_router.ResourceRouter, "_load_resource", load_resource)
+    assert client_test_resource.get("/test_resources/v0/1").json()["title"] == "new title"
@@ -416,3 +416,28 @@ def test_relations_between_resources(
     assert_relations(client, "datasets")
     assert_relations(client, "publications")
     assert_relations(client, "organisations")
+
+
+def test_linking_changes_the_linked_resource(
+    client: TestClient, mocked_privileged_token: Mock, dataset: Dataset
+):
+    keycloak_openid.introspect = mocked_privileged_token
+    with DbSession() as session:
+        session.add(dataset)
+        session.commit()
+    etag = client.get("/datasets/v1/1").headers["etag"]
+
+    body = {"name": "news", "has_part": [1]}
+    response = client.post("/news/v1", json=body, headers={"Authorization": "Fake token"})
+    assert response.status_code == 200, response.json()
+    response = client.get("/datasets/v1/1", headers={"If-None-Match": etag})
+    assert response.status_code == 200, response.json()
+    assert response.json()["is_part_of"] == [2]
+    etag = response.headers["etag"]
+
+    body = {"name": "news", "has_part": []}
+    response = client.put("/news/v1/1", json=body, headers={"Authorization": "Fake token"})
+    assert response.status_code == 200, response.json()
+    response = client.get("/datasets/v1/1", headers={"If-None-Match": etag})
+    assert response.status_code == 200, response.json()
+    assert response.json()["is_part_of"] == []
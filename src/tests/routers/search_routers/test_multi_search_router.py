@@ -0,0 +1,107 @@
+import copy
+import json
+from unittest.mock import Mock
+
+from elasticsearch import Elasticsearch
+from sqlalchemy.engine import Engine
+from starlette.testclient import TestClient
+
+import routers.search_routers as sr
+from authentication import keycloak_openid
+from routers.search_routers.elasticsearch import ElasticsearchSingleton
+from tests.testutils.paths import path_test_resources
+from tests.testutils.query_count import count_queries
+
+
+def mock_msearch(scores: dict[str, float] | None = None) -> Mock:
+    """Mock _msearch, returning the mocked search result of each requested index. The hits get
+    the score of their index."""
+    index_scores = scores or {}
+    results = {}
+    for router in sr.router_list:
+        path = path_test_resources() / "elasticsearch" / f"{router.es_index}_search.json"
+        with open(path, "r") as f:
+            results[router.es_index] = json.load(f)
+
+    def msearch(searches: list[dict]) -> dict:
+        responses = []
+        for header in searches[::2]:
+            response = copy.deepcopy(results[header["index"]])
+            for hit in response["hits"]["hits"]:
+                hit["_score"] = index_scores.get(header["index"], 1.0)
+            responses.append(response)
+        return {"responses": responses}
+
+    mocked_elasticsearch = Elasticsearch("https://example.com:9200")
+    mocked_elasticsearch.msearch = Mock(side_effect=msearch)
+    ElasticsearchSingleton().patch(mocked_elasticsearch)
+    return mocked_elasticsearch.msearch
+
+
+def test_search_all_types(client: TestClient, engine: Engine):
+    msearch = mock_msearch(scores={"news": 3.0, "dataset": 2.0})
+    with count_queries(engine) as statements:
+        response = client.get("/search/v1", params={"search_query": "description", "limit": 3})
+    assert response.status_code == 200, response.json()
+    assert statements == [], "The database should not be queried"
+    assert msearch.call_count == 1
+    searches = msearch.call_args.kwargs["searches"]
+    assert [header["index"] for header in searches[::2]] == [r.es_index for r in sr.router_list]
+    assert all(body["size"] == 3 for body in searches[1::2])
+
+    result = response.json()
+    assert result["total_hits"] == 9
+    assert result["total_hits_per_type"] == {router.es_index: 1 for router in sr.router_list}
+    assert [hit["resource_type"] for hit in result["hits"]] == ["news", "dataset", "event"]
+    dataset = result["hits"][1]["resource"]
+    assert dataset["name"] == "A name."
+    assert dataset["issn"] == "20493630"
+    assert dataset["description"]["plain"] == "A plain text description."
+    assert None not in dataset["aiod_entry"].values(), "None values are left out"
+
+    params = {"search_query": "description", "limit": 2, "offset": 2}
+    response = client.get("/search/v1", params=params)
+    assert [hit["resource_type"] for hit in response.json()["hits"]] == ["event", "experiment"]
+    assert all(body["size"] == 4 for body in msearch.call_args.kwargs["searches"][1::2])
+
+
+def test_search_selected_types_and_fields(client: TestClient):
+    msearch = mock_msearch()
+    params = {"search_query": "description", "resource_types": ["dataset", "news", "event"]}
+    response = client.get("/search/v1", params=params | {"search_fields": ["issn", "headline"]})
+    assert response.status_code == 200, response.json()
+    searches = msearch.call_args.kwargs["searches"]
+    assert [header["index"] for header in searches[::2]] == ["dataset", "news"]
+    assert searches[1]["query"]["bool"]["should"] == [{"match": {"issn": "description"}}]
+    assert set(response.json()["total_hits_per_type"]) == {"dataset", "news"}
+
+
+def test_search_get_all(
+    client: TestClient, engine: Engine, mocked_privileged_token: Mock, body_asset: dict
+):
+    keycloak_openid.introspect = mocked_privileged_token
+    headers = {"Authorization": "Fake token"}
+    for resource in ("datasets", "events"):
+        body = copy.deepcopy(body_asset) | {"platform": None, "platform_resource_identifier": None}
+        response = client.post(f"/{resource}/v1", json=body, headers=headers)
+        assert response.status_code == 200, response.json()
+    mock_msearch()
+
+    params = {"search_query": "description", "resource_types": ["dataset", "event"]}
+    with count_queries(engine) as statements:
+        response = client.get("/search/v1", params=params | {"get_all": True})
+    assert response.status_code == 200, response.json()
+    hits = response.json()["hits"]
+    assert {hit["resource_type"] for hit in hits} == {"dataset", "event"}
+    assert all(set(hit["resource"]["keyword"]) == set(body_asset["keyword"]) for hit in hits)
+    for table in ("dataset", "event"):
+        resource_queries = [s for s in statements if s.startswith(f"SELECT {table}.")]
+        assert len(resource_queries) == 1, f"A single IN query for the {table}s"
+
+
+def test_search_bad_platform(client: TestClient):
+    mock_msearch()
+    params = {"search_query": "description", "platforms": ["bad_platform"]}
+    response = client.get("/search/v1", params=params)
+    assert response.status_code == 400, response.json()
+    assert response.json()["detail"].startswith("The available platforms are")
@@ -2,13 +2,19 @@ import json
 from unittest.mock import Mock
 
 import pytest
-from elasticsearch import Elasticsearch
+from elastic_transport import ApiResponseMeta, HttpHeaders, NodeConfig
+from elasticsearch import Elasticsearch, NotFoundError
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.engine import Engine
 from starlette.testclient import TestClient
 
 import routers.search_routers as sr
 from authentication import keycloak_openid
+from database.session import DbSession
 from routers.search_routers.elasticsearch import ElasticsearchSingleton
+from search_indexer.indexer import indexed_resources
 from tests.testutils.paths import path_test_resources
+from tests.testutils.query_count import count_queries
 
 
 @pytest.mark.parametrize("search_router", sr.router_list)
@@ -57,6 +63,32 @@ def test_search_happy_path_get_all(client: TestClient, mocked_privileged_token:
     assert set(resource["keyword"]) == {"keyword1", "keyword2"}
 
 
+def test_search_complete_documents_without_database(
+    client: TestClient, engine: Engine, mocked_privileged_token: Mock, body_asset: dict
+):
+    keycloak_openid.introspect = mocked_privileged_token
+    body = body_asset | {"platform": None, "platform_resource_identifier": None}
+    response = client.post("/datasets/v1", json=body, headers={"Authorization": "Fake token"})
+    assert response.status_code == 200, response.json()
+    router = sr.SearchRouterDatasets()
+    with DbSession() as session:
+        document = router.es_document(session.scalars(indexed_resources(router)).one())
+    hit = {"_id": "dataset_1", "_score": 1.0, "_source": jsonable_encoder(document)}
+    mocked_elasticsearch = Elasticsearch("https://example.com:9200")
+    mocked_elasticsearch.search = Mock(
+        return_value={"hits": {"total": {"value": 1}, "hits": [hit]}}
+    )
+    ElasticsearchSingleton().patch(mocked_elasticsearch)
+
+    params = {"search_query": "description", "get_all": True}
+    with count_queries(engine) as statements:
+        response = client.get("/search/datasets/v1", params=params)
+    assert response.status_code == 200, response.json()
+    assert statements == [], "The database should not be queried"
+    (resource,) = response.json()["resources"]
+    assert _without_none(resource) == _without_none(client.get("/datasets/v1/1").json())
+
+
 def test_search_get_all_not_found_in_db(client: TestClient):
     mock_elasticsearch(filename_mock="event_search.json")
 
@@ -139,10 +171,87 @@ def test_search_bad_offset(client: TestClient, search_router):
     ]
 
 
-def mock_elasticsearch(filename_mock: str):
+def test_search_cursor(client: TestClient):
+    mocked_elasticsearch = mock_elasticsearch(filename_mock="dataset_search.json")
+    mocked_elasticsearch.search.return_value["pit_id"] = "pit_2"
+    mocked_elasticsearch.open_point_in_time = Mock(return_value={"id": "pit_1"})
+    mocked_elasticsearch.close_point_in_time = Mock()
+
+    params = {"search_query": "description", "limit": 1, "cursor": "*"}
+    response = client.get("/search/datasets/v1", params=params)
+    assert response.status_code == 200, response.json()
+    assert response.json()["resources"][0]["identifier"] == 1
+    next_cursor = response.json()["next_cursor"]
+    assert next_cursor is not None
+    mocked_elasticsearch.open_point_in_time.assert_called_once_with(
+        index="dataset", keep_alive="1m"
+    )
+    search_kwargs = mocked_elasticsearch.search.call_args.kwargs
+    assert search_kwargs["pit"]["id"] == "pit_1"
+    assert search_kwargs["search_after"] is None
+    assert "from_" not in search_kwargs and "index" not in search_kwargs
+
+    params = {"search_query": "description", "limit": 2, "cursor": next_cursor}
+    response = client.get("/search/datasets/v1", params=params)
+    assert response.status_code == 200, response.json()
+    assert response.json()["next_cursor"] is None, "Less results than the limit: last page"
+    search_kwargs = mocked_elasticsearch.search.call_args.kwargs
+    assert search_kwargs["pit"]["id"] == "pit_2"
+    assert search_kwargs["search_after"] == [1]
+    mocked_elasticsearch.close_point_in_time.assert_called_once_with(id="pit_2")
+    assert mocked_elasticsearch.open_point_in_time.call_count == 1
+
+
+@pytest.mark.parametrize(
+    "params,detail",
+    [
+        ({"cursor": "not a cursor"}, "Invalid cursor."),
+        ({"cursor": "*", "offset": 1}, "The offset cannot be combined with a cursor."),
+        ({"search_query": "other"}, "Invalid cursor: it does not belong to this search."),
+        ({"search_fields": ["name"]}, "Invalid cursor: it does not belong to this search."),
+    ],
+)
+def test_search_bad_cursor(client: TestClient, params: dict, detail: str):
+    mocked_elasticsearch = mock_elasticsearch(filename_mock="dataset_search.json")
+    mocked_elasticsearch.search.return_value["pit_id"] = "pit_1"
+    mocked_elasticsearch.open_point_in_time = Mock(return_value={"id": "pit_1"})
+    first_page = {"search_query": "description", "limit": 1, "cursor": "*"}
+    cursor = client.get("/search/datasets/v1", params=first_page).json()["next_cursor"]
+
+    params = {"search_query": "description", "cursor": cursor} | params
+    response = client.get("/search/datasets/v1", params=params)
+    assert response.status_code == 400, response.json()
+    assert response.json()["detail"] == detail
+
+
+def test_search_expired_cursor(client: TestClient):
+    mocked_elasticsearch = mock_elasticsearch(filename_mock="dataset_search.json")
+    mocked_elasticsearch.search.return_value["pit_id"] = "pit_1"
+    mocked_elasticsearch.open_point_in_time = Mock(return_value={"id": "pit_1"})
+    params = {"search_query": "description", "limit": 1, "cursor": "*"}
+    cursor = client.get("/search/datasets/v1", params=params).json()["next_cursor"]
+
+    meta = ApiResponseMeta(404, "1.1", HttpHeaders(), 0, NodeConfig("http", "localhost", 9200))
+    mocked_elasticsearch.search.side_effect = NotFoundError("search_context_missing", meta, {})
+    response = client.get("/search/datasets/v1", params=params | {"cursor": cursor})
+    assert response.status_code == 400, response.json()
+    assert "expired" in response.json()["detail"]
+
+
+def _without_none(value):
+    """The value without the empty fields, which the GET endpoint leaves out."""
+    if isinstance(value, dict):
+        return {key: _without_none(val) for key, val in value.items() if val is not None}
+    if isinstance(value, list):
+        return [_without_none(val) for val in value]
+    return value
+
+
+def mock_elasticsearch(filename_mock: str) -> Elasticsearch:
     with open(path_test_resources() / "elasticsearch" / filename_mock, "r") as f:
         mocked_results = json.load(f)
 
     mocked_elasticsearch = Elasticsearch("https://example.com:9200")
     mocked_elasticsearch.search = Mock(return_value=mocked_results)
     ElasticsearchSingleton().patch(mocked_elasticsearch)
+    return mocked_elasticsearch
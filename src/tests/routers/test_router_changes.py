@@ -0,0 +1,104 @@
+import copy
+import datetime
+from unittest.mock import Mock
+
+from freezegun import freeze_time
+from starlette.testclient import TestClient
+
+from authentication import keycloak_openid
+from routers.change_router import SAFETY_LAG
+
+
+def _after_safety_lag():
+    """Freeze the time at the moment that the changes made until now are returned."""
+    return freeze_time(datetime.datetime.utcnow() + SAFETY_LAG)
+
+
+def _post(client: TestClient, resource_name_plural: str, body: dict, identifier: str) -> int:
+    body = copy.deepcopy(body)
+    body["platform_resource_identifier"] = identifier
+    response = client.post(
+        f"/{resource_name_plural}/v1", json=body, headers={"Authorization": "Fake token"}
+    )
+    assert response.status_code == 200, response.json()
+    return response.json()["identifier"]
+
+
+def _all_changes(client: TestClient, since: str | None = None, limit: int = 2) -> tuple:
+    with _after_safety_lag():
+        return _pages(client, since, limit)
+
+
+def _pages(client: TestClient, since: str | None, limit: int) -> tuple:
+    changes = []
+    while True:
+        params = {"limit": limit} | ({"since": since} if since is not None else {})
+        response = client.get("/changes/v1", params=params)
+        assert response.status_code == 200, response.json()
+        feed = response.json()
+        changes += feed["changes"]
+        if feed["next"] == since:
+            return changes, since
+        since = feed["next"]
+
+
+def test_changes(client: TestClient, mocked_privileged_token: Mock, body_asset: dict):
+    keycloak_openid.introspect = mocked_privileged_token
+    _post(client, "datasets", body_asset, "1")
+    _post(client, "publications", body_asset, "2")
+    _post(client, "datasets", body_asset, "3")
+
+    changes, cursor = _all_changes(client)
+    assert [(c["resource_type"], c["identifier"]) for c in changes] == [
+        ("dataset", 1),
+        ("publication", 1),
+        ("dataset", 2),
+    ]
+    assert not any(c["deleted"] for c in changes)
+    assert changes[0]["resource"]["name"] == body_asset["name"]
+    assert changes[0]["resource"]["platform_resource_identifier"] == "1"
+
+    body = copy.deepcopy(body_asset) | {"name": "new name", "platform_resource_identifier": "1"}
+    response = client.put("/datasets/v1/1", json=body, headers={"Authorization": "Fake token"})
+    assert response.status_code == 200, response.json()
+    response = client.delete("/publications/v1/1", headers={"Authorization": "Fake token"})
+    assert response.status_code == 200, response.json()
+
+    changes, _ = _all_changes(client, since=cursor)
+    assert [(c["resource_type"], c["identifier"], c["deleted"]) for c in changes] == [
+        ("dataset", 1, False),
+        ("publication", 1, True),
+    ]
+    assert changes[0]["resource"]["name"] == "new name"
+    assert "resource" not in changes[1]
+
+    with _after_safety_lag():
+        response = client.get("/changes/v1", params={"since": "2000-01-01T00:00:00"})
+    assert response.status_code == 200, response.json()
+    assert len(response.json()["changes"]) == 3
+
+
+def test_changes_safety_lag(client: TestClient, mocked_privileged_token: Mock, body_asset: dict):
+    keycloak_openid.introspect = mocked_privileged_token
+    _post(client, "datasets", body_asset, "1")
+    response = client.get("/changes/v1")
+    assert response.status_code == 200, response.json()
+    assert response.json() == {"changes": []}, "The change is too recent to be returned"
+
+    changes, _ = _all_changes(client)
+    assert [(c["resource_type"], c["identifier"]) for c in changes] == [("dataset", 1)]
+
+
+def test_changes_empty(client: TestClient):
+    response = client.get("/changes/v1")
+    assert response.status_code == 200, response.json()
+    assert response.json() == {"changes": []}
+
+
+def test_changes_invalid_since(client: TestClient):
+    for since in ("invalid", "eyJkYXRlIjogMX0="):
+        response = client.get("/changes/v1", params={"since": since})
+        assert response.status_code == 400, response.json()
+        assert response.json()["detail"] == (
+            "Invalid since: expected a cursor or an ISO 8601 datetime."
+        )
@@ -0,0 +1,214 @@
+import copy
+import datetime
+from unittest.mock import Mock
+
+import pytest
+from elasticsearch.helpers import BulkIndexError
+from sqlalchemy.engine import Engine
+from sqlmodel import select
+from starlette.testclient import TestClient
+
+from authentication import keycloak_openid
+from database.model.concept.aiod_entry import AIoDEntryORM
+from database.model.dataset.dataset import Dataset
+from database.model.news.news import News
+from database.session import DbSession
+from search_indexer.indexer import index_changes
+from search_indexer.outbox import SearchOutbox
+from tests.testutils.default_instances import add_resource
+from tests.testutils.fake_elasticsearch import FakeElasticsearch
+
+
+def _outbox() -> list[tuple[str, int]]:
+    with DbSession() as session:
+        changes = session.scalars(select(SearchOutbox).order_by(SearchOutbox.identifier)).all()
+        return [(change.es_index, change.resource_identifier) for change in changes]
+
+
+def _index_all(client: FakeElasticsearch) -> int:
+    with DbSession() as session:
+        return index_changes(session, client)
+
+
+def _add_resources():
+    body = {
+        "name": "dataset",
+        "issn": "20493630",
+        "description": {"plain": "plain", "html": "html"},
+    }
+    with DbSession() as session:
+        add_resource(session, Dataset, body)
+        add_resource(session, News, {"name": "news", "headline": "headline"})
+        session.commit()
+
+
+def test_changes_are_written_to_the_outbox(engine: Engine):
+    _add_resources()
+    assert _outbox() == [("dataset", 1), ("news", 1)]
+
+    with DbSession() as session:
+        session.add(Dataset(name="not committed", aiod_entry=AIoDEntryORM()))
+        session.flush()
+        session.rollback()
+    assert _outbox() == [("dataset", 1), ("news", 1)]
+
+
+def test_index_changes(engine: Engine):
+    _add_resources()
+    client = FakeElasticsearch()
+    assert _index_all(client) == 2
+    assert _outbox() == []
+    assert client.n_bulk_requests == 1
+
+    dataset = client.documents["dataset"]["dataset_1"]
+    assert dataset["identifier"] == 1
+    assert dataset["name"] == "dataset"
+    assert dataset["issn"] == "20493630"
+    assert dataset["description_plain"] == "plain"
+    assert dataset["description_html"] == "html"
+    assert dataset["type"] == "dataset"
+    assert dataset["date_modified"] is not None
+    news = client.documents["news"]["news_1"]
+    assert news["headline"] == "headline"
+    assert news["description_plain"] is None
+
+    assert _index_all(client) == 0, "The outbox should be empty"
+    assert client.n_bulk_requests == 1
+
+
+def test_index_updates_and_deletes(engine: Engine):
+    _add_resources()
+    client = FakeElasticsearch()
+    _index_all(client)
+
+    with DbSession() as session:
+        dataset = session.get(Dataset, 1)
+        dataset.aiod_entry.date_modified = datetime.datetime(2024, 1, 1)
+        news = session.get(News, 1)
+        news.date_deleted = datetime.datetime.now()
+        session.commit()
+    assert _outbox() == [("dataset", 1), ("news", 1)], "The aiod_entry change counts as well"
+
+    _index_all(client)
+    assert "2024-01-01" in client.documents["dataset"]["dataset_1"]["date_modified"]
+    assert client.documents["news"] == {}
+
+    with DbSession() as session:
+        session.delete(session.get(Dataset, 1))
+        session.commit()
+    _index_all(client)
+    assert client.documents["dataset"] == {}
+
+
+def test_aiod_entry_changes_of_resources_inserted_in_the_same_session(engine: Engine):
+    with DbSession() as session:
+        dataset = Dataset(name="dataset", aiod_entry=AIoDEntryORM())
+        session.add(dataset)
+        session.commit()
+        dataset.aiod_entry.date_modified = datetime.datetime(2024, 1, 1)
+        session.commit()
+        dataset.aiod_entry.date_modified = datetime.datetime(2024, 1, 2)
+        session.flush()
+        dataset.aiod_entry.date_modified = datetime.datetime(2024, 1, 3)
+        session.commit()
+    assert _outbox() == [("dataset", 1)] * 4
+
+
+def test_merged_resources_are_written_to_the_outbox(engine: Engine):
+    with DbSession() as session:
+        dataset = session.merge(Dataset(name="dataset", aiod_entry=AIoDEntryORM()))
+        session.commit()
+        dataset.aiod_entry.date_modified = datetime.datetime(2024, 1, 1)
+        session.commit()
+    assert _outbox() == [("dataset", 1)] * 2
+
+
+def test_index_changes_is_idempotent(engine: Engine):
+    _add_resources()
+    with DbSession() as session:
+        session.get(Dataset, 1).name = "new name"
+        session.delete(session.get(News, 1))
+        session.commit()
+    assert len(_outbox()) == 4
+
+    client = FakeElasticsearch()
+    assert _index_all(client) == 4
+    assert client.documents["dataset"]["dataset_1"]["name"] == "new name"
+    assert client.documents["news"] == {}
+
+
+def test_failed_changes_stay_in_the_outbox(engine: Engine):
+    _add_resources()
+    client = FakeElasticsearch()
+    client.failing_ids = {"news_1"}
+    with pytest.raises(BulkIndexError):
+        _index_all(client)
+    assert _outbox() == [("dataset", 1), ("news", 1)]
+
+    client.failing_ids = set()
+    _index_all(client)
+    assert _outbox() == []
+    assert set(client.documents["news"]) == {"news_1"}
+
+
+def test_patch_is_indexed(
+    client: TestClient, engine: Engine, mocked_privileged_token: Mock, body_asset: dict
+):
+    keycloak_openid.introspect = mocked_privileged_token
+    headers = {"Authorization": "Fake token"}
+    body = copy.deepcopy(body_asset)
+    response = client.post("/datasets/v1", json=body, headers=headers)
+    assert response.status_code == 200, response.json()
+    es = FakeElasticsearch()
+    _index_all(es)
+
+    patch = {"description": {"plain": "new description"}}
+    response = client.patch("/datasets/v1/1", json=patch, headers=headers)
+    assert response.status_code == 200, response.json()
+    assert _outbox() == [("dataset", 1)]
+    _index_all(es)
+    assert es.documents["dataset"]["dataset_1"]["description_plain"] == "new description"
+
+
+def test_documents_contain_the_complete_resource(
+    client: TestClient, engine: Engine, mocked_privileged_token: Mock, body_asset: dict
+):
+    keycloak_openid.introspect = mocked_privileged_token
+    body = copy.deepcopy(body_asset)
+    response = client.post("/datasets/v1", json=body, headers={"Authorization": "Fake token"})
+    assert response.status_code == 200, response.json()
+    es = FakeElasticsearch()
+    _index_all(es)
+
+    document = es.documents["dataset"]["dataset_1"]
+    assert set(document["keyword"]) == set(body_asset["keyword"])
+    assert document["aiod_entry"]["status"] == body_asset["aiod_entry"]["status"]
+    resource = client.get("/datasets/v1/1").json()
+    assert {key: val for key, val in resource.items() if val is not None}.items() <= (
+        document.items()
+    )
+
+
+def test_linked_resources_are_indexed(
+    client: TestClient, engine: Engine, mocked_privileged_token: Mock
+):
+    keycloak_openid.introspect = mocked_privileged_token
+    headers = {"Authorization": "Fake token"}
+    response = client.post("/datasets/v1", json={"name": "dataset"}, headers=headers)
+    assert response.status_code == 200, response.json()
+    es = FakeElasticsearch()
+    _index_all(es)
+    dataset = client.get("/datasets/v1/1").json()
+
+    body = {"name": "news", "has_part": [dataset["ai_resource_identifier"]]}
+    response = client.post("/news/v1", json=body, headers=headers)
+    assert response.status_code == 200, response.json()
+    assert ("dataset", 1) in _outbox(), "The other side of the link changed as well"
+    _index_all(es)
+    news = client.get("/news/v1/1").json()
+    assert es.documents["dataset"]["dataset_1"]["is_part_of"] == [news["ai_resource_identifier"]]
+
+    response = client.put("/news/v1/1", json={"name": "news", "has_part": []}, headers=headers)
+    assert response.status_code == 200, response.json()
+    _index_all(es)
+    assert es.documents["dataset"]["dataset_1"]["is_part_of"] == []
@@ -0,0 +1,129 @@
+import datetime
+
+import pytest
+from elasticsearch.helpers import BulkIndexError
+from freezegun import freeze_time
+from sqlalchemy.engine import Engine
+from sqlmodel import select
+
+from database.model.concept.aiod_entry import AIoDEntryORM
+from database.model.dataset.dataset import Dataset
+from database.session import DbSession
+from routers.search_routers import SearchRouterDatasets
+from search_indexer import reindex as reindex_module
+from search_indexer.indexer import index_changes
+from search_indexer.outbox import SearchOutbox, SearchReindex
+from search_indexer.reindex import is_built, reindex
+from setup.es_setup.definitions import generate_mapping
+from tests.testutils.default_instances import add_resource
+from tests.testutils.fake_elasticsearch import FakeElasticsearch
+
+
+@pytest.fixture
+def datasets(engine: Engine):
+    one_hour_ago = datetime.datetime.utcnow() - datetime.timedelta(hours=1)
+    with DbSession() as session:
+        for i in range(5):
+            add_resource(session, Dataset, {"name": f"dataset {i}"})
+        add_resource(session, Dataset, {"name": "deleted"})
+        session.flush()
+        for entry in session.scalars(select(AIoDEntryORM)):
+            entry.date_modified = one_hour_ago
+        session.get(Dataset, 6).date_deleted = one_hour_ago
+        session.commit()
+        session.execute(SearchOutbox.__table__.delete())
+        session.commit()
+
+
+def _reindex(client: FakeElasticsearch, **kwargs):
+    with DbSession() as session:
+        return reindex(session, client, SearchRouterDatasets(), threads=2, chunk_size=2, **kwargs)
+
+
+def test_reindex_replaces_concrete_index(datasets, engine: Engine):
+    client = FakeElasticsearch()
+    client.documents["dataset"]["dataset_100"] = {"name": "stale"}
+
+    with freeze_time("2024-01-01 12:00:00"):
+        result = _reindex(client, replicas=2)
+
+    assert result.index == "dataset_20240101120000"
+    assert result.n_documents == 5
+    assert client.aliases == {"dataset": "dataset_20240101120000"}
+    assert set(client.documents) == {"dataset_20240101120000"}
+    assert set(client.documents["dataset_20240101120000"]) == {f"dataset_{i}" for i in range(1, 6)}
+    assert client.settings["dataset_20240101120000"] == {
+        "refresh_interval": None,
+        "number_of_replicas": 2,
+    }
+
+
+def test_concrete_index_is_not_built(datasets, engine: Engine):
+    client = FakeElasticsearch()
+    client.indices.create(index="dataset")
+    assert not is_built(client, SearchRouterDatasets()), "Created empty, or filled by logstash"
+    _reindex(client)
+    assert is_built(client, SearchRouterDatasets())
+
+
+def test_reindex_moves_alias(datasets, engine: Engine):
+    client = FakeElasticsearch()
+    with freeze_time("2024-01-01"):
+        _reindex(client)
+    with freeze_time("2024-01-02"):
+        _reindex(client)
+    assert client.aliases == {"dataset": "dataset_20240102000000"}
+    assert set(client.documents) == {"dataset_20240102000000"}
+
+
+def test_reindex_catches_up_with_changes(datasets, engine: Engine, monkeypatch: pytest.MonkeyPatch):
+    client = FakeElasticsearch()
+    swap_alias = reindex_module._swap_alias
+
+    def change_then_swap(*args, **kwargs):
+        """The changes are made after the resources are loaded into the new index."""
+        with DbSession() as session:
+            session.get(Dataset, 2).name = "new name"
+            session.get(Dataset, 3).date_deleted = datetime.datetime.utcnow()
+            session.delete(session.get(Dataset, 4))
+            session.commit()
+            assert index_changes(session, client) == 0, "The rebuilt index should be skipped"
+        swap_alias(*args, **kwargs)
+
+    monkeypatch.setattr(reindex_module, "_swap_alias", change_then_swap)
+    with freeze_time("2024-01-01"):
+        _reindex(client)
+    with DbSession() as session:
+        assert session.scalars(select(SearchReindex)).all() == []
+        assert index_changes(session, client) == 3
+
+    documents = client.documents["dataset_20240101000000"]
+    assert set(documents) == {"dataset_1", "dataset_2", "dataset_5"}
+    assert documents["dataset_2"]["name"] == "new name"
+
+
+def test_reindex_failure_keeps_old_index(datasets, engine: Engine):
+    client = FakeElasticsearch()
+    with freeze_time("2024-01-01"):
+        _reindex(client)
+    client.failing_ids = {"dataset_3"}
+    with freeze_time("2024-01-02"), pytest.raises(BulkIndexError):
+        _reindex(client)
+    assert client.aliases == {"dataset": "dataset_20240101000000"}
+    assert set(client.documents) == {"dataset_20240101000000"}
+    with DbSession() as session:
+        assert session.scalars(select(SearchReindex)).all() == [], "Indexing should be resumed"
+
+
+def test_mapping_of_the_read_model():
+    router = SearchRouterDatasets()
+    mapping = generate_mapping(router.resource_class_read, router.indexed_fields)["mappings"]
+    assert mapping["dynamic"] is False
+    properties = mapping["properties"]
+    assert properties["issn"]["type"] == "text", "Indexed fields are searchable text"
+    assert properties["identifier"] == {"type": "long"}
+    assert properties["keyword"] == {"type": "keyword", "ignore_above": 256}
+    assert properties["license"]["type"] == "keyword"
+    assert properties["aiod_entry"]["properties"]["date_modified"] == {"type": "date"}
+    assert properties["size"]["properties"]["value"] == {"type": "long"}
+    assert properties["distribution"]["properties"]["content_url"]["type"] == "keyword"
@@ -1,14 +1,19 @@
 """Unittests for the behaviour of get_current_user()."""
 import inspect
+import time
 from unittest.mock import Mock
 
 import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
 from fastapi import HTTPException
+from jose import jwk, jwt
 from keycloak import KeycloakError
 from starlette import status
 
 
-from authentication import get_current_user, keycloak_openid, User
+import authentication
+from authentication import get_current_user, introspection_cache, keycloak_openid, User
 from tests.testutils.mock_keycloak import MockedKeycloak, TestUserType
 
 
@@ -82,3 +87,72 @@ async def test_keycloak_error():
         await get_current_user(token="Bearer mocked")
     assert exception_info.value.status_code == status.HTTP_401_UNAUTHORIZED
     assert exception_info.value.detail == "Invalid authentication token"
+
+
+@pytest.mark.asyncio
+async def test_introspection_cached():
+    userinfo = {"username": "user", "active": True, "exp": time.time() + 60}
+    keycloak_openid.introspect = Mock(return_value=userinfo)
+    for _ in range(3):
+        user = await get_current_user(token="Bearer mocked")
+        assert user.name == "user"
+    keycloak_openid.introspect.assert_called_once_with("mocked")
+    assert (introspection_cache.hits, introspection_cache.misses) == (2, 1)
+    assert "mocked" not in introspection_cache._entries
+
+
+@pytest.mark.asyncio
+async def test_introspection_cache_per_token():
+    keycloak_openid.introspect = Mock(return_value={"username": "user", "active": True})
+    await get_current_user(token="Bearer mocked")
+    await get_current_user(token="Bearer other")
+    assert keycloak_openid.introspect.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_introspection_expired_token_not_cached():
+    userinfo = {"username": "user", "active": True, "exp": time.time() - 1}
+    keycloak_openid.introspect = Mock(return_value=userinfo)
+    await get_current_user(token="Bearer mocked")
+    await get_current_user(token="Bearer mocked")
+    assert keycloak_openid.introspect.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_inactive_user_not_cached():
+    keycloak_openid.introspect = Mock(return_value={"username": "user", "active": False})
+    for _ in range(2):
+        with pytest.raises(HTTPException):
+            await get_current_user(token="Bearer mocked")
+    assert keycloak_openid.introspect.call_count == 2
+    assert len(introspection_cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_verify_token_locally(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setitem(authentication.KEYCLOAK_CONFIG, "verify_token_locally", True)
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    public_jwk = jwk.construct(private_key.public_key(), "RS256").to_dict()
+    keycloak_openid.certs = Mock(return_value={"keys": [public_jwk | {"kid": "key"}]})
+    keycloak_openid.introspect = Mock()
+    claims = {
+        "preferred_username": "user",
+        "realm_access": {"roles": ["edit_aiod_resources"]},
+        "aud": "account",
+        "exp": int(time.time()) + 60,
+    }
+    token = jwt.encode(claims, private_pem, algorithm="RS256", headers={"kid": "key"})
+
+    user = await get_current_user(token=f"Bearer {token}")
+    assert user.name == "user"
+    assert user.roles == {"edit_aiod_resources"}
+    with pytest.raises(HTTPException) as exception_info:
+        await get_current_user(token=f"Bearer {token[:-4]}abcd")
+    assert exception_info.value.status_code == status.HTTP_401_UNAUTHORIZED
+    keycloak_openid.certs.assert_called_once()
+    keycloak_openid.introspect.assert_not_called()
@@ -0,0 +1,65 @@
+import threading
+import time
+
+from caching import StaleWhileRevalidate, TTLCache
+
+
+def test_lru_eviction():
+    cache = TTLCache[int](maxsize=2, max_age=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_expiry():
+    cache = TTLCache[int](maxsize=2, max_age=60)
+    cache.set("a", 1, expires_at=time.time() - 1)
+    cache.set("b", 2, expires_at=time.time() + 0.05)
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    time.sleep(0.1)
+    assert cache.get("b") is None
+    assert len(cache) == 0
+
+
+def test_disabled():
+    cache = TTLCache[int](maxsize=2, max_age=0)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+
+
+def test_stale_while_revalidate():
+    computed = []
+    refreshed = threading.Event()
+
+    def compute() -> int:
+        computed.append(len(computed))
+        if len(computed) > 1:
+            refreshed.set()
+        return computed[-1]
+
+    value = StaleWhileRevalidate[int](compute=compute, max_age=0.05, stale_max_age=60)
+    assert value.get() == 0
+    assert value.get() == 0
+    time.sleep(0.1)
+    assert value.get() == 0, "The stale value should be returned while refreshing"
+    assert refreshed.wait(timeout=5)
+    assert value.get() == 1
+    assert computed == [0, 1]
+
+
+def test_stale_while_revalidate_expired():
+    computed = []
+    value = StaleWhileRevalidate[int](
+        compute=lambda: computed.append(1) or len(computed), max_age=0, stale_max_age=0
+    )
+    assert value.get() == 1
+    time.sleep(0.01)
+    assert value.get() == 2, "A value older than max_age + stale_max_age should be recomputed"
+    value.clear()
+    assert value.get() == 3
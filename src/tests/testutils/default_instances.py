@@ -116,6 +116,15 @@ def experiment(body_asset) -> Experiment:
     return _create_class_with_body(Experiment, body)
 
 
+def add_resource(session, clz, body: dict):
+    """Add the resource to the session, including its relationships, as the POST endpoint does."""
+    res_create = resource_create(clz)(**body)
+    res = clz.from_orm(res_create)
+    deserialize_resource_relationships(session, clz, res, res_create)
+    session.add(res)
+    return res
+
+
 def _create_class_with_body(clz, body: dict):
     pydantic_class = resource_create(clz)
     res_create = pydantic_class(**body)
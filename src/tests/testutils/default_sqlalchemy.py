@@ -11,8 +11,9 @@ from sqlalchemy.engine import Engine
 from sqlmodel import create_engine, SQLModel, Session, select
 from starlette.testclient import TestClient
 
-from database.deletion.triggers import add_delete_triggers
+from database.deletion.triggers import add_delete_triggers, add_deletion_log_triggers
 from database.model.concept.concept import AIoDConcept
+from database.model.named_relation_cache import NamedRelationGeneration
 from database.model.platform.platform import Platform
 from database.model.platform.platform_names import PlatformName
 from database.session import EngineSingleton
@@ -35,6 +36,7 @@ def engine(deletion_triggers) -> Iterator[Engine]:
     temporary_file = tempfile.NamedTemporaryFile()
     engine = create_engine(f"sqlite:///{temporary_file.name}?check_same_thread=False")
     AIoDConcept.metadata.create_all(engine)
+    add_deletion_log_triggers(engine)
     EngineSingleton().patch(engine)
 
     # Yielding is essential, the temporary file will be closed after the engine is used
@@ -60,6 +62,7 @@ def clear_db(request, engine: Engine):
             pytest.exit("A previous test did not clean properly. See other errors.")
     with Session(engine) as session:
         session.add_all([Platform(name=name) for name in PlatformName])
+        session.merge(NamedRelationGeneration())  # as add_deletion_log_triggers would
         if any("engine" in fixture and "filled" in fixture for fixture in request.fixturenames):
             session.add(
                 factory(
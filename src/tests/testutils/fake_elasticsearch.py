@@ -0,0 +1,112 @@
+import json
+import threading
+from collections import defaultdict
+from typing import Any
+
+from elastic_transport import ApiResponseMeta, HttpHeaders, NodeConfig, ObjectApiResponse
+from elasticsearch import Elasticsearch
+
+
+def _response(body: Any) -> ObjectApiResponse:
+    meta = ApiResponseMeta(
+        status=200,
+        http_version="1.1",
+        headers=HttpHeaders(),
+        duration=0,
+        node=NodeConfig("http", "localhost", 9200),
+    )
+    return ObjectApiResponse(body=body, meta=meta)
+
+
+class FakeElasticsearch(Elasticsearch):
+    """
+    An in-memory Elasticsearch, supporting the index and delete operations of the bulk api, and
+    the creation of indices and aliases. The documents can be found in self.documents:
+    {index: {_id: _source}}, the aliases in self.aliases: {alias: index}.
+
+    Set failing_ids to let the operations on these documents fail.
+    """
+
+    def __init__(self):
+        super().__init__("http://localhost:9200")
+        self.documents: dict[str, dict[str, dict[str, Any]]] = defaultdict(dict)
+        self.settings: dict[str, dict[str, Any]] = defaultdict(dict)
+        self.aliases: dict[str, str] = {}
+        self.failing_ids: set[str] = set()
+        self.n_bulk_requests = 0
+        self.indices = FakeIndicesClient(self)  # type: ignore[assignment]
+        self._lock = threading.Lock()
+
+    def options(self, *args, **kwargs) -> "FakeElasticsearch":
+        return self
+
+    def bulk(self, *, operations: list[bytes | str], **kwargs) -> ObjectApiResponse:
+        with self._lock:
+            self.n_bulk_requests += 1
+            lines = iter(json.loads(operation) for operation in operations)
+            items = [self._operation(line, lines) for line in lines]
+        body = {
+            "errors": any(item[op]["status"] >= 300 for item in items for op in item),
+            "items": items,
+        }
+        return _response(body)
+
+    def _operation(self, line: dict[str, Any], lines) -> dict[str, Any]:
+        ((op_type, header),) = line.items()
+        index = self.aliases.get(header["_index"], header["_index"])
+        id_ = header["_id"]
+        if id_ in self.failing_ids:
+            status = 500
+            if op_type != "delete":
+                next(lines)
+        elif op_type == "index":
+            status = 200 if id_ in self.documents[index] else 201
+            self.documents[index][id_] = next(lines)
+        elif op_type == "delete":
+            status = 200 if self.documents[index].pop(id_, None) is not None else 404
+        else:
+            raise NotImplementedError(f"Bulk operation {op_type} is not supported.")
+        return {op_type: {"_index": index, "_id": id_, "status": status}}
+
+
+class FakeIndicesClient:
+    def __init__(self, es: FakeElasticsearch):
+        self.es = es
+
+    def create(self, *, index: str, settings: dict | None = None, **kwargs) -> ObjectApiResponse:
+        if index in self.es.documents or index in self.es.aliases:
+            raise ValueError(f"Index {index} already exists")
+        self.es.documents[index] = {}
+        self.es.settings[index] = dict((settings or {}).get("index", {}))
+        return _response({"acknowledged": True, "index": index})
+
+    def put_settings(self, *, index: str, settings: dict) -> ObjectApiResponse:
+        self.es.settings[index].update(settings["index"])
+        return _response({"acknowledged": True})
+
+    def refresh(self, *, index: str) -> ObjectApiResponse:
+        return _response({})
+
+    def delete(self, *, index: str) -> ObjectApiResponse:
+        del self.es.documents[index]
+        return _response({"acknowledged": True})
+
+    def exists(self, *, index: str) -> bool:
+        return index in self.es.documents or index in self.es.aliases
+
+    def exists_alias(self, *, name: str) -> bool:
+        return name in self.es.aliases
+
+    def get_alias(self, *, name: str) -> ObjectApiResponse:
+        return _response({self.es.aliases[name]: {"aliases": {name: {}}}})
+
+    def update_aliases(self, *, actions: list[dict[str, Any]]) -> ObjectApiResponse:
+        for action in actions:
+            ((action_type, arguments),) = action.items()
+            if action_type == "add":
+                self.es.aliases[arguments["alias"]] = arguments["index"]
+            elif action_type == "remove_index":
+                del self.es.documents[arguments["index"]]
+            else:
+                raise NotImplementedError(f"Alias action {action_type} is not supported.")
+        return _response({"acknowledged": True})
@@ -0,0 +1,34 @@
+"""
+Counting the SQL statements issued by a piece of code, to prevent regressions such as N+1 lazy
+loads when relationships are added to a resource.
+"""
+
+from contextlib import contextmanager
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from database.session import EngineSingleton
+
+
+@contextmanager
+def count_queries(engine: Engine) -> Iterator[list[str]]:
+    """Yields a list that is filled with every statement executed on this engine. For the
+    database engine, the statements of its async engine (used by the read endpoints) are included
+    as well."""
+    statements: list[str] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engines = [engine]
+    if engine is EngineSingleton().engine:
+        engines.append(EngineSingleton().async_engine.sync_engine)
+    for counted in engines:
+        event.listen(counted, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        for counted in engines:
+            event.remove(counted, "before_cursor_execute", before_cursor_execute)
@@ -7,6 +7,7 @@ from fastapi import HTTPException, status, UploadFile
 from authentication import User
 from config import KEYCLOAK_CONFIG
 from database.model.dataset.dataset import Dataset
+from routers.response_cache import response_cache
 from sqlmodel import Session, select
 
 
@@ -96,6 +97,7 @@ class Uploader(abc.ABC):
             resource.aiod_entry.date_modified = datetime.datetime.utcnow()
             session.merge(resource)
             session.commit()
+            response_cache.invalidate()
         except Exception as exc:
             raise HTTPException(
                 status_code=status.HTTP_502_BAD_GATEWAY,